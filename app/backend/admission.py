@@ -0,0 +1,73 @@
+"""Admission control: shed work with `429 Retry-After` instead of queueing it without bound."""
+
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+# Requests per second each client may make to /meta and /download; 0 turns the limit off.
+CLIENT_RATE = max(0.0, float(os.getenv("SPOTDL_CLIENT_RATE", "50")))
+CLIENT_BURST = max(1, int(os.getenv("SPOTDL_CLIENT_BURST", "200")))
+MAX_TRACKED_CLIENTS = 1024
+MAX_RETRY_AFTER = 60
+
+
+class Overloaded(RuntimeError):
+    """Raised when a request is refused for capacity reasons; callers should retry later."""
+
+    code = "overloaded"
+
+    def __init__(self, message: str, *, retry_after: int) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimited(Overloaded):
+    code = "rate_limited"
+
+
+def retry_after_for(seconds: float) -> int:
+    """Round a wait estimate up to a whole-second `Retry-After` value."""
+    return max(1, min(MAX_RETRY_AFTER, math.ceil(seconds)))
+
+
+class ClientRateLimiter:
+    """In-process token bucket per client key (the remote address)."""
+
+    def __init__(
+        self,
+        *,
+        rate: float = CLIENT_RATE,
+        burst: int = CLIENT_BURST,
+        max_clients: int = MAX_TRACKED_CLIENTS,
+        clock=time.monotonic,
+    ) -> None:
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_clients = max_clients
+        self._clock = clock
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: Optional[str]) -> None:
+        """Take one token for `key` or raise `RateLimited` with the time until the next one."""
+        if self.rate <= 0:
+            return
+        key = key or "unknown"
+        now = self._clock()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (float(self.burst), now))
+            tokens = min(float(self.burst), tokens + (now - updated_at) * self.rate)
+            if tokens < 1.0:
+                self._buckets[key] = (tokens, now)
+                raise RateLimited(
+                    "Too many requests; slow down.",
+                    retry_after=retry_after_for((1.0 - tokens) / self.rate),
+                )
+            self._buckets[key] = (tokens - 1.0, now)
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
@@ -0,0 +1,225 @@
+"""Content-addressed disk cache for cover art with resized thumbnails and LRU eviction."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from io import BytesIO
+from pathlib import Path
+from typing import Optional
+
+from config import SETTINGS_DIR
+
+LOGGER = logging.getLogger(__name__)
+COVER_CACHE_DIR = SETTINGS_DIR / "covers"
+COVER_CACHE_MAX_BYTES = max(1, int(os.getenv("SPOTDL_COVER_CACHE_MB", "256"))) * 1024 * 1024
+COVER_FETCH_TIMEOUT = max(1, int(os.getenv("SPOTDL_COVER_FETCH_TIMEOUT", "10")))
+COVER_MAX_DOWNLOAD_BYTES = 10 * 1024 * 1024
+COVER_MAX_AGE = 365 * 24 * 60 * 60
+# Requested sizes snap to these so arbitrary `?size=` values cannot bloat the cache.
+# 440 is the 220px table cell at 2x; 128/256 cover compact mode.
+COVER_THUMBNAIL_SIZES = (128, 256, 440)
+DEFAULT_THUMBNAIL_SIZE = 440
+
+
+class CoverFetchError(RuntimeError):
+    """Raised when the upstream cover image cannot be fetched."""
+
+
+def cover_key(url: str) -> str:
+    """Return the stable cache key used in `/cover/<key>` URLs."""
+    return hashlib.sha256(url.strip().encode("utf-8")).hexdigest()[:32]
+
+
+def _snap_size(size: Optional[int]) -> int:
+    if not size:
+        return DEFAULT_THUMBNAIL_SIZE
+    for candidate in COVER_THUMBNAIL_SIZES:
+        if size <= candidate:
+            return candidate
+    return COVER_THUMBNAIL_SIZES[-1]
+
+
+def _load_pillow():
+    """Import Pillow on first resize; it ships with spotDL but stays optional here."""
+    try:
+        from PIL import Image
+    except ImportError:  # pragma: no cover - depends on the environment
+        return None
+    return Image
+
+
+def _sniff_mimetype(path: Path) -> str:
+    with path.open("rb") as handle:
+        header = handle.read(12)
+    if header.startswith(b"\x89PNG"):
+        return "image/png"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    if header[:3] == b"GIF":
+        return "image/gif"
+    return "image/jpeg"
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    temp_path.write_bytes(data)
+    os.replace(temp_path, path)
+
+
+class CoverCache:
+    """Fetch cover art once, store it by content hash, and serve resized copies."""
+
+    def __init__(self, root: Path = COVER_CACHE_DIR, *, max_bytes: int = COVER_CACHE_MAX_BYTES) -> None:
+        self.root = Path(root)
+        self.max_bytes = max(1, max_bytes)
+        self._refs_dir = self.root / "refs"
+        self._originals_dir = self.root / "originals"
+        self._thumbs_dir = self.root / "thumbs"
+        self._evict_lock = threading.Lock()
+
+    def proxy_url(self, url: str) -> str:
+        """Register a remote cover URL and return the local proxy path for the browser."""
+        cleaned = str(url or "").strip()
+        if not cleaned.lower().startswith(("http://", "https://")):
+            return cleaned
+
+        key = cover_key(cleaned)
+        ref_path = self._refs_dir / key
+        if not ref_path.exists():
+            _atomic_write(ref_path, json.dumps({"url": cleaned}).encode("utf-8"))
+        return f"/cover/{key}"
+
+    def _read_ref(self, key: str) -> dict[str, str]:
+        if len(key) != 32 or not all(char in "0123456789abcdef" for char in key):
+            raise FileNotFoundError(f"Unknown cover key: {key}")
+        try:
+            ref = json.loads((self._refs_dir / key).read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as exc:
+            raise FileNotFoundError(f"Unknown cover key: {key}") from exc
+        if not isinstance(ref, dict) or not ref.get("url"):
+            raise FileNotFoundError(f"Unknown cover key: {key}")
+        return ref
+
+    @staticmethod
+    def _touch(path: Path) -> None:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def cached_original(self, url: Optional[str]) -> Optional[Path]:
+        """Return the cached original image for a cover URL without fetching it."""
+        cleaned = str(url or "").strip()
+        if not cleaned:
+            return None
+        try:
+            ref = self._read_ref(cover_key(cleaned))
+        except FileNotFoundError:
+            return None
+
+        digest = ref.get("sha256")
+        original = self._originals_dir / digest if digest else None
+        if original is None or not original.exists():
+            return None
+        self._touch(original)
+        return original
+
+    def _fetch(self, url: str) -> bytes:
+        import urllib.request
+
+        request = urllib.request.Request(url, headers={"User-Agent": "spotdl-cask"})
+        try:
+            with urllib.request.urlopen(request, timeout=COVER_FETCH_TIMEOUT) as response:
+                content_type = str(response.headers.get("Content-Type") or "")
+                data = response.read(COVER_MAX_DOWNLOAD_BYTES + 1)
+        except OSError as exc:
+            raise CoverFetchError(f"Could not fetch cover art: {exc}") from exc
+
+        if content_type and not content_type.startswith("image/"):
+            raise CoverFetchError(f"Cover URL returned {content_type}, not an image.")
+        if len(data) > COVER_MAX_DOWNLOAD_BYTES:
+            raise CoverFetchError("Cover art is larger than the cache allows.")
+        return data
+
+    def original(self, key: str) -> Path:
+        """Return the cached original for a key, fetching it on first use."""
+        ref = self._read_ref(key)
+        digest = ref.get("sha256")
+        if digest:
+            original = self._originals_dir / digest
+            if original.exists():
+                self._touch(original)
+                return original
+
+        data = self._fetch(ref["url"])
+        digest = hashlib.sha256(data).hexdigest()
+        original = self._originals_dir / digest
+        if not original.exists():
+            _atomic_write(original, data)
+        _atomic_write(self._refs_dir / key, json.dumps({"url": ref["url"], "sha256": digest}).encode("utf-8"))
+        self._evict()
+        return original
+
+    def thumbnail(self, key: str, size: Optional[int] = None) -> tuple[Path, str]:
+        """Return a resized JPEG for the key, falling back to the original image."""
+        original = self.original(key)
+        pillow_image = _load_pillow()
+        if pillow_image is None:
+            return original, _sniff_mimetype(original)
+
+        side = _snap_size(size)
+        thumb = self._thumbs_dir / f"{original.name}-{side}.jpg"
+        if thumb.exists():
+            self._touch(thumb)
+            return thumb, "image/jpeg"
+
+        try:
+            with pillow_image.open(original) as image:
+                image = image.convert("RGB")
+                image.thumbnail((side, side))
+                buffer = BytesIO()
+                image.save(buffer, format="JPEG", quality=85, optimize=True)
+        except OSError:
+            LOGGER.warning("Could not resize cover %s; serving the original", key, exc_info=True)
+            return original, _sniff_mimetype(original)
+
+        _atomic_write(thumb, buffer.getvalue())
+        self._evict()
+        return thumb, "image/jpeg"
+
+    def _evict(self) -> None:
+        """Drop the least recently used images once the cache exceeds its budget."""
+        with self._evict_lock:
+            entries: list[tuple[float, int, Path]] = []
+            total = 0
+            for directory in (self._originals_dir, self._thumbs_dir):
+                if not directory.exists():
+                    continue
+                for path in directory.iterdir():
+                    try:
+                        stat = path.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+                    total += stat.st_size
+
+            if total <= self.max_bytes:
+                return
+
+            target = int(self.max_bytes * 0.9)
+            for _mtime, size, path in sorted(entries):
+                if total <= target:
+                    break
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                total -= size
+
+
+default_cover_cache = CoverCache()
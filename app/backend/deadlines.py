@@ -0,0 +1,92 @@
+"""Per-job idle budgets and hard deadlines for download workers."""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from typing import Any, Mapping, Optional
+
+from app.backend.protocol import DownloadJobSpec
+
+HEARTBEAT_INTERVAL = max(0.1, float(os.getenv("SPOTDL_HEARTBEAT_INTERVAL", "5")))
+# A worker that has been sending heartbeats is treated as frozen after this many go missing.
+HEARTBEAT_MISSES = 3
+HARD_TIMEOUT_BASE = max(30, int(os.getenv("SPOTDL_HARD_TIMEOUT_BASE", "300")))
+HARD_TIMEOUT_PER_AUDIO_SECOND = max(0.0, float(os.getenv("SPOTDL_HARD_TIMEOUT_PER_AUDIO_SECOND", "1.0")))
+# Conversion gets this many seconds without progress per second of audio before it counts as stuck.
+POSTPROCESS_IDLE_PER_AUDIO_SECOND = 0.25
+# Relative transcode cost of each output format; lossless output is the slowest to encode and write.
+FORMAT_COST = {"m4a": 0.5, "opus": 0.5, "mp3": 1.0, "ogg": 1.0, "wav": 1.5, "flac": 2.0}
+
+
+def _parse_phase_budgets(raw: str) -> dict[str, float]:
+    budgets: dict[str, float] = {}
+    for item in raw.split(","):
+        phase, _, seconds = item.partition("=")
+        try:
+            budgets[phase.strip()] = max(1.0, float(seconds))
+        except ValueError:
+            continue
+    return budgets
+
+
+# Phases that only talk to APIs should never go quiet for long; a stall there is a hang.
+PHASE_IDLE_TIMEOUTS = _parse_phase_budgets(os.getenv("SPOTDL_PHASE_IDLE_TIMEOUTS", "starting=30,resolving=30,searching=60"))
+
+
+def track_duration(spec: DownloadJobSpec) -> Optional[float]:
+    """Return the track length in seconds from cached metadata, if any was sent with the job."""
+    if spec.duration:
+        return float(spec.duration)
+    sources: tuple[Optional[Mapping[str, Any]], ...] = (spec.song_payload, spec.extraction)
+    for source in sources:
+        if not isinstance(source, Mapping):
+            continue
+        try:
+            duration = float(source.get("duration") or 0)
+        except (TypeError, ValueError):
+            continue
+        if duration > 0:
+            return duration
+    return None
+
+
+@dataclass(frozen=True)
+class JobDeadlines:
+    """How long one job may run, go without progress per phase, and go without a heartbeat."""
+
+    hard_timeout: float
+    idle_timeout: float
+    phase_idle: Mapping[str, float] = field(default_factory=dict)
+    heartbeat_timeout: float = HEARTBEAT_INTERVAL * HEARTBEAT_MISSES
+
+    @classmethod
+    def for_job(
+        cls,
+        spec: DownloadJobSpec,
+        *,
+        idle_timeout: float,
+        hard_timeout: float,
+        heartbeat_interval: float = HEARTBEAT_INTERVAL,
+    ) -> "JobDeadlines":
+        """Scale the deadlines to the track: `idle_timeout`/`hard_timeout` apply when its length is unknown."""
+        phase_idle = {phase: min(budget, idle_timeout) for phase, budget in PHASE_IDLE_TIMEOUTS.items()}
+        duration = track_duration(spec)
+        if duration is not None:
+            cost = FORMAT_COST.get(spec.format, 1.0)
+            if hard_timeout:
+                hard_timeout = HARD_TIMEOUT_BASE + duration * cost * HARD_TIMEOUT_PER_AUDIO_SECOND
+            phase_idle["postprocessing"] = max(idle_timeout, duration * cost * POSTPROCESS_IDLE_PER_AUDIO_SECOND)
+        return cls(
+            hard_timeout=hard_timeout,
+            idle_timeout=idle_timeout,
+            phase_idle=phase_idle,
+            heartbeat_timeout=heartbeat_interval * HEARTBEAT_MISSES,
+        )
+
+    def idle_budget(self, phase: str) -> float:
+        return self.phase_idle.get(phase, self.idle_timeout)
+
+    def describe(self) -> str:
+        budgets = " ".join(f"{phase}={seconds:g}" for phase, seconds in sorted(self.phase_idle.items()))
+        return f"hard={self.hard_timeout:g} idle={self.idle_timeout:g} {budgets}".rstrip()
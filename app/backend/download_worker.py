@@ -4,55 +4,304 @@ from __future__ import annotations
 
 import json
 import logging
+import os
 import sys
+import threading
+import time
 from copy import deepcopy
 from pathlib import Path
-from typing import Any
-
-from rapidfuzz import fuzz
-from spotdl.download.downloader import Downloader
-from spotdl.download.progress_handler import ProgressHandler
-from spotdl.types.song import Song
-from spotdl.utils.formatter import create_file_name
-from yt_dlp import YoutubeDL
+from typing import TYPE_CHECKING, Any, Callable, Optional
 
+from app.backend.covers import CoverFetchError, cover_key, default_cover_cache
+from app.backend.framing import FrameEncoder
 from app.backend.inputs import UnsupportedInputError, ensure_supported_single_track
-from app.backend.media import build_song_payload_from_external_info, extract_external_info
-from app.backend.protocol import OUTPUT_TEMPLATE
+from app.backend.media import (
+    build_song_payload_from_external_info,
+    extract_external_info,
+    usable_extraction,
+)
+from app.backend.profiling import run_profiled
+from app.backend.progress_table import ProgressTable
+from app.backend.protocol import DEFAULT_AUDIO_PROVIDERS, OUTPUT_TEMPLATE
 from app.backend.spotify import SpotifyConfigurationError, configure_spotify_client
 
+if TYPE_CHECKING:
+    from spotdl.download.downloader import Downloader
+    from spotdl.types.song import Song
+
+# spotDL, yt-dlp and rapidfuzz are imported on the code paths that need them so the
+# first protocol event goes out before the heavy imports, and cached-payload direct
+# downloads never load the YouTube search stack.
+
 LOGGER = logging.getLogger(__name__)
+PROGRESS_MIN_INTERVAL = max(0.0, float(os.getenv("SPOTDL_PROGRESS_INTERVAL", "0.25")))
+PROGRESS_MIN_DELTA = max(0.0, float(os.getenv("SPOTDL_PROGRESS_MIN_DELTA", "1.0")))
+PROVIDER_LABELS = {"youtube": "YouTube", "youtube-music": "YouTube Music", "piped": "Piped"}
+
+
+class _ProgressCoalescer:
+    """Hold back progress updates that are too soon or too small to be worth a pipe write.
+
+    A change of detail, a value of 100 and any non-progress event always go out, and
+    the newest held-back value is sent first so the parent never misses a final value.
+    """
+
+    def __init__(
+        self,
+        *,
+        min_interval: float = PROGRESS_MIN_INTERVAL,
+        min_delta: float = PROGRESS_MIN_DELTA,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.min_interval = min_interval
+        self.min_delta = min_delta
+        self._clock = clock
+        self._last: Optional[dict[str, Any]] = None
+        self._last_at = 0.0
+        self._pending: Optional[dict[str, Any]] = None
+
+    def offer(self, event: dict[str, Any]) -> list[dict[str, Any]]:
+        """Return the events to emit now for one progress update."""
+        last = self._pending or self._last
+        if last is not None and last["detail"] == event["detail"] and last["progress"] == event["progress"]:
+            return []
+
+        now = self._clock()
+        last = self._last
+        detail_changed = last is None or last["detail"] != event["detail"]
+        due = (
+            detail_changed
+            or event["progress"] >= 100.0
+            or (
+                now - self._last_at >= self.min_interval
+                and abs(event["progress"] - last["progress"]) >= self.min_delta
+            )
+        )
+        if not due:
+            self._pending = event
+            return []
 
-_LAST_PROGRESS_DETAIL: str | None = None
-_LAST_PROGRESS_VALUE: float | None = None
+        events = []
+        if detail_changed and self._pending is not None:
+            events.append(self._pending)
+        events.append(event)
+        self._pending = None
+        self._last = event
+        self._last_at = now
+        return events
 
+    def take_pending(self) -> Optional[dict[str, Any]]:
+        event, self._pending = self._pending, None
+        if event is not None:
+            self._last = event
+            self._last_at = self._clock()
+        return event
 
-def _emit(event: dict[str, object]) -> None:
+
+_PROGRESS = _ProgressCoalescer()
+
+
+class _PhaseClock:
+    """Accumulate wall time per worker phase for the stats sent with the final event."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._phase: Optional[str] = None
+        self._since = clock()
+        self._totals: dict[str, float] = {}
+
+    def enter(self, phase: str) -> None:
+        if phase == self._phase:
+            return
+        now = self._clock()
+        if self._phase is not None:
+            self._totals[self._phase] = self._totals.get(self._phase, 0.0) + now - self._since
+        self._phase = phase
+        self._since = now
+
+    @property
+    def phase(self) -> str:
+        return self._phase or "starting"
+
+    def seconds(self) -> dict[str, float]:
+        totals = dict(self._totals)
+        if self._phase is not None:
+            totals[self._phase] = totals.get(self._phase, 0.0) + self._clock() - self._since
+        return {phase: round(value, 3) for phase, value in totals.items()}
+
+
+_PHASE_CLOCK = _PhaseClock()
+
+
+def _write_json_line(event: dict[str, object]) -> None:
     print(json.dumps(event, ensure_ascii=True), flush=True)
 
 
+_write_event: Callable[[dict[str, object]], None] = _write_json_line
+# The heartbeat thread writes too, and events must never interleave on the pipe.
+_WRITE_LOCK = threading.Lock()
+_PROGRESS_SLOT: Optional[tuple[ProgressTable, int]] = None
+# Latest (downloaded, total) byte counts seen by the yt-dlp progress hook.
+_TRANSFER_BYTES = [0, 0]
+
+
+def _open_event_stream(payload: dict[str, Any]) -> None:
+    """Switch to length-prefixed frames when the parent negotiated binary framing."""
+    global _write_event
+    if payload.get("framing") != "binary":
+        return
+
+    encoder = FrameEncoder(str(payload.get("codec") or "json"))
+    sys.stdout.flush()
+    # Frames get a private copy of the pipe; stray prints from spotDL or yt-dlp go to
+    # stderr instead of landing in the middle of a frame.
+    stream = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    def write_frame(event: dict[str, object]) -> None:
+        stream.write(encoder.encode(event))
+        stream.flush()
+
+    _write_event = write_frame
+
+
+def _send(event: dict[str, object]) -> None:
+    with _WRITE_LOCK:
+        _write_event(event)
+
+
+def _start_heartbeats(payload: dict[str, Any]) -> threading.Event:
+    """Tell the parent this process is alive, and in which phase, even while spotDL is quiet."""
+    stop = threading.Event()
+    try:
+        interval = float(payload.get("heartbeat_interval") or 0)
+    except (TypeError, ValueError):
+        interval = 0.0
+    if interval <= 0:
+        return stop
+
+    def beat() -> None:
+        while not stop.wait(interval):
+            try:
+                _send({"type": "heartbeat", "phase": _PHASE_CLOCK.phase})
+            except (OSError, ValueError):
+                return
+
+    threading.Thread(target=beat, daemon=True, name="heartbeat").start()
+    return stop
+
+
+def _job_stats(event: dict[str, object]) -> dict[str, object]:
+    bytes_written = None
+    file_path = event.get("file_path")
+    if file_path:
+        try:
+            bytes_written = Path(str(file_path)).stat().st_size
+        except OSError:
+            pass
+    return {
+        "phase_seconds": _PHASE_CLOCK.seconds(),
+        "bytes_downloaded": _TRANSFER_BYTES[0] or None,
+        "bytes_written": bytes_written,
+    }
+
+
+def _emit(event: dict[str, object]) -> None:
+    if event.get("type") == "phase":
+        _PHASE_CLOCK.enter(str(event.get("phase") or "starting"))
+    elif event.get("type") in {"completed", "failed"}:
+        event = {**event, "stats": _job_stats(event)}
+    if event.get("type") != "progress":
+        pending = _PROGRESS.take_pending()
+        if pending is not None:
+            _send(pending)
+    _send(event)
+
+
+def _apply_limits(payload: dict[str, Any]) -> None:
+    """Apply the parent's per-worker rlimits; ffmpeg and other children inherit them."""
+    limits = payload.get("limits")
+    if not isinstance(limits, dict):
+        return
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - Windows only
+        return
+
+    memory_bytes = int(limits.get("memory_bytes") or 0)
+    cpu_seconds = int(limits.get("cpu_seconds") or 0)
+    try:
+        if memory_bytes:
+            resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+        if cpu_seconds:
+            # SIGXCPU at the soft limit; the hard limit only backs it up.
+            resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 5))
+    except (OSError, ValueError) as exc:
+        LOGGER.warning("Could not apply worker resource limits %s: %s", limits, exc)
+
+
+def _open_progress_slot(payload: dict[str, Any]) -> None:
+    """Publish progress into the supervisor's shared table instead of the event pipe."""
+    global _PROGRESS_SLOT
+    path = payload.get("progress_table")
+    slot = payload.get("progress_slot")
+    if not path or not isinstance(slot, int):
+        return
+    try:
+        table = ProgressTable.attach(str(path))
+    except OSError:
+        LOGGER.warning("Could not map progress table %s; streaming progress instead", path)
+        return
+    if 0 <= slot < table.slots:
+        _PROGRESS_SLOT = (table, slot)
+    else:
+        table.close()
+
+
+def _emit_startup(payload: dict[str, Any]) -> None:
+    """Report how long it took from spawn to this worker's first protocol event."""
+    event: dict[str, object] = {"type": "phase", "phase": "starting", "detail": "Worker started"}
+    try:
+        spawned_at = float(payload.get("spawned_at") or 0.0)
+    except (TypeError, ValueError):
+        spawned_at = 0.0
+    if spawned_at:
+        event["startup_ms"] = round(max(0.0, time.time() - spawned_at) * 1000.0, 1)
+    _emit(event)
+
+
 def _detail_to_phase(detail: str) -> str:
     lowered = detail.strip().lower()
     if "download" in lowered:
         return "downloading"
     if "convert" in lowered or "embed" in lowered:
         return "postprocessing"
-    if "process" in lowered or "search" in lowered or "resolv" in lowered:
+    if "search" in lowered:
+        return "searching"
+    if "resolv" in lowered:
         return "resolving"
+    # spotDL's "Processing" is yt-dlp extracting the matched URL, the start of the download.
     return "downloading"
 
 
 def _progress_callback(tracker, detail: str) -> None:
-    global _LAST_PROGRESS_DETAIL, _LAST_PROGRESS_VALUE
-
     progress = float(getattr(tracker, "progress", 0.0) or 0.0)
     progress_known = detail.strip().lower() != "processing"
-    if _LAST_PROGRESS_DETAIL == detail and _LAST_PROGRESS_VALUE == progress:
+    _PHASE_CLOCK.enter(_detail_to_phase(detail))
+    if _PROGRESS_SLOT is not None:
+        table, slot = _PROGRESS_SLOT
+        table.write(
+            slot,
+            phase=_detail_to_phase(detail),
+            detail=detail,
+            progress=progress,
+            progress_known=progress_known,
+            bytes_downloaded=_TRANSFER_BYTES[0],
+            bytes_total=_TRANSFER_BYTES[1],
+        )
         return
 
-    _LAST_PROGRESS_DETAIL = detail
-    _LAST_PROGRESS_VALUE = progress
-    _emit(
+    for event in _PROGRESS.offer(
         {
             "type": "progress",
             "phase": _detail_to_phase(detail),
@@ -60,7 +309,24 @@ def _progress_callback(tracker, detail: str) -> None:
             "progress": progress,
             "progress_known": progress_known,
         }
-    )
+    ):
+        _send(event)
+
+
+def _track_transfer_bytes(tracker_class) -> None:
+    """Record yt-dlp byte counts before spotDL folds them into a percentage."""
+    original = tracker_class.yt_dlp_progress_hook
+    if getattr(original, "records_bytes", False):
+        return
+
+    def yt_dlp_progress_hook(self, data: dict[str, Any]) -> None:
+        if data.get("status") == "downloading":
+            _TRANSFER_BYTES[0] = int(data.get("downloaded_bytes") or 0)
+            _TRANSFER_BYTES[1] = int(data.get("total_bytes") or data.get("total_bytes_estimate") or 0)
+        original(self, data)
+
+    yt_dlp_progress_hook.records_bytes = True
+    tracker_class.yt_dlp_progress_hook = yt_dlp_progress_hook
 
 
 def _build_downloader(
@@ -72,6 +338,11 @@ def _build_downloader(
     search_query: str | None,
     skip_album_art: bool,
 ) -> Downloader:
+    from spotdl.download.downloader import Downloader
+    from spotdl.download.progress_handler import ProgressHandler, SongTracker
+
+    _track_transfer_bytes(SongTracker)
+
     downloader = Downloader(
         {
             "audio_providers": [provider],
@@ -93,22 +364,55 @@ def _build_downloader(
     return downloader
 
 
-def _build_song(link: str, song_payload: dict[str, Any] | None) -> Song:
+def _build_song(
+    link: str,
+    song_payload: dict[str, Any] | None,
+    extraction: dict[str, Any] | None = None,
+) -> tuple[Song, dict[str, Any] | None]:
+    """Build the job's song and return any yt-dlp info the download can start from."""
     info = ensure_supported_single_track(link)
+    external_info = usable_extraction(extraction) if info.kind == "external_media" else None
 
     if song_payload is not None:
         _emit({"type": "phase", "phase": "starting", "detail": "Using cached metadata"})
-        return Song.from_dict(song_payload)
+
+    from spotdl.types.song import Song
+
+    if song_payload is not None:
+        return Song.from_dict(song_payload), external_info
 
     if info.kind == "spotify_track":
         _emit({"type": "phase", "phase": "resolving", "detail": "Resolving Spotify track"})
         configure_spotify_client()
-        return Song.from_url(info.normalized)
+        return Song.from_url(info.normalized), None
 
-    _emit({"type": "phase", "phase": "resolving", "detail": "Resolving direct media link"})
-    external_info = extract_external_info(info.normalized)
+    if external_info is not None:
+        _emit({"type": "phase", "phase": "starting", "detail": "Using cached extraction"})
+    else:
+        _emit({"type": "phase", "phase": "resolving", "detail": "Resolving direct media link"})
+        external_info = extract_external_info(info.normalized)
     payload = build_song_payload_from_external_info(info.normalized, external_info)
-    return Song.from_dict(payload)
+    return Song.from_dict(payload), external_info
+
+
+def _reuse_extraction(download_url: str, external_info: dict[str, Any]) -> None:
+    """Start spotDL's download from already-extracted formats instead of re-running yt-dlp."""
+    from spotdl.providers.audio.base import AudioProvider
+
+    extract_download_metadata = AudioProvider.get_download_metadata
+
+    def get_download_metadata(self, url: str, download: bool = False) -> dict[str, Any]:
+        if download and url == download_url:
+            try:
+                data = self.audio_handler.process_ie_result(deepcopy(external_info), download=True)
+            except Exception as exc:
+                LOGGER.warning("Cached extraction for %s was not usable (%s); re-extracting", url, exc)
+            else:
+                if data:
+                    return data
+        return extract_download_metadata(self, url, download)
+
+    AudioProvider.get_download_metadata = get_download_metadata
 
 
 def _apply_source_override(song: Song, source_url: str | None) -> None:
@@ -124,8 +428,52 @@ def _apply_source_override(song: Song, source_url: str | None) -> None:
     song.download_url = source_info.normalized
 
 
+class _CachedCoverRequests:
+    """Stand-in for spotDL's `requests` module that serves the cached cover original."""
+
+    def __init__(self, cover_url: str, cover_path: Path) -> None:
+        import requests
+
+        self._requests = requests
+        self._cover_url = cover_url
+        self._cover_path = cover_path
+
+    def get(self, url, *args, **kwargs):
+        if url == self._cover_url and self._cover_path.exists():
+            response = self._requests.Response()
+            response.status_code = 200
+            response.url = url
+            response._content = self._cover_path.read_bytes()
+            return response
+        return self._requests.get(url, *args, **kwargs)
+
+    def __getattr__(self, name: str):
+        return getattr(self._requests, name)
+
+
+def _reuse_cached_cover(song: Song) -> None:
+    """Embed album art from the parent's cover cache instead of fetching it again."""
+    cover_path = default_cover_cache.cached_original(song.cover_url)
+    if cover_path is None and song.list_url and song.cover_url:
+        # Playlist tracks often share an album; the first one to run caches its art for the rest.
+        try:
+            default_cover_cache.proxy_url(song.cover_url)
+            cover_path = default_cover_cache.original(cover_key(song.cover_url))
+        except (CoverFetchError, OSError) as exc:
+            LOGGER.warning("Could not cache cover art for %s: %s", song.display_name, exc)
+            return
+    if cover_path is None:
+        return
+
+    from spotdl.utils import metadata as spotdl_metadata
+
+    spotdl_metadata.requests = _CachedCoverRequests(str(song.cover_url), cover_path)
+
+
 def _expected_output_path(song: Song, output_template: str, format_name: str) -> Path:
     """Compute the deterministic final output path for the current job."""
+    from spotdl.utils.formatter import create_file_name
+
     return create_file_name(
         song=song,
         template=output_template,
@@ -192,6 +540,8 @@ def _search_queries_for_song(song: Song) -> list[str]:
 
 def _youtube_search_entries(query: str, *, limit: int = 5) -> list[dict[str, Any]]:
     """Search YouTube via yt-dlp and return flat entry metadata."""
+    from yt_dlp import YoutubeDL
+
     options = {
         "quiet": True,
         "no_warnings": True,
@@ -221,6 +571,8 @@ def _candidate_url(entry: dict[str, Any]) -> str:
 
 def _score_search_entry(song: Song, entry: dict[str, Any]) -> float:
     """Score a YouTube search result against the desired song metadata."""
+    from rapidfuzz import fuzz
+
     title = str(entry.get("title") or "")
     channel = str(entry.get("channel") or entry.get("uploader") or "")
     haystack = f"{title} {channel}"
@@ -291,88 +643,128 @@ def _resolve_download_url(song: Song) -> tuple[str | None, str | None]:
     return best_url, best_query
 
 
-def main() -> None:
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
-        stream=sys.stderr,
-    )
+def _provider_search(provider: str, song: Song) -> str | None:
+    """Let spotDL's own provider pick the match; retries rotate to these after YouTube fails."""
+    from spotdl.download.downloader import AUDIO_PROVIDERS
 
-    try:
-        payload = json.load(sys.stdin)
-        link = str(payload.get("link") or "").strip()
-        song_payload = payload.get("song_payload")
-        download_directory = Path(str(payload.get("download_directory") or "")).expanduser().resolve()
-        audio_providers = list(payload.get("audio_providers") or ("youtube-music", "piped", "youtube"))
-        format_name = str(payload.get("format") or "mp3")
-        source_url = str(payload.get("source_url") or "").strip() or None
-        output_template = str(download_directory / OUTPUT_TEMPLATE)
-        is_spotify_track = "open.spotify.com/track/" in link.lower()
-
-        song = _build_song(link, song_payload if isinstance(song_payload, dict) else None)
-        _apply_source_override(song, source_url)
-        song_seed = deepcopy(song.json)
-        bitrate = str(payload.get("bitrate") or "auto")
-
-        _emit({"type": "phase", "phase": "starting", "detail": "Preparing spotDL"})
-        if song.download_url is not None:
-            _emit({"type": "phase", "phase": "downloading", "detail": "Downloading direct media"})
-            downloader = _build_downloader(
-                provider=audio_providers[0],
-                bitrate=bitrate,
-                format_name=format_name,
-                output_template=output_template,
-                search_query=None,
-                skip_album_art=not is_spotify_track,
-            )
-            expected_output = _expected_output_path(song, output_template, format_name)
-            downloaded_song, output_path = downloader.download_song(song)
-            final_path = _finalize_output_path(downloaded_song, output_path, expected_output)
-            _emit({"type": "completed", "file_path": str(final_path)})
-            return
+    provider_class = AUDIO_PROVIDERS.get(provider)
+    if provider_class is None:
+        raise RuntimeError(f"Unknown audio provider: {provider}")
+    return provider_class().search(song)
 
-        _emit({"type": "phase", "phase": "resolving", "detail": "Searching YouTube"})
-        provider_song = Song.from_dict(deepcopy(song_seed))
-        resolved_url, query_used = _resolve_download_url(provider_song)
-        if not resolved_url:
-            if query_used:
-                LOGGER.warning(
-                    "No usable YouTube match for %s using query %r",
-                    provider_song.display_name,
-                    query_used,
-                )
-            raise RuntimeError(f"No results found for song: {provider_song.display_name}")
-
-        provider_song.download_url = resolved_url
-        _emit({"type": "phase", "phase": "resolving", "detail": "Matched YouTube"})
+
+def _download(payload: dict[str, Any]) -> None:
+    link = str(payload.get("link") or "").strip()
+    song_payload = payload.get("song_payload")
+    download_directory = Path(str(payload.get("download_directory") or "")).expanduser().resolve()
+    audio_providers = list(payload.get("audio_providers") or DEFAULT_AUDIO_PROVIDERS)
+    format_name = str(payload.get("format") or "mp3")
+    source_url = str(payload.get("source_url") or "").strip() or None
+    output_template = str(download_directory / OUTPUT_TEMPLATE)
+    is_spotify_track = "open.spotify.com/track/" in link.lower()
+
+    song, external_info = _build_song(
+        link,
+        song_payload if isinstance(song_payload, dict) else None,
+        payload.get("extraction"),
+    )
+    _apply_source_override(song, source_url)
+    _reuse_cached_cover(song)
+    if external_info is not None and song.download_url == link:
+        _reuse_extraction(link, external_info)
+    song_seed = deepcopy(song.json)
+    bitrate = str(payload.get("bitrate") or "auto")
+
+    if song.download_url is not None:
+        _emit({"type": "phase", "phase": "downloading", "detail": "Downloading direct media"})
         downloader = _build_downloader(
-            provider="youtube",
+            provider=audio_providers[0],
             bitrate=bitrate,
             format_name=format_name,
             output_template=output_template,
             search_query=None,
-            skip_album_art=False,
+            skip_album_art=not is_spotify_track,
         )
-        expected_output = _expected_output_path(provider_song, output_template, format_name)
-        downloaded_song, output_path = downloader.download_song(provider_song)
-
-        try:
-            final_path = _finalize_output_path(downloaded_song, output_path, expected_output)
-        except RuntimeError:
-            provider_error = downloader.errors[-1] if downloader.errors else ""
-            if provider_error:
-                raise RuntimeError(provider_error.split(": ", 1)[-1]) from None
-            raise RuntimeError("YouTube did not return a downloadable result.") from None
-
+        expected_output = _expected_output_path(song, output_template, format_name)
+        downloaded_song, output_path = downloader.download_song(song)
+        final_path = _finalize_output_path(downloaded_song, output_path, expected_output)
         _emit({"type": "completed", "file_path": str(final_path)})
         return
+
+    provider = audio_providers[0]
+    provider_label = PROVIDER_LABELS.get(provider, provider)
+    _emit({"type": "phase", "phase": "searching", "detail": f"Searching {provider_label}"})
+    provider_song = type(song).from_dict(deepcopy(song_seed))
+    if provider == "youtube":
+        resolved_url, query_used = _resolve_download_url(provider_song)
+    else:
+        resolved_url, query_used = _provider_search(provider, provider_song), None
+    if not resolved_url:
+        if query_used:
+            LOGGER.warning(
+                "No usable YouTube match for %s using query %r",
+                provider_song.display_name,
+                query_used,
+            )
+        raise RuntimeError(f"No results found for song: {provider_song.display_name}")
+
+    provider_song.download_url = resolved_url
+    _emit({"type": "phase", "phase": "searching", "detail": f"Matched {provider_label}"})
+    downloader = _build_downloader(
+        provider=provider,
+        bitrate=bitrate,
+        format_name=format_name,
+        output_template=output_template,
+        search_query=None,
+        skip_album_art=False,
+    )
+    expected_output = _expected_output_path(provider_song, output_template, format_name)
+    downloaded_song, output_path = downloader.download_song(provider_song)
+
+    try:
+        final_path = _finalize_output_path(downloaded_song, output_path, expected_output)
+    except RuntimeError:
+        provider_error = downloader.errors[-1] if downloader.errors else ""
+        if provider_error:
+            raise RuntimeError(provider_error.split(": ", 1)[-1]) from None
+        raise RuntimeError(f"{provider_label} did not return a downloadable result.") from None
+
+    _emit({"type": "completed", "file_path": str(final_path)})
+
+
+def main() -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+        stream=sys.stderr,
+    )
+
+    heartbeats = threading.Event()
+    try:
+        payload = json.load(sys.stdin)
+        _open_event_stream(payload)
+        _open_progress_slot(payload)
+        _apply_limits(payload)
+        _emit_startup(payload)
+        heartbeats = _start_heartbeats(payload)
+        profile_mode = payload.get("profile")
+        if profile_mode and payload.get("profile_path"):
+            run_profiled(
+                lambda: _download(payload),
+                mode=str(profile_mode),
+                path=Path(str(payload["profile_path"])),
+            )
+        else:
+            _download(payload)
     except UnsupportedInputError as exc:
-        _emit({"type": "failed", "error": str(exc)})
+        _emit({"type": "failed", "error": str(exc), "code": "unsupported_input"})
     except SpotifyConfigurationError as exc:
-        _emit({"type": "failed", "error": str(exc)})
+        _emit({"type": "failed", "error": str(exc), "code": "missing_spotify_credentials"})
     except Exception as exc:
         LOGGER.exception("Download worker failed")
-        _emit({"type": "failed", "error": str(exc) or "Download failed."})
+        _emit({"type": "failed", "error": str(exc) or "Download failed.", "code": "download_error"})
+    finally:
+        heartbeats.set()
 
 
 if __name__ == "__main__":
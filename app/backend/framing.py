@@ -0,0 +1,166 @@
+"""Length-prefixed binary framing for the worker event protocol.
+
+The parent opts in per job by sending `"framing": "binary"` and a `"codec"` in the
+worker payload. Every frame is a 5-byte header (record kind, body length) followed by
+the body. Progress updates use a fixed struct plus the detail text, so the parent can
+turn them into `ProgressRecord`s without building a dict; every other event is one
+codec-encoded object.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+from dataclasses import dataclass
+from typing import Any, Callable, Union
+
+WORKER_FRAMING = os.getenv("SPOTDL_WORKER_FRAMING", "lines").strip().lower()
+FRAME_HEADER = struct.Struct("!BI")
+PROGRESS_BODY = struct.Struct("!dBB")
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+
+KIND_EVENT = 1
+KIND_PROGRESS = 2
+
+# Progress phases travel as one byte; unknown phases fall back to index 0.
+PROGRESS_PHASES = ("downloading", "resolving", "postprocessing", "searching")
+_PHASE_INDEX = {phase: index for index, phase in enumerate(PROGRESS_PHASES)}
+_FLAG_PROGRESS_KNOWN = 1
+
+
+class FrameError(ValueError):
+    """Raised when a framed stream is corrupt or uses an unknown record kind."""
+
+
+@dataclass(frozen=True, slots=True)
+class ProgressRecord:
+    """Typed progress update decoded straight from a binary frame."""
+
+    phase: str
+    detail: str
+    progress: float
+    progress_known: bool
+
+    type = "progress"
+
+    def to_event(self) -> dict[str, object]:
+        return {
+            "type": "progress",
+            "phase": self.phase,
+            "detail": self.detail,
+            "progress": self.progress,
+            "progress_known": self.progress_known,
+        }
+
+
+WorkerEvent = Union[dict[str, Any], ProgressRecord]
+
+
+def _json_dumps(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _codecs() -> dict[str, tuple[Callable[[Any], bytes], Callable[[bytes], Any]]]:
+    codecs: dict[str, tuple[Callable[[Any], bytes], Callable[[bytes], Any]]] = {}
+    try:
+        import orjson
+    except ImportError:
+        pass
+    else:
+        codecs["orjson"] = (orjson.dumps, orjson.loads)
+    try:
+        import msgpack
+    except ImportError:
+        pass
+    else:
+        codecs["msgpack"] = (msgpack.packb, msgpack.unpackb)
+    codecs["json"] = (_json_dumps, json.loads)
+    return codecs
+
+
+_CODECS = _codecs()
+
+
+def preferred_codec() -> str:
+    """Return the fastest codec importable here; `json` is always available."""
+    return next(iter(_CODECS))
+
+
+def resolve_codec(name: object) -> str:
+    return name if isinstance(name, str) and name in _CODECS else "json"
+
+
+def binary_framing_enabled() -> bool:
+    return WORKER_FRAMING == "binary"
+
+
+class FrameEncoder:
+    """Worker-side encoder that turns protocol events into frames."""
+
+    def __init__(self, codec: str = "json") -> None:
+        self.codec = resolve_codec(codec)
+        self._dumps = _CODECS[self.codec][0]
+
+    def encode(self, event: dict[str, Any]) -> bytes:
+        if event.get("type") == "progress":
+            detail = str(event.get("detail") or "").encode("utf-8")
+            body = PROGRESS_BODY.pack(
+                float(event.get("progress") or 0.0),
+                _FLAG_PROGRESS_KNOWN if event.get("progress_known") else 0,
+                _PHASE_INDEX.get(str(event.get("phase") or ""), 0),
+            ) + detail
+            return FRAME_HEADER.pack(KIND_PROGRESS, len(body)) + body
+
+        body = self._dumps(event)
+        return FRAME_HEADER.pack(KIND_EVENT, len(body)) + body
+
+
+class FrameDecoder:
+    """Parent-side incremental decoder; feed it raw pipe bytes, get whole events back."""
+
+    def __init__(self, codec: str = "json") -> None:
+        self.codec = resolve_codec(codec)
+        self._loads = _CODECS[self.codec][1]
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> list[WorkerEvent]:
+        buffer = self._buffer
+        buffer += data
+        events: list[WorkerEvent] = []
+        offset = 0
+        header_size = FRAME_HEADER.size
+        while len(buffer) - offset >= header_size:
+            kind, length = FRAME_HEADER.unpack_from(buffer, offset)
+            if length > MAX_FRAME_BYTES:
+                raise FrameError(f"frame of {length} bytes exceeds the protocol limit")
+            start = offset + header_size
+            end = start + length
+            if end > len(buffer):
+                break
+            offset = end
+
+            if kind == KIND_PROGRESS:
+                progress, flags, phase_index = PROGRESS_BODY.unpack_from(buffer, start)
+                events.append(ProgressRecord(
+                    PROGRESS_PHASES[phase_index] if phase_index < len(PROGRESS_PHASES) else PROGRESS_PHASES[0],
+                    bytes(buffer[start + PROGRESS_BODY.size:end]).decode("utf-8", "replace"),
+                    progress,
+                    bool(flags & _FLAG_PROGRESS_KNOWN),
+                ))
+            elif kind == KIND_EVENT:
+                try:
+                    event = self._loads(bytes(buffer[start:end]))
+                except ValueError as exc:
+                    raise FrameError(f"undecodable {self.codec} event frame") from exc
+                if not isinstance(event, dict) or not isinstance(event.get("type"), str):
+                    raise FrameError("event frame is not an object with a string 'type'")
+                events.append(event)
+            else:
+                raise FrameError(f"unknown frame kind {kind}")
+        del buffer[:offset]
+        return events
+
+    @property
+    def pending_bytes(self) -> int:
+        return len(self._buffer)
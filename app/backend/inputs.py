@@ -7,6 +7,8 @@ from dataclasses import dataclass
 from urllib.parse import urlsplit, urlunsplit
 
 SPOTIFY_INTL_PATTERN = re.compile(r"/intl-\w+/")
+# Links that expand into one download job per track.
+COLLECTION_KINDS = frozenset({"spotify_collection", "external_collection"})
 
 
 class UnsupportedInputError(ValueError):
@@ -46,17 +48,22 @@ def classify_link(link: str) -> LinkInfo:
         spotify_track = urlunsplit((parsed.scheme, parsed.netloc, parsed.path, "", ""))
         return LinkInfo(original=link, normalized=spotify_track, kind="spotify_track")
 
+    if "open.spotify.com/playlist/" in lower or "open.spotify.com/album/" in lower:
+        parsed = urlsplit(normalized)
+        collection = urlunsplit((parsed.scheme, parsed.netloc, parsed.path.rstrip("/"), "", ""))
+        return LinkInfo(original=link, normalized=collection, kind="spotify_collection")
+
     if "open.spotify.com/" in lower:
         return LinkInfo(original=link, normalized=normalized, kind="spotify_unsupported")
 
     if "youtube.com/playlist" in lower or "music.youtube.com/playlist" in lower:
-        return LinkInfo(original=link, normalized=normalized, kind="external_unsupported")
+        return LinkInfo(original=link, normalized=normalized, kind="external_collection")
 
     if "soundcloud.com/" in lower and "/sets/" in lower:
-        return LinkInfo(original=link, normalized=normalized, kind="external_unsupported")
+        return LinkInfo(original=link, normalized=normalized, kind="external_collection")
 
     if "bandcamp.com/album/" in lower:
-        return LinkInfo(original=link, normalized=normalized, kind="external_unsupported")
+        return LinkInfo(original=link, normalized=normalized, kind="external_collection")
 
     return LinkInfo(original=link, normalized=normalized, kind="external_media")
 
@@ -66,15 +73,19 @@ def ensure_supported_single_track(link: str) -> LinkInfo:
     info = classify_link(link)
     if info.kind == "spotify_track":
         return info
+    if info.kind in COLLECTION_KINDS:
+        raise UnsupportedInputError("Playlist and album links expand into one download per track.")
     if info.kind == "spotify_unsupported":
-        raise UnsupportedInputError(
-            "Spotify playlists, albums, and artists are not supported in this version."
-        )
-    if info.kind == "external_unsupported":
-        raise UnsupportedInputError(
-            "Playlist and collection links are not supported in this version."
-        )
+        raise UnsupportedInputError("Spotify artists, shows and episodes are not supported in this version.")
     if info.kind == "external_media":
         return info
     raise UnsupportedInputError("Only direct Spotify track links and direct media links are supported.")
 
+
+def ensure_supported_link(link: str) -> LinkInfo:
+    """Validate a row link: a single track, or a playlist or album that expands into tracks."""
+    info = classify_link(link)
+    if info.kind in COLLECTION_KINDS:
+        return info
+    return ensure_supported_single_track(link)
+
@@ -0,0 +1,135 @@
+"""Shared background writer that batches per-job log lines off the monitor hot loop."""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional, TextIO
+
+LOGGER = logging.getLogger(__name__)
+JOB_LOG_FLUSH_INTERVAL = max(0.05, float(os.getenv("SPOTDL_JOB_LOG_FLUSH_INTERVAL", "0.5")))
+JOB_LOG_FLUSH_BYTES = max(1024, int(os.getenv("SPOTDL_JOB_LOG_FLUSH_BYTES", "65536")))
+
+
+class _PendingLog:
+    __slots__ = ("path", "handle", "lines", "size", "closing", "closed")
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.handle: Optional[TextIO] = None
+        self.lines: list[tuple[float, str, str]] = []
+        self.size = 0
+        self.closing = False
+        self.closed = threading.Event()
+
+
+class JobLog:
+    """Append-only handle for one job's log; lines reach disk in batches."""
+
+    def __init__(self, writer: "JobLogWriter", entry: _PendingLog) -> None:
+        self._writer = writer
+        self._entry = entry
+
+    @property
+    def path(self) -> Path:
+        return self._entry.path
+
+    def write(self, kind: str, message: str) -> None:
+        self._writer._enqueue(self._entry, kind, message)  # noqa: SLF001
+
+    def close(self, *, timeout: float = 2.0) -> None:
+        """Flush everything written so far and release the file handle."""
+        self._writer._close(self._entry, timeout)  # noqa: SLF001
+
+
+class JobLogWriter:
+    """Buffer log lines per job and flush them on a timer, a size threshold, or job end."""
+
+    def __init__(
+        self,
+        *,
+        flush_interval: float = JOB_LOG_FLUSH_INTERVAL,
+        flush_bytes: int = JOB_LOG_FLUSH_BYTES,
+    ) -> None:
+        self.flush_interval = flush_interval
+        self.flush_bytes = flush_bytes
+        self._entries: list[_PendingLog] = []
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def open(self, path: Path) -> JobLog:
+        entry = _PendingLog(Path(path))
+        with self._condition:
+            self._entries.append(entry)
+            self._ensure_thread()
+        return JobLog(self, entry)
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, daemon=True, name="job-log-writer")
+            self._thread.start()
+
+    def _enqueue(self, entry: _PendingLog, kind: str, message: str) -> None:
+        # Only the raw parts are captured here; formatting happens on the writer thread.
+        with self._condition:
+            entry.lines.append((time.time(), kind, message))
+            entry.size += len(message) + 48
+            if entry.size >= self.flush_bytes:
+                self._condition.notify()
+
+    def _close(self, entry: _PendingLog, timeout: float) -> None:
+        with self._condition:
+            entry.closing = True
+            self._ensure_thread()
+            self._condition.notify()
+        entry.closed.wait(timeout)
+
+    def _take(self, entry: _PendingLog) -> tuple[list[tuple[float, str, str]], bool]:
+        # Read `closing` under the same lock so no line written before close() is dropped.
+        with self._condition:
+            lines, entry.lines, entry.size = entry.lines, [], 0
+            return lines, entry.closing
+
+    def _write(self, entry: _PendingLog, lines: list[tuple[float, str, str]]) -> None:
+        if not lines:
+            return
+        chunk = "".join(
+            f"{datetime.fromtimestamp(created, timezone.utc).isoformat()} {kind} {message}\n"
+            for created, kind, message in lines
+        )
+        try:
+            if entry.handle is None:
+                entry.path.parent.mkdir(parents=True, exist_ok=True)
+                entry.handle = entry.path.open("a", encoding="utf-8")
+            entry.handle.write(chunk)
+            entry.handle.flush()
+        except OSError:
+            LOGGER.warning("Could not write job log %s", entry.path, exc_info=True)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: any(entry.closing or entry.size >= self.flush_bytes for entry in self._entries),
+                    timeout=self.flush_interval,
+                )
+                entries = list(self._entries)
+
+            for entry in entries:
+                lines, closing = self._take(entry)
+                self._write(entry, lines)
+                if closing:
+                    if entry.handle is not None:
+                        entry.handle.close()
+                        entry.handle = None
+                    with self._condition:
+                        if entry in self._entries:
+                            self._entries.remove(entry)
+                    entry.closed.set()
+
+
+default_job_log_writer = JobLogWriter()
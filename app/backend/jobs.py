@@ -2,24 +2,99 @@
 
 from __future__ import annotations
 
+import atexit
+import heapq
+import itertools
 import logging
+import os
 import threading
 import time
 import uuid
-from collections import deque
-from dataclasses import dataclass, field
+from collections import Counter, OrderedDict, deque
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Callable, Optional
+from typing import Callable, Iterable, Mapping, Optional, Sequence
+from urllib.parse import urlsplit
 
-from app.backend.inputs import ensure_supported_single_track
+from app.backend.admission import Overloaded, retry_after_for
+from app.backend.deadlines import track_duration
+from app.backend.framing import ProgressRecord, WorkerEvent
+from app.backend.inputs import (
+    COLLECTION_KINDS,
+    LinkInfo,
+    UnsupportedInputError,
+    ensure_supported_link,
+    ensure_supported_single_track,
+)
 from app.backend.metadata import MetadataService
+from app.backend.metrics import JOB_PHASE_SECONDS, JOB_RETRIES, JOBS_FINISHED
 from app.backend.os import reveal_in_file_manager
+from app.backend.playlists import (
+    COLLECTION_CONCURRENCY,
+    COLLECTION_WINDOW,
+    FINISHED_COLLECTIONS,
+    CollectionError,
+    CollectionExpander,
+    CollectionJob,
+)
+from app.backend.profiling import sampled_profile_mode
+from app.backend.progress_table import ProgressTable, progress_table_enabled
 from app.backend.protocol import DownloadJobSpec
+from app.backend.retries import RetryDecision, RetryPolicy, rotate_providers
 from app.backend.settings import DownloadRequest
-from app.backend.workers import WorkerMonitor, WorkerOutcome, job_log_path
+from app.backend.timings import PhaseTimings, ResourceLog, phase_breakdown
+from app.backend.workers import (
+    WORKER_TERMINATE_GRACE,
+    JobResources,
+    WorkerMonitor,
+    WorkerOutcome,
+    job_log_path,
+)
 
 LOGGER = logging.getLogger(__name__)
 
+MAX_QUEUED_DOWNLOADS = max(1, int(os.getenv("SPOTDL_MAX_QUEUED_DOWNLOADS", "1000")))
+# Assumed worker run time before any job has finished, for `Retry-After` estimates.
+DEFAULT_JOB_SECONDS = 30.0
+# Which queued download starts next: fifo, priority, sjf or fair (see `SCHEDULING_POLICIES`).
+SCHEDULING_POLICY = os.getenv("SPOTDL_SCHEDULER", "fifo").strip().lower()
+# Workers one source (Spotify, or a direct media host) may hold at once; 0 means no cap.
+MAX_ACTIVE_PER_SOURCE = max(0, int(os.getenv("SPOTDL_MAX_ACTIVE_PER_SOURCE", "0")))
+# Shortest-job-first ranks tracks of unknown length as if they were this long.
+UNKNOWN_TRACK_SECONDS = 240.0
+# Shortest-job-first takes this many seconds off a job's length per second it has waited,
+# so long mixes still start once they have waited about as long as they run.
+SJF_AGING = 1.0
+MAX_TRACKED_SOURCES = 1024
+
+
+class DownloadQueueFull(Overloaded):
+    """Raised when the download queue is at `max_queued` and cannot take another job."""
+
+    code = "download_queue_full"
+
+
+@dataclass(frozen=True)
+class JobRetry:
+    """One failed attempt that was scheduled to run again."""
+
+    attempt: int
+    reason: str
+    delay: float
+    error_class: Optional[str]
+    error_message: str
+    at: float = field(default_factory=time.time)
+
+    def to_payload(self) -> dict[str, object]:
+        return {
+            "attempt": self.attempt,
+            "reason": self.reason,
+            "delay": round(self.delay, 3),
+            "error_class": self.error_class,
+            "error_message": self.error_message,
+            "at": self.at,
+        }
+
 
 @dataclass
 class JobSnapshot:
@@ -33,9 +108,14 @@ class JobSnapshot:
     progress: float = 0.0
     progress_known: bool = False
     error_message: Optional[str] = None
+    error_class: Optional[str] = None
     file_path: Optional[str] = None
     log_path: Optional[str] = None
     stderr_tail: tuple[str, ...] = ()
+    resources: Optional[JobResources] = None
+    timeline: list[tuple[str, float]] = field(default_factory=list)
+    attempt: int = 1
+    retries: list[JobRetry] = field(default_factory=list)
     created_at: float = field(default_factory=time.time)
     updated_at: float = field(default_factory=time.time)
 
@@ -71,14 +151,40 @@ class JobStore:
             "progress": snapshot.progress,
             "progress_known": snapshot.progress_known,
             "error_message": snapshot.error_message,
+            "error_class": snapshot.error_class,
             "file_path": file_path,
             "can_reveal": can_reveal,
             "log_path": snapshot.log_path,
             "stderr_tail": list(snapshot.stderr_tail),
+            "resources": snapshot.resources.to_payload() if snapshot.resources else None,
+            "phase_seconds": JobStore.phase_seconds(snapshot),
+            "attempt": snapshot.attempt,
+            "retries": [retry.to_payload() for retry in snapshot.retries],
             "created_at": snapshot.created_at,
             "updated_at": snapshot.updated_at,
         }
 
+    @staticmethod
+    def _mark_phase(snapshot: JobSnapshot, phase: str, at: Optional[float] = None) -> None:
+        if not snapshot.timeline or snapshot.timeline[-1][0] != phase:
+            snapshot.timeline.append((phase, time.time() if at is None else at))
+
+    @staticmethod
+    def phase_seconds(snapshot: JobSnapshot) -> dict[str, float]:
+        worker_seconds = snapshot.resources.phase_seconds if snapshot.resources else None
+        return phase_breakdown(snapshot.timeline, worker_seconds)
+
+    def job_count(self) -> int:
+        with self._lock:
+            return len(self._jobs)
+
+    def forget(self, link: str, job_id: str) -> None:
+        """Drop a finished job's snapshot, unless `link` has been queued again since."""
+        with self._lock:
+            stored = self._jobs.get(link)
+            if stored is not None and stored.snapshot.job_id == job_id:
+                del self._jobs[link]
+
     def snapshot(self, link: str) -> Optional[JobSnapshot]:
         with self._lock:
             stored = self._jobs.get(link)
@@ -94,6 +200,7 @@ class JobStore:
                 detail="Queued",
                 log_path=str(job_log_path(job_id)),
             )
+            self._mark_phase(snapshot, "queued", snapshot.created_at)
             stored = _StoredJob(snapshot=snapshot)
             stored.events.append("Queued")
             self._jobs[link] = stored
@@ -108,38 +215,64 @@ class JobStore:
             snapshot.phase = "starting"
             snapshot.detail = "Launching worker"
             snapshot.updated_at = time.time()
+            self._mark_phase(snapshot, "launching", snapshot.updated_at)
             self._append_event(stored, snapshot.detail)
 
     def apply_worker_event(self, link: str, job_id: str, event: dict[str, object]) -> None:
+        self.apply_worker_events(link, job_id, (event,))
+
+    def apply_worker_events(
+        self,
+        link: str,
+        job_id: str,
+        events: Iterable[WorkerEvent],
+    ) -> None:
+        """Apply a burst of worker events under a single lock acquisition."""
         with self._lock:
             stored = self._jobs.get(link)
             if stored is None or stored.snapshot.job_id != job_id:
                 return
 
             snapshot = stored.snapshot
-            event_type = str(event.get("type") or "")
-            detail = str(event.get("detail") or "").strip()
-
-            if event_type == "phase":
-                snapshot.status = "downloading"
-                snapshot.phase = str(event.get("phase") or snapshot.phase or "starting")
-                snapshot.detail = detail or snapshot.detail or snapshot.phase.title()
-                snapshot.progress_known = False
-            elif event_type == "progress":
-                snapshot.status = "downloading"
-                snapshot.phase = str(event.get("phase") or snapshot.phase or "downloading")
-                snapshot.detail = detail or snapshot.detail or "Downloading"
-                try:
-                    snapshot.progress = float(event.get("progress") or 0.0)
-                except (TypeError, ValueError):
-                    snapshot.progress = 0.0
-                snapshot.progress_known = bool(event.get("progress_known"))
-            elif event_type == "log":
-                self._append_event(stored, detail)
+            for event in events:
+                if isinstance(event, ProgressRecord):
+                    snapshot.status = "downloading"
+                    snapshot.phase = event.phase
+                    snapshot.detail = event.detail or snapshot.detail or "Downloading"
+                    snapshot.progress = event.progress
+                    snapshot.progress_known = event.progress_known
+                    self._mark_phase(snapshot, snapshot.phase)
+                    if snapshot.detail and (not stored.events or stored.events[-1] != snapshot.detail):
+                        self._append_event(stored, snapshot.detail)
+                    continue
+
+                event_type = str(event.get("type") or "")
+                detail = str(event.get("detail") or "").strip()
+
+                if event_type == "phase":
+                    snapshot.status = "downloading"
+                    snapshot.phase = str(event.get("phase") or snapshot.phase or "starting")
+                    snapshot.detail = detail or snapshot.detail or snapshot.phase.title()
+                    snapshot.progress_known = False
+                elif event_type == "progress":
+                    snapshot.status = "downloading"
+                    snapshot.phase = str(event.get("phase") or snapshot.phase or "downloading")
+                    snapshot.detail = detail or snapshot.detail or "Downloading"
+                    try:
+                        snapshot.progress = float(event.get("progress") or 0.0)
+                    except (TypeError, ValueError):
+                        snapshot.progress = 0.0
+                    snapshot.progress_known = bool(event.get("progress_known"))
+                elif event_type == "log":
+                    self._append_event(stored, detail)
+                if event_type in {"phase", "progress"}:
+                    self._mark_phase(snapshot, snapshot.phase)
+
+                # Progress repeats its detail on every update; keep one history entry per run.
+                if snapshot.detail and (not stored.events or stored.events[-1] != snapshot.detail):
+                    self._append_event(stored, snapshot.detail)
 
             snapshot.updated_at = time.time()
-            if snapshot.detail:
-                self._append_event(stored, snapshot.detail)
 
     def mark_done(
         self,
@@ -149,6 +282,7 @@ class JobStore:
         *,
         log_path: Optional[str] = None,
         stderr_tail: tuple[str, ...] = (),
+        resources: Optional[JobResources] = None,
     ) -> None:
         with self._lock:
             stored = self._jobs.get(link)
@@ -164,7 +298,9 @@ class JobStore:
             snapshot.file_path = file_path
             snapshot.log_path = log_path or snapshot.log_path
             snapshot.stderr_tail = tuple(stderr_tail)
+            snapshot.resources = resources
             snapshot.updated_at = time.time()
+            self._mark_phase(snapshot, "completed", snapshot.updated_at)
             self._append_event(stored, f"Completed: {file_path}")
 
     def mark_failed(
@@ -175,6 +311,8 @@ class JobStore:
         *,
         log_path: Optional[str] = None,
         stderr_tail: tuple[str, ...] = (),
+        resources: Optional[JobResources] = None,
+        error_class: Optional[str] = None,
     ) -> None:
         with self._lock:
             stored = self._jobs.get(link)
@@ -182,16 +320,79 @@ class JobStore:
                 return
             snapshot = stored.snapshot
             snapshot.status = "error"
+            snapshot.error_class = error_class
             snapshot.phase = "failed"
             snapshot.detail = message
             snapshot.error_message = message
             snapshot.log_path = log_path or snapshot.log_path
             snapshot.stderr_tail = tuple(stderr_tail)
+            snapshot.resources = resources
             snapshot.progress_known = False
             snapshot.updated_at = time.time()
+            self._mark_phase(snapshot, "failed", snapshot.updated_at)
             self._append_event(stored, f"Failed: {message}")
 
-    def mark_cancelled(self, link: str, job_id: str) -> None:
+    def mark_retrying(
+        self,
+        link: str,
+        job_id: str,
+        retry_job_id: str,
+        decision: RetryDecision,
+        *,
+        max_attempts: int,
+        error_message: str,
+        error_class: Optional[str] = None,
+        stderr_tail: tuple[str, ...] = (),
+    ) -> None:
+        """Record a failed attempt and hand the row over to the job id of the next one."""
+        with self._lock:
+            stored = self._jobs.get(link)
+            if stored is None or stored.snapshot.job_id != job_id:
+                return
+            snapshot = stored.snapshot
+            snapshot.retries.append(
+                JobRetry(
+                    attempt=snapshot.attempt,
+                    reason=decision.reason,
+                    delay=decision.delay,
+                    error_class=error_class,
+                    error_message=error_message,
+                )
+            )
+            snapshot.job_id = retry_job_id
+            snapshot.attempt = decision.attempt
+            snapshot.status = "queued"
+            snapshot.phase = "retrying"
+            snapshot.detail = (
+                f"Retrying in {decision.delay:.0f}s (attempt {decision.attempt} of {max_attempts}): {error_message}"
+            )
+            snapshot.progress = 0.0
+            snapshot.progress_known = False
+            snapshot.stderr_tail = tuple(stderr_tail)
+            snapshot.log_path = str(job_log_path(retry_job_id))
+            snapshot.updated_at = time.time()
+            self._mark_phase(snapshot, "retrying", snapshot.updated_at)
+            self._append_event(stored, snapshot.detail)
+
+    def mark_requeued(self, link: str, job_id: str) -> None:
+        with self._lock:
+            stored = self._jobs.get(link)
+            if stored is None or stored.snapshot.job_id != job_id:
+                return
+            snapshot = stored.snapshot
+            snapshot.phase = "queued"
+            snapshot.detail = f"Queued (attempt {snapshot.attempt})"
+            snapshot.updated_at = time.time()
+            self._mark_phase(snapshot, "queued", snapshot.updated_at)
+            self._append_event(stored, snapshot.detail)
+
+    def mark_cancelled(
+        self,
+        link: str,
+        job_id: str,
+        *,
+        resources: Optional[JobResources] = None,
+    ) -> None:
         with self._lock:
             stored = self._jobs.get(link)
             if stored is None or stored.snapshot.job_id != job_id:
@@ -204,7 +405,9 @@ class JobStore:
             snapshot.progress_known = False
             snapshot.error_message = None
             snapshot.file_path = None
+            snapshot.resources = resources
             snapshot.updated_at = time.time()
+            self._mark_phase(snapshot, "cancelled", snapshot.updated_at)
             self._append_event(stored, "Cancelled")
 
     def status_payloads(self, links: list[str]) -> dict[str, dict[str, object]]:
@@ -233,6 +436,151 @@ class _QueueEntry:
     link: str
     job_id: str
     spec: DownloadJobSpec
+    attempt: int = 1
+    seq: int = 0
+    source: str = "unknown"
+    priority: int = 0
+    duration: Optional[float] = None
+    queued_at: float = field(default_factory=time.monotonic)
+    # Link of the playlist or album this track was listed from, if any.
+    collection: Optional[str] = None
+
+
+def job_source(info: LinkInfo, source_url: Optional[str] = None) -> str:
+    """Group key for fair share and per-source caps: `spotify`, or the host media comes from."""
+    if info.kind == "spotify_track" and not source_url:
+        return "spotify"
+    host = urlsplit(source_url or info.normalized).hostname or "unknown"
+    return host.removeprefix("www.").removeprefix("m.")
+
+
+class SchedulingPolicy:
+    """Decide which queued download starts when a worker slot frees up.
+
+    `select` returns the index of the entry to start, or `None` when every entry is held
+    back by `max_active_per_source`. Policies that rank entries override `rank`; the
+    lowest rank starts first.
+    """
+
+    name = "base"
+
+    def __init__(self, *, max_active_per_source: int = MAX_ACTIVE_PER_SOURCE) -> None:
+        self.max_active_per_source = max(0, max_active_per_source)
+
+    def _eligible(self, entry: _QueueEntry, active_sources: Mapping[str, int]) -> bool:
+        return not self.max_active_per_source or active_sources.get(entry.source, 0) < self.max_active_per_source
+
+    def rank(self, entry: _QueueEntry, now: float) -> tuple:
+        return (entry.seq,)
+
+    def order(self, queue: Sequence[_QueueEntry], now: float) -> list[_QueueEntry]:
+        """Return the queue in the order `select` would start it, ignoring per-source caps."""
+        return sorted(queue, key=lambda entry: self.rank(entry, now))
+
+    def select(self, queue: Sequence[_QueueEntry], active_sources: Mapping[str, int], now: float) -> Optional[int]:
+        best_index: Optional[int] = None
+        best_rank: Optional[tuple] = None
+        for index, entry in enumerate(queue):
+            if not self._eligible(entry, active_sources):
+                continue
+            rank = self.rank(entry, now)
+            if best_rank is None or rank < best_rank:
+                best_index, best_rank = index, rank
+        return best_index
+
+    def dispatched(self, entry: _QueueEntry) -> None:
+        """Called for each entry `select` picked, once it has been taken off the queue."""
+
+
+class FifoPolicy(SchedulingPolicy):
+    """Start downloads in queue order; retried jobs go back to the front."""
+
+    name = "fifo"
+
+    def order(self, queue: Sequence[_QueueEntry], now: float) -> list[_QueueEntry]:
+        return list(queue)
+
+    def select(self, queue: Sequence[_QueueEntry], active_sources: Mapping[str, int], now: float) -> Optional[int]:
+        for index, entry in enumerate(queue):
+            if self._eligible(entry, active_sources):
+                return index
+        return None
+
+
+class PriorityPolicy(SchedulingPolicy):
+    """Start the highest `priority` from the request first, oldest first within a priority."""
+
+    name = "priority"
+
+    def rank(self, entry: _QueueEntry, now: float) -> tuple:
+        return (-entry.priority, entry.seq)
+
+
+class ShortestJobFirstPolicy(SchedulingPolicy):
+    """Start the shortest track first, by the length in its cached metadata.
+
+    That is the song payload's or extraction's `duration`, or for Spotify tracks looked
+    up in fast mode the length the lookup reported.
+
+    Waiting shortens a job's effective length by `SJF_AGING` per second, so a queue
+    that never empties cannot hold back an hour-long mix forever.
+    """
+
+    name = "sjf"
+
+    def rank(self, entry: _QueueEntry, now: float) -> tuple:
+        duration = UNKNOWN_TRACK_SECONDS if entry.duration is None else entry.duration
+        return (duration - SJF_AGING * (now - entry.queued_at), entry.seq)
+
+
+class FairSharePolicy(SchedulingPolicy):
+    """Round-robin between sources, so one large batch from one host cannot hold every slot."""
+
+    name = "fair"
+
+    def __init__(self, *, max_active_per_source: int = MAX_ACTIVE_PER_SOURCE) -> None:
+        super().__init__(max_active_per_source=max_active_per_source)
+        self._turns = itertools.count()
+        self._last_served: OrderedDict[str, int] = OrderedDict()
+
+    def rank(self, entry: _QueueEntry, now: float) -> tuple:
+        return (self._last_served.get(entry.source, -1), entry.seq)
+
+    def order(self, queue: Sequence[_QueueEntry], now: float) -> list[_QueueEntry]:
+        by_source: dict[str, deque[_QueueEntry]] = {}
+        for entry in sorted(queue, key=lambda entry: entry.seq):
+            by_source.setdefault(entry.source, deque()).append(entry)
+        turns = sorted(by_source, key=lambda source: self._last_served.get(source, -1))
+        ordered: list[_QueueEntry] = []
+        while turns:
+            for source in turns:
+                ordered.append(by_source[source].popleft())
+            turns = [source for source in turns if by_source[source]]
+        return ordered
+
+    def dispatched(self, entry: _QueueEntry) -> None:
+        self._last_served[entry.source] = next(self._turns)
+        self._last_served.move_to_end(entry.source)
+        while len(self._last_served) > MAX_TRACKED_SOURCES:
+            self._last_served.popitem(last=False)
+
+
+SCHEDULING_POLICIES: dict[str, type[SchedulingPolicy]] = {
+    policy.name: policy for policy in (FifoPolicy, PriorityPolicy, ShortestJobFirstPolicy, FairSharePolicy)
+}
+
+
+def create_scheduling_policy(
+    name: str = SCHEDULING_POLICY,
+    *,
+    max_active_per_source: int = MAX_ACTIVE_PER_SOURCE,
+) -> SchedulingPolicy:
+    """Build the named policy, falling back to FIFO for names that are not registered."""
+    policy_class = SCHEDULING_POLICIES.get(name.strip().lower())
+    if policy_class is None:
+        LOGGER.warning("Unknown scheduling policy %r; using fifo", name)
+        policy_class = FifoPolicy
+    return policy_class(max_active_per_source=max_active_per_source)
 
 
 @dataclass
@@ -241,6 +589,17 @@ class _ActiveExecution:
     monitor: WorkerMonitor
     thread: threading.Thread
     cancel_requested: bool = False
+    progress_slot: Optional[int] = None
+    entry: Optional[_QueueEntry] = None
+    started_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class _PendingRetry:
+    entry: _QueueEntry
+    timer: threading.Timer
+    # `time.monotonic()` at which the timer puts the entry back on the queue.
+    due_at: float = 0.0
 
 
 class DownloadSupervisor:
@@ -253,24 +612,73 @@ class DownloadSupervisor:
         concurrency_limit: int = 2,
         job_store: Optional[JobStore] = None,
         monitor_factory: Callable[[DownloadJobSpec], WorkerMonitor] = WorkerMonitor,
+        progress_table: Optional[ProgressTable] = None,
+        max_queued: int = MAX_QUEUED_DOWNLOADS,
+        retry_policy: Optional[RetryPolicy] = None,
+        scheduler: Optional[SchedulingPolicy] = None,
+        collection_window: int = COLLECTION_WINDOW,
+        collection_concurrency: int = COLLECTION_CONCURRENCY,
+        finished_collections: int = FINISHED_COLLECTIONS,
+        expander_factory: Callable[[str, str], CollectionExpander] = CollectionExpander,
     ) -> None:
         self.metadata_service = metadata_service
         self.concurrency_limit = concurrency_limit
+        self.max_queued = max(1, max_queued)
         self.job_store = job_store or JobStore()
         self.monitor_factory = monitor_factory
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.scheduler = scheduler or create_scheduling_policy()
+        self.collection_window = max(1, collection_window)
+        self.finished_collections = max(1, finished_collections)
+        self.expander_factory = expander_factory
+        self.phase_timings = PhaseTimings()
+        self.resource_log = ResourceLog()
+        if progress_table is None and progress_table_enabled():
+            try:
+                progress_table = ProgressTable.create(concurrency_limit)
+            except OSError:
+                LOGGER.warning("Could not create the shared progress table", exc_info=True)
+            else:
+                atexit.register(progress_table.close)
+        self.progress_table = progress_table
         self._queue: deque[_QueueEntry] = deque()
         self._active: dict[str, _ActiveExecution] = {}
+        # Failed jobs waiting out their backoff before going back on the queue.
+        self._retrying: dict[str, _PendingRetry] = {}
+        self._sequence = itertools.count()
         self._lock = threading.RLock()
+        # Playlists and albums by link, least recently finished first; their tracks are
+        # ordinary entries in `_queue`.
+        self._collections: OrderedDict[str, CollectionJob] = OrderedDict()
+        # Wakes listing threads paused on a full window when queued entries leave the queue.
+        self._queue_changed = threading.Condition(self._lock)
+        self._listing_slots = threading.BoundedSemaphore(max(1, collection_concurrency))
 
     def start_download(self, link: str, request: DownloadRequest) -> None:
-        """Queue a download request without blocking on provider resolution."""
-        info = ensure_supported_single_track(link)
+        """Queue a download request without blocking on provider resolution.
+
+        Playlist and album links are listed in the background and each track is
+        queued as its own job as the pages arrive.
+        """
+        info = ensure_supported_link(link)
+        if info.kind in COLLECTION_KINDS:
+            self._start_collection(link, request)
+            return
         song_payload = self.metadata_service.get_cached_song_payload(info.normalized)
+        duration = None if song_payload else self.metadata_service.get_cached_duration(info.normalized)
+        extraction = None
+        if info.kind == "external_media" and not request.source_url:
+            extraction = self.metadata_service.get_cached_extraction(info.normalized)
 
         with self._lock:
-            if link in self._active or any(entry.link == link for entry in self._queue):
+            if link in self._active or link in self._retrying or any(entry.link == link for entry in self._queue):
                 LOGGER.info("Download already active or queued for %s", link)
                 return
+            if len(self._queue) >= self.max_queued:
+                raise DownloadQueueFull(
+                    f"{len(self._queue)} downloads are already queued.",
+                    retry_after=self._retry_after_locked(),
+                )
 
             job_id = uuid.uuid4().hex
             spec = DownloadJobSpec(
@@ -281,9 +689,22 @@ class DownloadSupervisor:
                 bitrate=request.bitrate,
                 song_payload=song_payload,
                 source_url=request.source_url,
+                extraction=extraction,
+                profile=request.profile or sampled_profile_mode(),
+                duration=duration,
             )
             self.job_store.queue_job(link, job_id)
-            self._queue.append(_QueueEntry(link=link, job_id=job_id, spec=spec))
+            self._queue.append(
+                _QueueEntry(
+                    link=link,
+                    job_id=job_id,
+                    spec=spec,
+                    seq=next(self._sequence),
+                    source=job_source(info, request.source_url),
+                    priority=request.priority,
+                    duration=track_duration(spec),
+                )
+            )
             LOGGER.info(
                 "Queued download %s at position %s",
                 link,
@@ -291,11 +712,228 @@ class DownloadSupervisor:
             )
             self._dispatch_locked()
 
+    def _start_collection(self, link: str, request: DownloadRequest) -> None:
+        with self._lock:
+            existing = self._collections.get(link)
+            if existing is not None and existing.status in {"queued", "downloading"}:
+                LOGGER.info("Collection already listing or downloading for %s", link)
+                return
+            collection = CollectionJob(job_id=uuid.uuid4().hex, link=link)
+            self._collections[link] = collection
+        thread = threading.Thread(
+            target=self._expand_collection,
+            args=(collection, request),
+            daemon=True,
+            name=f"expand-{collection.job_id[:8]}",
+        )
+        LOGGER.info("Queued collection %s", link)
+        thread.start()
+
+    def _expand_collection(self, collection: CollectionJob, request: DownloadRequest) -> None:
+        """List a collection page by page, queueing each track as soon as its page arrives."""
+        error: Optional[CollectionError] = None
+        with self._listing_slots:
+            with self._lock:
+                expander = None
+                if not collection.cancel_requested:
+                    expander = self.expander_factory(collection.link, collection.job_id)
+                    collection.expander = expander
+                    collection.status = "downloading"
+                    collection.phase = "listing"
+                    collection.updated_at = time.time()
+            try:
+                for event in expander.events() if expander is not None else ():
+                    if event.get("type") == "collection":
+                        with self._lock:
+                            collection.name = str(event.get("title") or "")
+                            collection.cover = str(event.get("cover") or "")
+                            collection.total = int(event.get("total") or 0) or None
+                            collection.updated_at = time.time()
+                    elif event.get("type") == "tracks":
+                        if not all(self._enqueue_child(collection, request, track) for track in event.get("tracks") or ()):
+                            break
+            except CollectionError as exc:
+                LOGGER.warning("Could not list collection %s: %s", collection.link, exc)
+                error = exc
+            except Exception as exc:
+                LOGGER.exception("Collection listing crashed for %s", collection.link)
+                error = CollectionError(str(exc) or "Could not list the collection.")
+
+        with self._lock:
+            if error is not None:
+                collection.error_message = str(error)
+                collection.error_class = error.code
+            collection.listing = False
+            collection.expander = None
+            if collection.phase == "listing":
+                collection.phase = "downloading"
+            collection.updated_at = time.time()
+            LOGGER.info("Listed %s tracks of collection %s", collection.enqueued + collection.skipped, collection.link)
+            self._finish_collection_locked(collection)
+
+    def _enqueue_child(self, collection: CollectionJob, request: DownloadRequest, track: Mapping[str, object]) -> bool:
+        """Queue one listed track, waiting while the collection's window or the queue is full.
+
+        Returns `False` once the collection is cancelled, which stops the listing.
+        """
+        try:
+            info = ensure_supported_single_track(str(track.get("link") or ""))
+        except UnsupportedInputError:
+            info = None
+        song_payload = track.get("song_payload")
+
+        with self._lock:
+            while not collection.cancel_requested and (
+                collection.waiting >= self.collection_window or len(self._queue) >= self.max_queued
+            ):
+                self._queue_changed.wait()
+            if collection.cancel_requested:
+                return False
+
+            link = info.normalized if info is not None else ""
+            # A track with a snapshot is the user's own row (or another collection's): queueing
+            # it here would overwrite that row, and `forget` would later erase it.
+            if info is None or self.job_store.snapshot(link) is not None:
+                collection.skipped += 1
+                collection.updated_at = time.time()
+                return True
+
+            job_id = uuid.uuid4().hex
+            spec = DownloadJobSpec(
+                job_id=job_id,
+                link=link,
+                download_directory=str(request.download_directory),
+                format=request.format,
+                bitrate=request.bitrate,
+                song_payload=song_payload if isinstance(song_payload, dict) else None,
+                profile=request.profile or sampled_profile_mode(),
+            )
+            self.job_store.queue_job(link, job_id)
+            self._queue.append(
+                _QueueEntry(
+                    link=link,
+                    job_id=job_id,
+                    spec=spec,
+                    seq=next(self._sequence),
+                    source=job_source(info),
+                    priority=request.priority,
+                    duration=track_duration(spec),
+                    collection=collection.link,
+                )
+            )
+            collection.enqueued += 1
+            collection.waiting += 1
+            collection.updated_at = time.time()
+            self._dispatch_locked()
+            return True
+
+    def _child_finished_locked(self, entry: Optional[_QueueEntry], outcome: str) -> None:
+        """Count a finished track (`completed`, `failed` or `cancelled`) towards its collection.
+
+        The track's own snapshot is dropped once counted, so a long playlist does not
+        keep one job per track in the store; its log file stays on disk.
+        """
+        if entry is None or entry.collection is None:
+            return
+        self.job_store.forget(entry.link, entry.job_id)
+        collection = self._collections.get(entry.collection)
+        if collection is None:
+            return
+        setattr(collection, outcome, getattr(collection, outcome) + 1)
+        collection.updated_at = time.time()
+        self._finish_collection_locked(collection)
+
+    def _finish_collection_locked(self, collection: CollectionJob) -> None:
+        if collection.listing or collection.completed + collection.failed + collection.cancelled < collection.enqueued:
+            return
+        if collection.status not in {"queued", "downloading"}:
+            return
+        if collection.cancel_requested:
+            collection.status = "idle"
+            collection.phase = "idle"
+        elif collection.error_message is not None or (collection.failed and not collection.completed):
+            collection.status = "error"
+            collection.phase = "error"
+            if collection.error_message is None:
+                collection.error_message = f"All {collection.failed} tracks failed."
+                collection.error_class = "download_error"
+        else:
+            collection.status = "done"
+            collection.phase = "done"
+        collection.updated_at = time.time()
+        LOGGER.info("Collection %s finished: %s", collection.link, collection.detail())
+        if self._collections.get(collection.link) is collection:
+            self._collections.move_to_end(collection.link)
+        finished = [link for link, kept in self._collections.items() if kept.status not in {"queued", "downloading"}]
+        for link in finished[: -self.finished_collections]:
+            del self._collections[link]
+
+    def _cancel_collection(self, collection: CollectionJob) -> None:
+        """Stop listing a collection and cancel every one of its tracks that has not finished."""
+        terminate: list[tuple[str, str, WorkerMonitor]] = []
+        with self._lock:
+            collection.cancel_requested = True
+            expander = collection.expander
+            for link, pending in list(self._retrying.items()):
+                if pending.entry.collection != collection.link:
+                    continue
+                del self._retrying[link]
+                pending.timer.cancel()
+                JOBS_FINISHED.inc(outcome="cancelled", error_class="none")
+                self._child_finished_locked(pending.entry, "cancelled")
+
+            cancelled = [entry for entry in self._queue if entry.collection == collection.link]
+            kept = [entry for entry in self._queue if entry.collection != collection.link]
+            self._queue.clear()
+            self._queue.extend(kept)
+            collection.waiting = 0
+            for entry in cancelled:
+                JOBS_FINISHED.inc(outcome="cancelled", error_class="none")
+                self._child_finished_locked(entry, "cancelled")
+
+            for link, active in self._active.items():
+                if active.entry is not None and active.entry.collection == collection.link:
+                    active.cancel_requested = True
+                    terminate.append((link, active.job_id, active.monitor))
+            self._queue_changed.notify_all()
+            self._finish_collection_locked(collection)
+            LOGGER.info("Cancelled collection %s", collection.link)
+
+        if expander is not None:
+            expander.cancel()
+        for link, job_id, monitor in terminate:
+            self.job_store.mark_cancelled(link, job_id)
+            monitor.terminate("Cancelled by user.")
+
+    def _retry_after_locked(self) -> int:
+        # A queue slot frees up whenever any running job finishes.
+        completed = self.phase_timings.percentiles(outcome="completed")
+        job_seconds = completed.get("total", {}).get("p50", DEFAULT_JOB_SECONDS)
+        job_seconds -= completed.get("queued", {}).get("p50", 0.0)
+        return retry_after_for(max(job_seconds, 1.0) / self.concurrency_limit)
+
     def _dispatch_locked(self) -> None:
+        now = time.monotonic()
         while len(self._active) < self.concurrency_limit and self._queue:
-            entry = self._queue.popleft()
+            active_sources = Counter(active.entry.source for active in self._active.values() if active.entry)
+            index = self.scheduler.select(self._queue, active_sources, now)
+            if index is None:
+                break
+            entry = self._queue[index]
+            del self._queue[index]
+            self.scheduler.dispatched(entry)
+            if entry.collection is not None:
+                collection = self._collections.get(entry.collection)
+                if collection is not None:
+                    collection.waiting = max(0, collection.waiting - 1)
+            # Any entry leaving frees queue room that a paused listing may be waiting for.
+            self._queue_changed.notify_all()
             self.job_store.mark_launching(entry.link, entry.job_id)
-            monitor = self.monitor_factory(entry.spec)
+            spec = entry.spec
+            progress_slot = self.progress_table.acquire() if self.progress_table is not None else None
+            if progress_slot is not None:
+                spec = replace(spec, progress_table=str(self.progress_table.path), progress_slot=progress_slot)
+            monitor = self.monitor_factory(spec)
             thread = threading.Thread(
                 target=self._run_job,
                 args=(entry.link, entry.job_id, monitor),
@@ -306,6 +944,8 @@ class DownloadSupervisor:
                 job_id=entry.job_id,
                 monitor=monitor,
                 thread=thread,
+                progress_slot=progress_slot,
+                entry=entry,
             )
             LOGGER.info("Starting download %s", entry.link)
             thread.start()
@@ -313,19 +953,26 @@ class DownloadSupervisor:
     def _run_job(self, link: str, job_id: str, monitor: WorkerMonitor) -> None:
         last_logged_detail: Optional[str] = None
 
-        def handle_event(event: dict[str, object]) -> None:
+        def handle_events(events: list[WorkerEvent]) -> None:
             nonlocal last_logged_detail
-            self.job_store.apply_worker_event(link, job_id, event)
-            detail = str(event.get("detail") or "").strip()
-            if detail and detail != last_logged_detail:
-                LOGGER.info("%s: %s", link, detail)
-                last_logged_detail = detail
+            self.job_store.apply_worker_events(link, job_id, events)
+            for event in events:
+                if isinstance(event, ProgressRecord):
+                    detail = event.detail.strip()
+                else:
+                    detail = str(event.get("detail") or "").strip()
+                if detail and detail != last_logged_detail:
+                    LOGGER.info("%s: %s", link, detail)
+                    last_logged_detail = detail
+
+        def handle_event(event: WorkerEvent) -> None:
+            handle_events([event])
 
         try:
-            outcome = monitor.run(handle_event)
+            outcome = monitor.run(handle_event, on_events=handle_events)
         except Exception as exc:
             LOGGER.exception("Worker monitor crashed for %s", link)
-            outcome = WorkerOutcome(success=False, error_message=str(exc))
+            outcome = WorkerOutcome(success=False, error_message=str(exc), error_class="monitor_error")
 
         with self._lock:
             active = self._active.get(link)
@@ -335,10 +982,15 @@ class DownloadSupervisor:
                 and active.cancel_requested
             )
             self._active.pop(link, None)
+            if active is not None and active.job_id == job_id and active.progress_slot is not None:
+                self.progress_table.release(active.progress_slot)
 
+            finished_as: Optional[str] = None
             if cancel_requested:
-                self.job_store.mark_cancelled(link, job_id)
+                self.job_store.mark_cancelled(link, job_id, resources=outcome.resources)
+                JOBS_FINISHED.inc(outcome="cancelled", error_class="none")
                 LOGGER.info("Cancelled download %s", link)
+                finished_as = "cancelled"
             elif outcome.success and outcome.file_path:
                 self.job_store.mark_done(
                     link,
@@ -346,30 +998,135 @@ class DownloadSupervisor:
                     outcome.file_path,
                     log_path=outcome.log_path,
                     stderr_tail=outcome.stderr_tail,
+                    resources=outcome.resources,
                 )
+                JOBS_FINISHED.inc(outcome="completed", error_class="none")
                 LOGGER.info("Completed download %s", link)
+                finished_as = "completed"
+            elif (decision := self._retry_decision_locked(active, job_id, outcome)) is not None:
+                self._schedule_retry_locked(link, active, outcome, decision)
             else:
                 error_message = outcome.error_message or "Download failed."
+                error_class = outcome.error_class or "download_error"
                 self.job_store.mark_failed(
                     link,
                     job_id,
                     error_message,
                     log_path=outcome.log_path,
                     stderr_tail=outcome.stderr_tail,
+                    resources=outcome.resources,
+                    error_class=error_class,
                 )
+                JOBS_FINISHED.inc(outcome="failed", error_class=error_class)
                 LOGGER.warning("Download failed for %s: %s", link, error_message)
+                finished_as = "failed"
+
+            if outcome.resources is not None:
+                self.resource_log.record(link, job_id, finished_as or "retried", outcome.resources.to_payload())
+            snapshot = self.job_store.snapshot(link)
+            if snapshot is not None and snapshot.job_id == job_id and snapshot.timeline:
+                breakdown = self.job_store.phase_seconds(snapshot)
+                duration = active.entry.duration if active is not None and active.entry is not None else None
+                self.phase_timings.record(snapshot.timeline[-1][0], breakdown, duration)
+                for phase, seconds in breakdown.items():
+                    JOB_PHASE_SECONDS.observe(seconds, phase=phase)
+            if finished_as is not None and active is not None and active.job_id == job_id:
+                self._child_finished_locked(active.entry, finished_as)
+            self._dispatch_locked()
+
+    def _retry_decision_locked(
+        self,
+        active: Optional[_ActiveExecution],
+        job_id: str,
+        outcome: WorkerOutcome,
+    ) -> Optional[RetryDecision]:
+        if active is None or active.job_id != job_id or active.entry is None:
+            return None
+        return self.retry_policy.decide(outcome, active.entry.attempt)
+
+    def _schedule_retry_locked(
+        self,
+        link: str,
+        active: _ActiveExecution,
+        outcome: WorkerOutcome,
+        decision: RetryDecision,
+    ) -> None:
+        failed = active.entry
+        retry_id = uuid.uuid4().hex
+        spec = replace(failed.spec, job_id=retry_id, audio_providers=rotate_providers(failed.spec.audio_providers))
+        entry = replace(failed, job_id=retry_id, spec=spec, attempt=decision.attempt)
+        error_message = outcome.error_message or "Download failed."
+        self.job_store.mark_retrying(
+            link,
+            failed.job_id,
+            retry_id,
+            decision,
+            max_attempts=self.retry_policy.max_attempts,
+            error_message=error_message,
+            error_class=outcome.error_class,
+            stderr_tail=outcome.stderr_tail,
+        )
+        timer = threading.Timer(decision.delay, self._requeue_retry, args=(entry,))
+        timer.daemon = True
+        timer.name = f"retry-{retry_id[:8]}"
+        self._retrying[link] = _PendingRetry(entry=entry, timer=timer, due_at=time.monotonic() + decision.delay)
+        JOB_RETRIES.inc(reason=decision.reason)
+        LOGGER.warning(
+            "Download failed for %s (%s); retrying in %.1fs with %s first: %s",
+            link,
+            decision.reason,
+            decision.delay,
+            spec.audio_providers[0] if spec.audio_providers else "no provider",
+            error_message,
+        )
+        timer.start()
 
+    def _requeue_retry(self, entry: _QueueEntry) -> None:
+        with self._lock:
+            pending = self._retrying.get(entry.link)
+            if pending is None or pending.entry is not entry:
+                return
+            del self._retrying[entry.link]
+            self.job_store.mark_requeued(entry.link, entry.job_id)
+            # The job already waited its turn once; it goes ahead of newer requests.
+            self._queue.appendleft(entry)
+            collection = self._collections.get(entry.collection) if entry.collection is not None else None
+            if collection is not None:
+                collection.waiting += 1
             self._dispatch_locked()
 
     def cancel_download(self, link: str) -> bool:
-        """Cancel a queued or active download."""
+        """Cancel a queued, retrying or active download, or every unfinished track of a collection."""
         with self._lock:
+            collection = self._collections.get(link)
+            unfinished = collection is not None and collection.status in {"queued", "downloading"}
+        if unfinished:
+            self._cancel_collection(collection)
+            return True
+
+        with self._lock:
+            pending = self._retrying.pop(link, None)
+            if pending is not None:
+                pending.timer.cancel()
+                self.job_store.mark_cancelled(link, pending.entry.job_id)
+                JOBS_FINISHED.inc(outcome="cancelled", error_class="none")
+                LOGGER.info("Cancelled download %s while it waited to retry", link)
+                self._queue_changed.notify_all()
+                self._child_finished_locked(pending.entry, "cancelled")
+                return True
+
             for entry in list(self._queue):
                 if entry.link != link:
                     continue
                 self._queue.remove(entry)
                 self.job_store.mark_cancelled(link, entry.job_id)
+                JOBS_FINISHED.inc(outcome="cancelled", error_class="none")
                 LOGGER.info("Cancelled queued download %s", link)
+                collection = self._collections.get(entry.collection) if entry.collection is not None else None
+                if collection is not None:
+                    collection.waiting = max(0, collection.waiting - 1)
+                self._queue_changed.notify_all()
+                self._child_finished_locked(entry, "cancelled")
                 return True
 
             active = self._active.get(link)
@@ -383,9 +1140,168 @@ class DownloadSupervisor:
         monitor.terminate("Cancelled by user.")
         return True
 
+    def _estimates(self, links: set[str]) -> dict[str, tuple[Optional[int], Optional[float], float]]:
+        """Return `(queue position, seconds to start, seconds to finish)` for queued or running `links`.
+
+        Slots are simulated in scheduler order with run times from recent completed jobs,
+        scaled to each track's cached `duration`. Jobs waiting out a retry backoff go to
+        the front of the queue when their timer fires, so each takes the next free slot
+        at or after that time. Per-source caps are not modelled.
+        """
+        model = self.phase_timings.run_estimate()
+
+        def run_seconds(entry: Optional[_QueueEntry]) -> float:
+            if model is None:
+                return DEFAULT_JOB_SECONDS
+            return model.seconds(entry.duration if entry is not None else None)
+
+        now = time.monotonic()
+        with self._lock:
+            active = list(self._active.items())
+            queued = [entry for entry in self._queue if entry.link in links]
+            retrying = sorted(
+                ((max(0.0, pending.due_at - now), pending.entry) for pending in self._retrying.values()),
+                key=lambda item: (item[0], item[1].seq),
+            )
+            waiting = {entry.link for entry in queued}
+            waiting.update(entry.link for _due, entry in retrying if entry.link in links)
+            order = self.scheduler.order(self._queue, now) if waiting else []
+            free_slots = max(0, self.concurrency_limit - len(active))
+
+        estimates: dict[str, tuple[Optional[int], Optional[float], float]] = {}
+        slots = [0.0] * free_slots
+        for link, execution in active:
+            remaining = max(0.0, run_seconds(execution.entry) - (now - execution.started_at))
+            slots.append(remaining)
+            if link in links:
+                estimates[link] = (None, None, remaining)
+        if not slots:
+            return estimates
+        heapq.heapify(slots)
+
+        position = 0
+
+        def place(entry: _QueueEntry, earliest: float = 0.0) -> None:
+            nonlocal position
+            position += 1
+            start = max(slots[0], earliest)
+            finish = start + run_seconds(entry)
+            heapq.heapreplace(slots, finish)
+            if entry.link in waiting:
+                waiting.discard(entry.link)
+                estimates[entry.link] = (position, start, finish)
+
+        pending_retries = deque(retrying)
+        for entry in order:
+            if not waiting:
+                break
+            while pending_retries and pending_retries[0][0] <= slots[0]:
+                due, retry = pending_retries.popleft()
+                place(retry, due)
+            place(entry)
+        while waiting and pending_retries:
+            due, retry = pending_retries.popleft()
+            place(retry, due)
+        return estimates
+
     def get_status(self, links: list[str]) -> dict[str, dict[str, object]]:
-        """Return status snapshots for the requested links."""
-        return self.job_store.status_payloads(links)
+        """Return status snapshots with queue position and ETA, and live progress from the shared table.
+
+        A playlist or album reports its track counts, with progress summed over its
+        finished tracks and the ones downloading now.
+        """
+        with self._lock:
+            collections = {link: self._collections[link] for link in links if link in self._collections}
+            running = {
+                link: active.entry.collection
+                for link, active in self._active.items()
+                if active.entry is not None and active.entry.collection in collections
+            }
+        if not collections:
+            return self._track_status(links)
+
+        payloads = self._track_status([link for link in links if link not in collections] + list(running))
+        active_progress: Counter[str] = Counter()
+        for link, collection_link in running.items():
+            payload = payloads.pop(link, None) if link not in links else payloads.get(link)
+            if payload is not None:
+                active_progress[collection_link] += float(payload["progress"] or 0.0)
+        with self._lock:
+            for link, collection in collections.items():
+                payloads[link] = collection.to_payload(active_progress[link])
+                payloads[link].update(queue_position=None, estimated_start_at=None, estimated_completion_at=None)
+        return payloads
+
+    def _track_status(self, links: list[str]) -> dict[str, dict[str, object]]:
+        payloads = self.job_store.status_payloads(links)
+        pending = {link for link, payload in payloads.items() if payload["status"] in {"queued", "downloading"}}
+        estimates = self._estimates(pending) if pending else {}
+        now = time.time()
+        for link, payload in payloads.items():
+            position, start, finish = estimates.get(link, (None, None, None))
+            payload.update(
+                queue_position=position,
+                estimated_start_at=None if start is None else round(now + start, 3),
+                estimated_completion_at=None if finish is None else round(now + finish, 3),
+            )
+        if self.progress_table is None:
+            return payloads
+
+        with self._lock:
+            slots = {
+                link: active.progress_slot
+                for link, active in self._active.items()
+                if link in payloads and active.progress_slot is not None
+            }
+        for link, slot in slots.items():
+            payload = payloads[link]
+            sample = self.progress_table.read(slot)
+            # Lifecycle events still arrive over the pipe; whichever is newer wins.
+            if sample is None or payload["status"] != "downloading" or sample.updated_at < payload["updated_at"]:
+                continue
+            payload.update(
+                phase=sample.phase,
+                detail=sample.detail or payload["detail"],
+                progress=sample.progress,
+                progress_known=sample.progress_known,
+                bytes_downloaded=sample.bytes_downloaded,
+                bytes_total=sample.bytes_total,
+                updated_at=sample.updated_at,
+            )
+        return payloads
+
+    def container_sizes(self) -> dict[str, int]:
+        """Return the sizes of the in-memory job structures for leak diagnostics."""
+        with self._lock:
+            sizes = {
+                "queue": len(self._queue),
+                "active": len(self._active),
+                "retrying": len(self._retrying),
+                "collections": len(self._collections),
+            }
+        sizes["jobs"] = self.job_store.job_count()
+        return sizes
+
+    def load_snapshot(self) -> dict[str, int]:
+        """Return queue depth, running workers, jobs waiting to retry and the concurrency limit."""
+        with self._lock:
+            return {
+                "queued": len(self._queue),
+                "active": len(self._active),
+                "retrying": len(self._retrying),
+                "concurrency_limit": self.concurrency_limit,
+            }
+
+    def phase_percentiles(self) -> dict[str, dict[str, dict[str, float]]]:
+        """Return rolling per-phase percentiles for recent completed and failed jobs."""
+        return {
+            "completed": self.phase_timings.percentiles(outcome="completed"),
+            "failed": self.phase_timings.percentiles(outcome="failed"),
+        }
+
+    def heaviest_jobs(self, limit: int = 10) -> dict[str, object]:
+        """Return the recent worker runs that used the most CPU time and memory."""
+        return self.resource_log.heaviest(limit)
 
     def reveal_downloaded_file(self, link: str) -> Path:
         """Reveal the completed file for a given row."""
@@ -393,11 +1309,27 @@ class DownloadSupervisor:
         reveal_in_file_manager(file_path)
         return file_path
 
-    def shutdown(self) -> None:
-        """Terminate any active worker processes during app shutdown."""
+    def shutdown(self, grace: float = WORKER_TERMINATE_GRACE) -> None:
+        """Stop every active worker group during app shutdown, killing any that outlive `grace`."""
         with self._lock:
             active_jobs = list(self._active.values())
+            expanders = [collection.expander for collection in self._collections.values() if collection.expander]
+            for collection in self._collections.values():
+                collection.cancel_requested = True
+            self._queue_changed.notify_all()
+            for pending in self._retrying.values():
+                pending.timer.cancel()
+            self._retrying.clear()
 
+        for expander in expanders:
+            expander.cancel()
         for active in active_jobs:
             active.cancel_requested = True
             active.monitor.terminate("Application shutdown.")
+        deadline = time.monotonic() + grace
+        for active in active_jobs:
+            active.thread.join(timeout=max(0.0, deadline - time.monotonic()))
+            if active.thread.is_alive():
+                active.monitor.kill()
+        if self.progress_table is not None:
+            self.progress_table.close()
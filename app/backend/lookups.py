@@ -0,0 +1,179 @@
+"""Bounded background metadata lookups that HTTP handlers can poll instead of wait on."""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional
+
+from app.backend.admission import Overloaded, retry_after_for
+from app.backend.inputs import ensure_supported_link
+from app.backend.metadata import METADATA_MAX_PENDING, MetadataBusy, MetadataError, MetadataService
+
+LOGGER = logging.getLogger(__name__)
+
+# Lookups nobody has polled for this long are treated as abandoned and cancelled.
+METADATA_ABANDON_AFTER = max(5, int(os.getenv("SPOTDL_METADATA_ABANDON_AFTER", "30")))
+LOOKUP_RESULT_TTL = 120
+
+
+class LookupQueueFull(Overloaded):
+    """Raised when too many metadata lookups are already queued or running."""
+
+    code = "metadata_busy"
+
+
+@dataclass
+class _Lookup:
+    lookup_id: str
+    link: str
+    status: str = "pending"
+    metadata: Optional[dict[str, str]] = None
+    error: Optional[MetadataError] = None
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+    polled_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+
+
+class MetadataLookups:
+    """Run `MetadataService.get_metadata` off the request thread, at most N at a time.
+
+    Lookups for the same link share one entry, queued lookups are capped, and a lookup
+    can be cancelled explicitly or by simply no longer being polled.
+    """
+
+    def __init__(
+        self,
+        metadata_service: MetadataService,
+        *,
+        concurrency: Optional[int] = None,
+        max_pending: int = METADATA_MAX_PENDING,
+        abandon_after: float = METADATA_ABANDON_AFTER,
+        result_ttl: float = LOOKUP_RESULT_TTL,
+    ) -> None:
+        self.metadata_service = metadata_service
+        self.concurrency = max(1, concurrency or getattr(metadata_service, "metadata_concurrency", 2))
+        self.max_pending = max_pending
+        self.abandon_after = abandon_after
+        self.result_ttl = result_ttl
+        self._lookups: dict[str, _Lookup] = {}
+        self._by_link: dict[str, _Lookup] = {}
+        self._queue: deque[_Lookup] = deque()
+        self._running = 0
+        self._lock = threading.Lock()
+
+    def submit(self, link: str) -> _Lookup:
+        """Start (or join) a lookup for `link`; cached metadata completes it immediately."""
+        link = link.strip()
+        ensure_supported_link(link)
+        cached = self.metadata_service.peek_metadata(link)
+
+        with self._lock:
+            self._prune_locked()
+            existing = self._by_link.get(link)
+            if existing is not None and existing.status == "pending":
+                existing.polled_at = time.monotonic()
+                return existing
+
+            lookup = _Lookup(lookup_id=uuid.uuid4().hex, link=link)
+            if cached is not None:
+                lookup.status = "done"
+                lookup.metadata = cached
+                lookup.finished_at = time.monotonic()
+            else:
+                pending = len(self._queue) + self._running
+                if pending >= self.max_pending:
+                    raise LookupQueueFull(
+                        f"{pending} metadata lookups are already pending.",
+                        retry_after=self._retry_after_locked(),
+                    )
+                self._queue.append(lookup)
+                self._by_link[link] = lookup
+            self._lookups[lookup.lookup_id] = lookup
+            self._dispatch_locked()
+            return lookup
+
+    def get(self, lookup_id: str) -> Optional[_Lookup]:
+        """Return a lookup and mark it as still wanted by the client."""
+        with self._lock:
+            self._prune_locked()
+            lookup = self._lookups.get(lookup_id)
+            if lookup is not None:
+                lookup.polled_at = time.monotonic()
+            return lookup
+
+    def cancel(self, lookup_id: str) -> bool:
+        with self._lock:
+            lookup = self._lookups.get(lookup_id)
+            if lookup is None:
+                return False
+            if lookup.status == "pending":
+                self._cancel_locked(lookup)
+            return True
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._queue) + self._running
+
+    def _retry_after_locked(self) -> int:
+        # Roughly how long the queue ahead needs to drain one slot's worth of lookups.
+        return retry_after_for(len(self._queue) / self.concurrency)
+
+    def _cancel_locked(self, lookup: _Lookup) -> None:
+        lookup.cancel_event.set()
+        if lookup in self._queue:
+            self._queue.remove(lookup)
+        self._finish_locked(lookup, "cancelled")
+
+    def _finish_locked(self, lookup: _Lookup, status: str) -> None:
+        lookup.status = status
+        lookup.finished_at = time.monotonic()
+        if self._by_link.get(lookup.link) is lookup:
+            del self._by_link[lookup.link]
+
+    def _prune_locked(self) -> None:
+        now = time.monotonic()
+        for lookup in list(self._lookups.values()):
+            if lookup.status == "pending" and now - lookup.polled_at > self.abandon_after:
+                LOGGER.info("Cancelling abandoned metadata lookup for %s", lookup.link)
+                self._cancel_locked(lookup)
+            elif lookup.finished_at is not None and now - lookup.finished_at > self.result_ttl:
+                del self._lookups[lookup.lookup_id]
+
+    def _dispatch_locked(self) -> None:
+        while self._running < self.concurrency and self._queue:
+            lookup = self._queue.popleft()
+            self._running += 1
+            threading.Thread(
+                target=self._run,
+                args=(lookup,),
+                daemon=True,
+                name=f"metadata-{lookup.lookup_id[:8]}",
+            ).start()
+
+    def _run(self, lookup: _Lookup) -> None:
+        metadata: Optional[dict[str, str]] = None
+        error: Optional[MetadataError] = None
+        try:
+            metadata = self.metadata_service.get_metadata(lookup.link, cancel_event=lookup.cancel_event)
+        except MetadataError as exc:
+            error = exc
+        except MetadataBusy as exc:
+            # Synchronous callers hold the service's pending slots; report it like a busy server.
+            error = MetadataError(str(exc), code=exc.code, status_code=503)
+        except Exception as exc:
+            LOGGER.exception("Metadata lookup crashed for %s", lookup.link)
+            error = MetadataError(str(exc) or "Failed to load track metadata.")
+
+        with self._lock:
+            self._running -= 1
+            if lookup.status == "pending":
+                lookup.metadata = metadata
+                lookup.error = error
+                self._finish_locked(lookup, "done" if error is None else "error")
+            self._dispatch_locked()
@@ -2,12 +2,26 @@
 
 from __future__ import annotations
 
-from typing import Any
-
-from yt_dlp import YoutubeDL
+import os
+import time
+from typing import Any, Optional
+from urllib.parse import parse_qs, urlsplit
 
 from app.backend.inputs import UnsupportedInputError
 
+EXTRACTION_TTL = max(60, int(os.getenv("SPOTDL_EXTRACTION_TTL", "1800")))
+EXTRACTION_MIN_REMAINING = 60
+_HEAVY_INFO_KEYS = frozenset(
+    {
+        "automatic_captions",
+        "subtitles",
+        "requested_subtitles",
+        "heatmap",
+        "requested_downloads",
+        "requested_formats",
+    }
+)
+
 
 def _clean_text(value: Any) -> str:
     return "" if value is None else str(value).strip()
@@ -71,8 +85,23 @@ def _normalize_entries(info: dict[str, Any]) -> dict[str, Any]:
     return info
 
 
+def _best_image(images: Any) -> str:
+    candidates = [
+        image
+        for image in images or ()
+        if isinstance(image, dict) and _clean_text(image.get("url"))
+    ]
+    if not candidates:
+        return ""
+    best = max(candidates, key=lambda image: (image.get("width") or 0) * (image.get("height") or 0))
+    return _clean_text(best.get("url"))
+
+
 def extract_external_info(link: str) -> dict[str, Any]:
     """Extract direct-media metadata without downloading the media."""
+    # Imported lazily so the parent process can use the payload helpers without yt-dlp.
+    from yt_dlp import YoutubeDL
+
     options = {
         "quiet": True,
         "no_warnings": True,
@@ -87,6 +116,48 @@ def extract_external_info(link: str) -> dict[str, Any]:
     return _normalize_entries(info)
 
 
+def _format_urls_expire_at(info: dict[str, Any]) -> Optional[float]:
+    expiries: list[float] = []
+    for media_format in info.get("formats") or ():
+        if not isinstance(media_format, dict):
+            continue
+        query = parse_qs(urlsplit(str(media_format.get("url") or "")).query)
+        expire = (query.get("expire") or [""])[0]
+        if expire.isdigit():
+            expiries.append(float(expire))
+    return min(expiries) if expiries else None
+
+
+def compact_extraction(info: dict[str, Any]) -> dict[str, Any]:
+    """Keep a JSON-safe copy of yt-dlp info that the download phase can start from."""
+    from yt_dlp import YoutubeDL
+
+    sanitized = YoutubeDL.sanitize_info(info)
+    trimmed = {key: value for key, value in sanitized.items() if key not in _HEAVY_INFO_KEYS}
+    extracted_at = time.time()
+    expires_at = extracted_at + EXTRACTION_TTL
+    url_expiry = _format_urls_expire_at(trimmed)
+    if url_expiry is not None:
+        expires_at = min(expires_at, url_expiry)
+    return {"info": trimmed, "extracted_at": extracted_at, "expires_at": expires_at}
+
+
+def usable_extraction(extraction: Any) -> Optional[dict[str, Any]]:
+    """Return cached yt-dlp info while its format URLs are still fresh enough to use."""
+    if not isinstance(extraction, dict):
+        return None
+    info = extraction.get("info")
+    if not isinstance(info, dict) or not info.get("formats"):
+        return None
+    try:
+        expires_at = float(extraction.get("expires_at") or 0.0)
+    except (TypeError, ValueError):
+        return None
+    if expires_at - time.time() < EXTRACTION_MIN_REMAINING:
+        return None
+    return info
+
+
 def metadata_from_song_payload(song_payload: dict[str, Any]) -> dict[str, str]:
     """Map a normalized song payload to the frontend metadata shape."""
     return {
@@ -98,6 +169,128 @@ def metadata_from_song_payload(song_payload: dict[str, Any]) -> dict[str, str]:
     }
 
 
+def metadata_from_spotify_track(track: dict[str, Any]) -> dict[str, str]:
+    """Map one raw Spotify track object to the frontend metadata shape."""
+    if not _clean_text(track.get("name")) or not track.get("duration_ms"):
+        raise RuntimeError(f"Track no longer exists: {_clean_text(track.get('id'))}")
+
+    album = track.get("album") if isinstance(track.get("album"), dict) else {}
+    return {
+        "title": _clean_text(track.get("name")),
+        "artist": _join_artists(track.get("artists")),
+        "album": _clean_text(album.get("name")),
+        "cover": _best_image(album.get("images")),
+    }
+
+
+def _collection_metadata(name: Any, owner: Any, cover: Any, total: Any) -> dict[str, str]:
+    try:
+        count = int(total or 0)
+    except (TypeError, ValueError):
+        count = 0
+    return {
+        "title": _clean_text(name) or "(unknown collection)",
+        "artist": _clean_text(owner),
+        "album": f"{count} tracks" if count else "",
+        "cover": _clean_text(cover),
+    }
+
+
+def metadata_from_spotify_collection(collection: dict[str, Any]) -> dict[str, str]:
+    """Map a Spotify playlist or album object to the frontend metadata shape."""
+    owner = collection.get("owner") if isinstance(collection.get("owner"), dict) else {}
+    tracks = collection.get("tracks") if isinstance(collection.get("tracks"), dict) else {}
+    return _collection_metadata(
+        collection.get("name"),
+        _join_artists(collection.get("artists")) or owner.get("display_name"),
+        _best_image(collection.get("images")),
+        tracks.get("total"),
+    )
+
+
+def metadata_from_external_collection(info: dict[str, Any]) -> dict[str, str]:
+    """Map an unprocessed yt-dlp playlist result to the frontend metadata shape."""
+    return _collection_metadata(
+        info.get("title"),
+        _coalesce_text(info.get("uploader"), info.get("channel")),
+        _best_thumbnail(info),
+        info.get("playlist_count"),
+    )
+
+
+def song_payload_from_spotify_track(
+    track: dict[str, Any],
+    album: Optional[dict[str, Any]] = None,
+    *,
+    list_name: Optional[str] = None,
+    list_url: Optional[str] = None,
+    list_position: Optional[int] = None,
+    list_length: Optional[int] = None,
+) -> Optional[dict[str, Any]]:
+    """Build a spotDL Song payload from a playlist or album track, without further API calls.
+
+    Album tracks are simplified objects, so album-level fields come from `album`, fetched
+    once per collection; playlist tracks carry their own simplified album. Genres come
+    from the album rather than one artist lookup per track, and the disc count is not
+    known from one track. Local and unavailable tracks return `None`.
+    """
+    track_id = _clean_text(track.get("id"))
+    if not track_id or track.get("is_local") or not track.get("duration_ms"):
+        return None
+    if album is None:
+        album = track.get("album") if isinstance(track.get("album"), dict) else {}
+
+    artists = [
+        _clean_text(artist.get("name"))
+        for artist in track.get("artists") or ()
+        if isinstance(artist, dict) and _clean_text(artist.get("name"))
+    ]
+    album_artists = [
+        _clean_text(artist.get("name"))
+        for artist in album.get("artists") or ()
+        if isinstance(artist, dict) and _clean_text(artist.get("name"))
+    ]
+    first_artist = next((artist for artist in track.get("artists") or () if isinstance(artist, dict)), {})
+    release_date = _clean_text(album.get("release_date"))
+    copyrights = [item for item in album.get("copyrights") or () if isinstance(item, dict)]
+    copyright_text = _clean_text(copyrights[0].get("text")) if copyrights else ""
+    disc_number = int(track.get("disc_number") or 1)
+    url = f"https://open.spotify.com/track/{track_id}"
+
+    return {
+        "name": _clean_text(track.get("name")),
+        "artists": artists,
+        "artist": artists[0] if artists else "",
+        "genres": [str(genre) for genre in album.get("genres") or ()],
+        "disc_number": disc_number,
+        "disc_count": disc_number,
+        "album_name": _clean_text(album.get("name")),
+        "album_artist": album_artists[0] if album_artists else (artists[0] if artists else ""),
+        "duration": round(int(track["duration_ms"]) / 1000),
+        "year": int(release_date[:4]) if release_date[:4].isdigit() else 0,
+        "date": release_date,
+        "track_number": int(track.get("track_number") or 1),
+        "tracks_count": int(album.get("total_tracks") or 1),
+        "song_id": track_id,
+        "explicit": bool(track.get("explicit")),
+        "publisher": _clean_text(album.get("label")),
+        "url": url,
+        "isrc": (track.get("external_ids") or {}).get("isrc"),
+        "cover_url": _best_image(album.get("images")),
+        "copyright_text": copyright_text or None,
+        "download_url": None,
+        "lyrics": None,
+        "popularity": track.get("popularity"),
+        "album_id": _clean_text(album.get("id")) or None,
+        "list_name": list_name,
+        "list_url": list_url,
+        "list_position": list_position,
+        "list_length": list_length,
+        "artist_id": _clean_text(first_artist.get("id")) or None,
+        "album_type": _clean_text(album.get("album_type")) or None,
+    }
+
+
 def build_song_payload_from_external_info(
     link: str,
     info: dict[str, Any],
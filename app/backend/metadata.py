@@ -3,19 +3,36 @@
 from __future__ import annotations
 
 import json
+import logging
 import os
 import subprocess
-import sys
 import threading
 import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import Any, Optional
 
-from app.backend.inputs import ensure_supported_single_track
+from app.backend.admission import Overloaded, retry_after_for
+from app.backend.inputs import ensure_supported_link, ensure_supported_single_track
+from app.backend.media import build_song_payload_from_external_info, usable_extraction
+from app.backend.metrics import METADATA_CACHE_REQUESTS, METADATA_WORKERS_SPAWNED
+from app.backend.profiling import (
+    PROFILE_IMPORTS,
+    is_importtime_line,
+    summarize_import_times,
+    worker_command,
+)
+
+LOGGER = logging.getLogger(__name__)
 
 METADATA_TIMEOUT = max(3, int(os.getenv("SPOTDL_METADATA_TIMEOUT", "45")))
 METADATA_CACHE_TTL = max(30, int(os.getenv("SPOTDL_METADATA_CACHE_TTL", "600")))
 METADATA_CONCURRENCY = max(1, int(os.getenv("SPOTDL_METADATA_CONCURRENCY", "2")))
+# Lookups allowed to be queued or running at once, across sync and async callers.
+METADATA_MAX_PENDING = max(1, int(os.getenv("SPOTDL_METADATA_MAX_PENDING", "256")))
+METADATA_MODE = os.getenv("SPOTDL_METADATA_MODE", "fast").strip().lower()
+EXTRACTION_CACHE_SIZE = max(0, int(os.getenv("SPOTDL_EXTRACTION_CACHE_SIZE", "128")))
+CANCEL_POLL_INTERVAL = 0.25
 
 
 class MetadataError(RuntimeError):
@@ -27,11 +44,19 @@ class MetadataError(RuntimeError):
         self.status_code = status_code
 
 
+class MetadataBusy(Overloaded):
+    """Raised when too many metadata lookups are already waiting for a worker slot."""
+
+    code = "metadata_busy"
+
+
 @dataclass
 class _CacheEntry:
     metadata: dict[str, str]
     song_payload: Optional[dict[str, Any]]
     expires_at: float
+    # Track length in seconds, kept even when fast mode caches no song payload.
+    duration: Optional[float] = None
 
 
 class MetadataService:
@@ -43,17 +68,25 @@ class MetadataService:
         timeout: int = METADATA_TIMEOUT,
         cache_ttl: int = METADATA_CACHE_TTL,
         metadata_concurrency: int = METADATA_CONCURRENCY,
+        extraction_cache_size: int = EXTRACTION_CACHE_SIZE,
+        metadata_mode: str = METADATA_MODE,
+        max_pending: int = METADATA_MAX_PENDING,
     ) -> None:
         self.timeout = timeout
         self.cache_ttl = cache_ttl
         self.metadata_concurrency = max(1, metadata_concurrency)
+        self.extraction_cache_size = max(0, extraction_cache_size)
+        self.metadata_mode = "full" if metadata_mode == "full" else "fast"
+        self.max_pending = max(1, max_pending)
         self._cache: dict[str, _CacheEntry] = {}
+        self._extractions: OrderedDict[str, dict[str, Any]] = OrderedDict()
         self._cache_lock = threading.RLock()
         self._worker_slots = threading.BoundedSemaphore(self.metadata_concurrency)
+        self._pending = 0
 
     @staticmethod
     def _command() -> list[str]:
-        return [sys.executable, "-m", "app.backend.metadata_worker"]
+        return worker_command("app.backend.metadata_worker")
 
     def _lookup_cache(self, key: str) -> Optional[_CacheEntry]:
         with self._cache_lock:
@@ -71,14 +104,42 @@ class MetadataService:
         key: str,
         metadata: dict[str, str],
         song_payload: Optional[dict[str, Any]],
+        duration: Optional[float] = None,
     ) -> None:
         with self._cache_lock:
             self._cache[key] = _CacheEntry(
                 metadata=dict(metadata),
                 song_payload=dict(song_payload) if song_payload else None,
                 expires_at=time.monotonic() + self.cache_ttl,
+                duration=duration,
             )
 
+    def _store_extraction(self, key: str, extraction: Any) -> None:
+        if not self.extraction_cache_size or usable_extraction(extraction) is None:
+            return
+        with self._cache_lock:
+            self._extractions[key] = extraction
+            self._extractions.move_to_end(key)
+            while len(self._extractions) > self.extraction_cache_size:
+                self._extractions.popitem(last=False)
+
+    def cache_sizes(self) -> dict[str, int]:
+        """Return cached entry counts, expired ones included until they are next read."""
+        with self._cache_lock:
+            return {"metadata_cache": len(self._cache), "extraction_cache": len(self._extractions)}
+
+    def get_cached_extraction(self, link: str) -> Optional[dict[str, Any]]:
+        """Return cached yt-dlp extraction data for a direct link while it is still usable."""
+        info = ensure_supported_single_track(link)
+        with self._cache_lock:
+            extraction = self._extractions.get(info.normalized)
+            if extraction is None:
+                return None
+            if usable_extraction(extraction) is None:
+                self._extractions.pop(info.normalized, None)
+                return None
+            return extraction
+
     def get_cached_song_payload(self, link: str) -> Optional[dict[str, Any]]:
         """Return a cached song payload, if one is still fresh."""
         info = ensure_supported_single_track(link)
@@ -86,35 +147,103 @@ class MetadataService:
             entry = self._lookup_cache(key)
             if entry and entry.song_payload is not None:
                 return dict(entry.song_payload)
+
+        # Direct-link payloads can be rebuilt from an extraction that outlived the entry.
+        external_info = usable_extraction(self.get_cached_extraction(link))
+        if external_info is not None:
+            return build_song_payload_from_external_info(info.normalized, external_info)
         return None
 
-    def get_metadata(self, link: str) -> dict[str, str]:
-        """Fetch metadata via a short-lived subprocess and cache the result."""
+    def get_cached_duration(self, link: str) -> Optional[float]:
+        """Return the cached track length in seconds, if a fresh lookup reported one."""
         info = ensure_supported_single_track(link)
         for key in (link.strip(), info.normalized):
+            entry = self._lookup_cache(key)
+            if entry is not None and entry.duration:
+                return entry.duration
+        return None
+
+    def _cached_metadata(self, link: str, normalized: str) -> Optional[dict[str, str]]:
+        for key in (link.strip(), normalized):
             entry = self._lookup_cache(key)
             if entry is not None:
                 return dict(entry.metadata)
+        return None
+
+    def peek_metadata(self, link: str) -> Optional[dict[str, str]]:
+        """Return cached metadata without starting a lookup, or `None` on a miss."""
+        info = ensure_supported_link(link)
+        metadata = self._cached_metadata(link, info.normalized)
+        if metadata is not None:
+            METADATA_CACHE_REQUESTS.inc(result="hit")
+        return metadata
+
+    def _run_worker(self, request: str, cancel_event: Optional[threading.Event]) -> tuple[str, str]:
+        """Run one metadata worker, killing it on timeout or when `cancel_event` is set."""
+        process = subprocess.Popen(
+            self._command(),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        deadline = time.monotonic() + self.timeout
+        pending_input: Optional[str] = request
+        while True:
+            try:
+                # Only the first call may pass input; later ones just keep collecting.
+                return process.communicate(input=pending_input, timeout=CANCEL_POLL_INTERVAL)
+            except subprocess.TimeoutExpired:
+                pending_input = None
+            if cancel_event is not None and cancel_event.is_set():
+                process.kill()
+                process.communicate()
+                raise MetadataError("Metadata lookup cancelled.", code="metadata_cancelled", status_code=409)
+            if time.monotonic() >= deadline:
+                process.kill()
+                process.communicate()
+                raise MetadataError(
+                    f"Metadata lookup timed out after {self.timeout} seconds.",
+                    code="metadata_timeout",
+                    status_code=504,
+                )
+
+    def get_metadata(self, link: str, *, cancel_event: Optional[threading.Event] = None) -> dict[str, str]:
+        """Fetch metadata via a short-lived subprocess and cache the result."""
+        info = ensure_supported_link(link)
+        metadata = self._cached_metadata(link, info.normalized)
+        if metadata is not None:
+            METADATA_CACHE_REQUESTS.inc(result="hit")
+            return metadata
+        METADATA_CACHE_REQUESTS.inc(result="miss")
 
+        request = json.dumps(
+            {"link": info.normalized, "mode": self.metadata_mode, "spawned_at": time.time()},
+            ensure_ascii=True,
+        )
+        with self._cache_lock:
+            if self._pending >= self.max_pending:
+                raise MetadataBusy(
+                    f"{self._pending} metadata lookups are already pending.",
+                    retry_after=retry_after_for(self._pending / self.metadata_concurrency),
+                )
+            self._pending += 1
         try:
             with self._worker_slots:
-                completed = subprocess.run(
-                    self._command(),
-                    input=json.dumps({"link": info.normalized}, ensure_ascii=True),
-                    capture_output=True,
-                    text=True,
-                    timeout=self.timeout,
-                    check=False,
-                )
-        except subprocess.TimeoutExpired as exc:
-            raise MetadataError(
-                f"Metadata lookup timed out after {self.timeout} seconds.",
-                code="metadata_timeout",
-                status_code=504,
-            ) from exc
+                if cancel_event is not None and cancel_event.is_set():
+                    raise MetadataError("Metadata lookup cancelled.", code="metadata_cancelled", status_code=409)
+                METADATA_WORKERS_SPAWNED.inc()
+                stdout, stderr_text = self._run_worker(request, cancel_event)
+        finally:
+            with self._cache_lock:
+                self._pending -= 1
 
-        stdout = completed.stdout.strip()
-        stderr = completed.stderr.strip()
+        stdout = stdout.strip()
+        stderr_lines = stderr_text.splitlines()
+        if PROFILE_IMPORTS:
+            for summary in summarize_import_times(stderr_lines):
+                LOGGER.info("metadata worker import: %s", summary)
+        stderr = "\n".join(line for line in stderr_lines if not is_importtime_line(line)).strip()
         if not stdout:
             raise MetadataError(
                 stderr or "Metadata worker returned no data.",
@@ -144,8 +273,15 @@ class MetadataService:
             status_code = 400 if code == "unsupported_input" else 502
             raise MetadataError(message, code=code, status_code=status_code)
 
+        if PROFILE_IMPORTS:
+            LOGGER.info("metadata worker startup_ms=%s", payload.get("startup_ms"))
+
         metadata = payload.get("metadata") or {}
         song_payload = payload.get("song_payload")
+        try:
+            duration = float(payload.get("duration") or 0) or None
+        except (TypeError, ValueError):
+            duration = None
         if not isinstance(metadata, dict):
             raise MetadataError(
                 "Metadata worker returned invalid metadata.",
@@ -164,5 +300,7 @@ class MetadataService:
                 key=key,
                 metadata=normalized_metadata,
                 song_payload=song_payload if isinstance(song_payload, dict) else None,
+                duration=duration,
             )
+        self._store_extraction(info.normalized, payload.get("extraction"))
         return dict(normalized_metadata)
@@ -5,14 +5,16 @@ from __future__ import annotations
 import json
 import logging
 import sys
+import time
+from typing import Optional
 
-from spotdl.types.song import Song
-
-from app.backend.inputs import UnsupportedInputError, ensure_supported_single_track
+from app.backend.inputs import COLLECTION_KINDS, UnsupportedInputError, ensure_supported_link
 from app.backend.media import (
     build_song_payload_from_external_info,
+    compact_extraction,
     extract_external_info,
     metadata_from_song_payload,
+    metadata_from_spotify_track,
 )
 from app.backend.spotify import SpotifyConfigurationError, configure_spotify_client
 
@@ -23,6 +25,26 @@ def _emit(payload: dict[str, object]) -> None:
     print(json.dumps(payload, ensure_ascii=True), flush=True)
 
 
+def _startup_ms(request: dict[str, object], started_at: float) -> float | None:
+    """Milliseconds from the parent's spawn to this worker reading its request."""
+    try:
+        spawned_at = float(request.get("spawned_at") or 0.0)
+    except (TypeError, ValueError):
+        return None
+    return round(max(0.0, started_at - spawned_at) * 1000.0, 1) if spawned_at else None
+
+
+def _spotify_track_metadata(url: str) -> tuple[dict[str, str], Optional[float]]:
+    """Return row metadata and the track length in seconds from one track call."""
+    from spotdl.utils.spotify import SpotifyClient
+
+    track = SpotifyClient().track(url)
+    if not isinstance(track, dict):
+        raise RuntimeError("Couldn't get metadata, check if you have passed correct track id")
+    duration_ms = track.get("duration_ms")
+    return metadata_from_spotify_track(track), duration_ms / 1000 if duration_ms else None
+
+
 def main() -> None:
     logging.basicConfig(
         level=logging.INFO,
@@ -32,22 +54,44 @@ def main() -> None:
 
     try:
         request = json.load(sys.stdin)
+        started_at = time.time()
         link = str(request.get("link") or "").strip()
-        info = ensure_supported_single_track(link)
+        mode = str(request.get("mode") or "full")
+        info = ensure_supported_link(link)
 
-        if info.kind == "spotify_track":
+        payload = None
+        extraction = None
+        duration = None
+        if info.kind in COLLECTION_KINDS:
+            from app.backend.playlist_worker import fetch_collection_metadata
+
+            # The row only needs the header; tracks are listed when the collection is downloaded.
+            metadata = fetch_collection_metadata(info.normalized)
+        elif info.kind == "spotify_track":
             configure_spotify_client()
-            song = Song.from_url(info.normalized)
-            payload = song.json
+            if mode == "fast":
+                # One track call is enough for the row; the download worker builds the full Song.
+                # The length still travels back so deadlines and scheduling can use it.
+                metadata, duration = _spotify_track_metadata(info.normalized)
+            else:
+                from spotdl.types.song import Song
+
+                payload = Song.from_url(info.normalized).json
+                metadata = metadata_from_song_payload(payload)
         else:
             external_info = extract_external_info(info.normalized)
             payload = build_song_payload_from_external_info(info.normalized, external_info)
+            metadata = metadata_from_song_payload(payload)
+            extraction = compact_extraction(external_info)
 
         _emit(
             {
                 "ok": True,
-                "metadata": metadata_from_song_payload(payload),
+                "metadata": metadata,
                 "song_payload": payload,
+                "extraction": extraction,
+                "duration": duration,
+                "startup_ms": _startup_ms(request, started_at),
             }
         )
     except UnsupportedInputError as exc:
@@ -0,0 +1,186 @@
+"""One-shot subprocess that streams a playlist's or album's tracks, one page at a time.
+
+Events are JSON lines on stdout: one `collection` header, a `tracks` event per API
+page, then `done` or `failed`. The parent stops reading while its queue window is
+full, so this process blocks on the pipe instead of buffering a 10k-track playlist.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sys
+from typing import Any, Iterator, Optional
+from urllib.parse import urlsplit
+
+from app.backend.covers import CoverFetchError, cover_key, default_cover_cache
+from app.backend.inputs import LinkInfo, UnsupportedInputError, classify_link, ensure_supported_link
+from app.backend.media import (
+    build_song_payload_from_external_info,
+    metadata_from_external_collection,
+    metadata_from_spotify_collection,
+    song_payload_from_spotify_track,
+)
+from app.backend.spotify import SpotifyConfigurationError, configure_spotify_client
+
+LOGGER = logging.getLogger(__name__)
+PLAYLIST_PAGE_SIZE = 100
+EXTERNAL_PAGE_SIZE = 50
+SOCKET_TIMEOUT = 30
+
+
+def _emit(payload: dict[str, Any]) -> None:
+    print(json.dumps(payload, ensure_ascii=True), flush=True)
+
+
+def _spotify_collection(link: str) -> tuple[str, str]:
+    """Return `("playlist" | "album", id)` for a normalized Spotify collection link."""
+    parts = [part for part in urlsplit(link).path.split("/") if part]
+    if len(parts) < 2 or parts[-2] not in {"playlist", "album"}:
+        raise UnsupportedInputError(f"Not a Spotify playlist or album link: {link}")
+    return parts[-2], parts[-1]
+
+
+def _prefetch_cover(url: str) -> None:
+    """Put shared album art in the cover cache once, so child downloads embed it from disk."""
+    if not url:
+        return
+    default_cover_cache.proxy_url(url)
+    try:
+        default_cover_cache.original(cover_key(url))
+    except (CoverFetchError, OSError) as exc:
+        LOGGER.warning("Could not prefetch cover art %s: %s", url, exc)
+
+
+def _spotify_events(info: LinkInfo) -> Iterator[dict[str, Any]]:
+    from spotdl.utils.spotify import SpotifyClient
+
+    configure_spotify_client()
+    client = SpotifyClient()
+    kind, collection_id = _spotify_collection(info.normalized)
+    if kind == "album":
+        header = client.album(collection_id)
+    else:
+        header = client.playlist(collection_id, fields="name,owner(display_name),images,tracks(total)")
+    total = int((header.get("tracks") or {}).get("total") or 0)
+    metadata = metadata_from_spotify_collection(header)
+    yield {"type": "collection", **metadata, "total": total}
+
+    album: Optional[dict[str, Any]] = None
+    if kind == "album":
+        # Album tracks are simplified objects; every child shares this one album lookup.
+        album = {key: value for key, value in header.items() if key != "tracks"}
+        page = header.get("tracks") or {}
+        _prefetch_cover(metadata["cover"])
+    else:
+        page = client.playlist_items(collection_id, limit=PLAYLIST_PAGE_SIZE, additional_types=("track",))
+
+    position = 0
+    while page:
+        tracks = []
+        for item in page.get("items") or ():
+            track = item if album is not None else (item or {}).get("track")
+            position += 1
+            if not isinstance(track, dict) or track.get("type", "track") != "track":
+                continue
+            payload = song_payload_from_spotify_track(
+                track,
+                album,
+                list_name=metadata["title"],
+                list_url=info.normalized,
+                list_position=position,
+                list_length=total,
+            )
+            if payload is not None:
+                tracks.append({"link": payload["url"], "song_payload": payload})
+        yield {"type": "tracks", "tracks": tracks}
+        page = client.next(page) if page.get("next") else None
+
+
+def _external_events(info: LinkInfo) -> Iterator[dict[str, Any]]:
+    from yt_dlp import YoutubeDL
+
+    options = {
+        "quiet": True,
+        "no_warnings": True,
+        "skip_download": True,
+        "extract_flat": "in_playlist",
+        "lazy_playlist": True,
+        "socket_timeout": SOCKET_TIMEOUT,
+    }
+    with YoutubeDL(options) as youtube_dl:
+        # Unprocessed, so entries are fetched page by page as they are iterated.
+        header = youtube_dl.extract_info(info.normalized, download=False, process=False)
+        if not isinstance(header, dict):
+            raise RuntimeError("yt-dlp did not return a playlist for this link.")
+        metadata = metadata_from_external_collection(header)
+        total = int(header.get("playlist_count") or 0)
+        yield {"type": "collection", **metadata, "total": total}
+
+        tracks: list[dict[str, Any]] = []
+        for position, entry in enumerate(header.get("entries") or (), start=1):
+            if not isinstance(entry, dict):
+                continue
+            link = str(entry.get("webpage_url") or entry.get("url") or "").strip()
+            if classify_link(link).kind != "external_media":
+                continue
+            payload = build_song_payload_from_external_info(link, entry)
+            payload.update(
+                list_name=metadata["title"],
+                list_url=info.normalized,
+                list_position=position,
+                list_length=total,
+            )
+            tracks.append({"link": link, "song_payload": payload})
+            if len(tracks) >= EXTERNAL_PAGE_SIZE:
+                yield {"type": "tracks", "tracks": tracks}
+                tracks = []
+        if tracks:
+            yield {"type": "tracks", "tracks": tracks}
+
+
+def collection_events(link: str) -> Iterator[dict[str, Any]]:
+    """Yield a `collection` header, then one `tracks` event per page of a collection link."""
+    info = ensure_supported_link(link)
+    if info.kind == "spotify_collection":
+        yield from _spotify_events(info)
+    elif info.kind == "external_collection":
+        yield from _external_events(info)
+    else:
+        raise UnsupportedInputError("Only playlist and album links can be expanded.")
+
+
+def fetch_collection_metadata(link: str) -> dict[str, str]:
+    """Return row metadata for a collection from its header alone, without listing tracks."""
+    header = next(collection_events(link))
+    return {key: str(header[key]) for key in ("title", "artist", "album", "cover")}
+
+
+def main() -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+        stream=sys.stderr,
+    )
+
+    count = 0
+    try:
+        request = json.load(sys.stdin)
+        for event in collection_events(str(request.get("link") or "").strip()):
+            if event["type"] == "tracks":
+                if not event["tracks"]:
+                    continue
+                count += len(event["tracks"])
+            _emit(event)
+        _emit({"type": "done", "count": count})
+    except UnsupportedInputError as exc:
+        _emit({"type": "failed", "error": str(exc), "code": "unsupported_input"})
+    except SpotifyConfigurationError as exc:
+        _emit({"type": "failed", "error": str(exc), "code": "missing_spotify_credentials"})
+    except Exception as exc:
+        LOGGER.exception("Collection listing failed")
+        _emit({"type": "failed", "error": str(exc) or "Could not list the collection.", "code": "collection_error"})
+
+
+if __name__ == "__main__":
+    main()
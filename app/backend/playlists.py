@@ -0,0 +1,227 @@
+"""Parent-side state and streaming reader for playlist and album downloads."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+from app.backend.profiling import worker_command
+from app.backend.workers import job_log_path
+
+LOGGER = logging.getLogger(__name__)
+
+# Child jobs one collection may have waiting in the download queue; listing pauses beyond it.
+COLLECTION_WINDOW = max(1, int(os.getenv("SPOTDL_COLLECTION_WINDOW", "50")))
+# Collections being listed at once; more wait their turn as `queued`.
+COLLECTION_CONCURRENCY = max(1, int(os.getenv("SPOTDL_COLLECTION_CONCURRENCY", "2")))
+# Finished collections kept for `/status`; the oldest beyond this are dropped.
+FINISHED_COLLECTIONS = max(1, int(os.getenv("SPOTDL_FINISHED_COLLECTIONS", "100")))
+
+
+class CollectionError(RuntimeError):
+    """Raised when a playlist or album could not be listed."""
+
+    def __init__(self, message: str, *, code: str = "collection_error") -> None:
+        super().__init__(message)
+        self.code = code
+
+
+@dataclass
+class CollectionJob:
+    """Aggregate state of one playlist or album; its tracks run as ordinary jobs.
+
+    Only counters are kept, not the child links, so a 10k-track playlist costs the
+    same here as a ten-track album.
+    """
+
+    job_id: str
+    link: str
+    status: str = "queued"
+    phase: str = "queued"
+    name: str = ""
+    cover: str = ""
+    total: Optional[int] = None
+    listing: bool = True
+    enqueued: int = 0
+    waiting: int = 0
+    completed: int = 0
+    failed: int = 0
+    cancelled: int = 0
+    # Tracks that already have their own row; that row reports them, not this one.
+    skipped: int = 0
+    cancel_requested: bool = False
+    error_message: Optional[str] = None
+    error_class: Optional[str] = None
+    expander: Optional["CollectionExpander"] = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+    @property
+    def finished(self) -> int:
+        return self.completed + self.failed + self.cancelled
+
+    def detail(self) -> str:
+        if self.error_message and self.status == "error":
+            return self.error_message
+        if self.status == "idle":
+            return "Cancelled"
+        if self.status == "queued":
+            return "Queued"
+        total = self.total - self.skipped if self.listing and self.total else self.enqueued
+        parts = [f"{self.completed} of {total or '?'} tracks downloaded"]
+        if self.failed:
+            parts.append(f"{self.failed} failed")
+        if self.listing:
+            parts.append(f"listed {self.enqueued + self.skipped}")
+        return ", ".join(parts)
+
+    def to_payload(self, active_progress: float = 0.0) -> dict[str, object]:
+        """Build a `/status` entry shaped like a track's, plus a `collection` summary."""
+        total = max(self.total or 0, self.enqueued + self.skipped) - self.skipped
+        progress = 0.0
+        if total:
+            progress = min(100.0, (100.0 * self.finished + active_progress) / total)
+        if self.status == "done":
+            progress = 100.0
+        return {
+            "job_id": self.job_id,
+            "link": self.link,
+            "status": self.status,
+            "phase": self.phase,
+            "detail": self.detail(),
+            "progress": round(progress, 1),
+            "progress_known": bool(total) and self.status != "queued",
+            "error_message": self.error_message,
+            "error_class": self.error_class,
+            "file_path": None,
+            "can_reveal": False,
+            "log_path": str(job_log_path(self.job_id)),
+            "stderr_tail": [],
+            "resources": None,
+            "phase_seconds": {},
+            "attempt": 1,
+            "retries": [],
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "collection": {
+                "name": self.name,
+                "cover": self.cover,
+                "total": self.total,
+                "listing": self.listing,
+                "enqueued": self.enqueued,
+                "completed": self.completed,
+                "failed": self.failed,
+                "cancelled": self.cancelled,
+                "skipped": self.skipped,
+            },
+        }
+
+
+class CollectionExpander:
+    """Run `app.backend.playlist_worker` for one link and yield its events as they arrive.
+
+    Nothing is read ahead: while the caller is blocked enqueueing a page, the worker
+    blocks writing the next one, so listing never gets far ahead of downloading.
+    """
+
+    def __init__(
+        self,
+        link: str,
+        job_id: str,
+        *,
+        command: Optional[Callable[[], list[str]]] = None,
+    ) -> None:
+        self.link = link
+        self.job_id = job_id
+        self._command = command or (lambda: worker_command("app.backend.playlist_worker"))
+        self._process: Optional[subprocess.Popen] = None
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+
+    def events(self) -> Iterator[dict[str, Any]]:
+        """Yield `collection` and `tracks` events; raise `CollectionError` if listing fails."""
+        log_path = job_log_path(self.job_id)
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(log_path, "w", encoding="utf-8") as log_file:
+            with self._lock:
+                if self._cancelled.is_set():
+                    return
+                self._process = subprocess.Popen(
+                    self._command(),
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=log_file,
+                    text=True,
+                    start_new_session=os.name == "posix",
+                )
+            process = self._process
+            try:
+                process.stdin.write(json.dumps({"link": self.link}, ensure_ascii=True))
+                process.stdin.close()
+            except OSError:
+                pass
+
+            finished = False
+            try:
+                for raw_line in process.stdout:
+                    try:
+                        event = json.loads(raw_line)
+                    except json.JSONDecodeError:
+                        continue
+                    if not isinstance(event, dict):
+                        continue
+                    event_type = event.get("type")
+                    if event_type == "failed":
+                        raise CollectionError(
+                            str(event.get("error") or "Could not list the collection."),
+                            code=str(event.get("code") or "collection_error"),
+                        )
+                    if event_type == "done":
+                        finished = True
+                        break
+                    yield event
+            finally:
+                process.stdout.close()
+                self._kill_group()
+                process.wait()
+
+        if not finished and not self._cancelled.is_set():
+            raise CollectionError(self._stderr_tail(log_path) or "The collection listing stopped unexpectedly.")
+
+    @staticmethod
+    def _stderr_tail(log_path: Path) -> str:
+        """Return the last line the worker logged, which is usually the error."""
+        try:
+            with open(log_path, encoding="utf-8", errors="replace") as handle:
+                lines = deque((line.rstrip() for line in handle if line.strip()), maxlen=1)
+        except OSError:
+            return ""
+        return lines[0] if lines else ""
+
+    def _kill_group(self) -> None:
+        with self._lock:
+            process = self._process
+        if process is None or process.returncode is not None:
+            return
+        try:
+            if os.name == "posix":
+                os.killpg(process.pid, signal.SIGKILL)
+            else:  # pragma: no cover - Windows only
+                process.kill()
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def cancel(self) -> None:
+        """Stop listing; `events` then returns without raising."""
+        with self._lock:
+            self._cancelled.set()
+        self._kill_group()
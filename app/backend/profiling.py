@@ -0,0 +1,160 @@
+"""Opt-in import, job and process profiling helpers."""
+
+from __future__ import annotations
+
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+
+PROFILE_IMPORTS = os.getenv("SPOTDL_PROFILE_IMPORTS", "").strip() == "1"
+IMPORTTIME_PREFIX = "import time:"
+# Fraction of download jobs that run under the profiler (0 disables sampling).
+PROFILE_JOBS = min(1.0, max(0.0, float(os.getenv("SPOTDL_PROFILE_JOBS", "0"))))
+# Sampling is the default because it sees every thread; cProfile only records the thread
+# that started it, and spotDL runs yt-dlp search, download and ffmpeg in executor threads.
+PROFILE_MODE = os.getenv("SPOTDL_PROFILE_MODE", "sample").strip().lower()
+PROFILE_SAMPLE_INTERVAL = max(0.001, float(os.getenv("SPOTDL_PROFILE_SAMPLE_INTERVAL", "0.005")))
+PROFILE_MODES = ("cprofile", "sample")
+_PROFILE_SUFFIXES = {"cprofile": ".prof", "sample": ".folded"}
+
+
+def worker_command(module: str) -> list[str]:
+    """Return the interpreter command for a worker module, with `-X importtime` if enabled."""
+    if PROFILE_IMPORTS:
+        return [sys.executable, "-X", "importtime", "-m", module]
+    return [sys.executable, "-m", module]
+
+
+def is_importtime_line(line: str) -> bool:
+    """Return whether a stderr line came from `-X importtime` rather than the worker."""
+    return line.startswith(IMPORTTIME_PREFIX)
+
+
+def summarize_import_times(lines: Iterable[str], *, limit: int = 10) -> list[str]:
+    """Return the slowest imports by cumulative time as `"<ms> ms <module>"` strings."""
+    timings: list[tuple[int, str]] = []
+    for line in lines:
+        if not is_importtime_line(line):
+            continue
+        parts = line[len(IMPORTTIME_PREFIX):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            cumulative_us = int(parts[1].strip())
+        except ValueError:
+            continue
+        timings.append((cumulative_us, parts[2].strip()))
+
+    timings.sort(reverse=True)
+    return [f"{cumulative_us / 1000:.1f} ms {module}" for cumulative_us, module in timings[:limit]]
+
+
+def normalize_profile_mode(value: Any) -> Optional[str]:
+    """Map a request value (`true`, `"sample"`, ...) to a profiler mode, or `None`."""
+    if value is True:
+        return PROFILE_MODE if PROFILE_MODE in PROFILE_MODES else "sample"
+    if isinstance(value, str) and value.strip().lower() in PROFILE_MODES:
+        return value.strip().lower()
+    return None
+
+
+def sampled_profile_mode() -> Optional[str]:
+    """Return the configured mode for roughly `SPOTDL_PROFILE_JOBS` of all jobs."""
+    if PROFILE_JOBS and random.random() < PROFILE_JOBS:
+        return normalize_profile_mode(True)
+    return None
+
+
+def profile_path(log_path: Path, mode: str) -> Path:
+    """Return where a job's profile goes: next to its log, `.prof` or `.folded`."""
+    return log_path.with_suffix(_PROFILE_SUFFIXES.get(mode, ".prof"))
+
+
+def _frame_label(code) -> str:
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{code.co_name} ({module}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Periodically sample every thread's Python stack from a background thread.
+
+    Stacks are aggregated in the "folded" format (`root;caller;callee count`) that
+    flamegraph.pl and speedscope read. Threads are identified by their name, so a
+    download thread and the Flask request threads land in separate trees.
+    """
+
+    def __init__(self, interval: float = PROFILE_SAMPLE_INTERVAL) -> None:
+        self.interval = interval
+        self.samples = 0
+        self._stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample_once(self) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        own_ident = threading.get_ident()
+        for ident, frame in sys._current_frames().items():  # noqa: SLF001
+            if ident == own_ident:
+                continue
+            labels: list[str] = []
+            while frame is not None:
+                labels.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            labels.append(names.get(ident, f"thread-{ident}"))
+            self._stacks[";".join(reversed(labels))] += 1
+        self.samples += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample_once()
+
+    def start(self) -> "StackSampler":
+        self._thread = threading.Thread(target=self._run, daemon=True, name="profile-sampler")
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self._stacks.most_common())
+
+
+def run_profiled(func: Callable[[], None], *, mode: str, path: Path) -> None:
+    """Run `func` under the chosen profiler and write the result to `path`.
+
+    `sample` covers every thread in the process; `cprofile` only the calling one.
+    """
+    if mode == "sample":
+        sampler = StackSampler().start()
+        try:
+            func()
+        finally:
+            sampler.stop()
+            path.write_text(sampler.folded(), encoding="utf-8")
+        return
+
+    import cProfile
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.runcall(func)
+    finally:
+        profiler.dump_stats(str(path))
+
+
+def profile_process(seconds: float, *, interval: float = PROFILE_SAMPLE_INTERVAL) -> str:
+    """Sample all threads of this process for `seconds` and return folded stacks."""
+    sampler = StackSampler(interval).start()
+    try:
+        time.sleep(seconds)
+    finally:
+        sampler.stop()
+    return sampler.folded()
@@ -0,0 +1,156 @@
+"""Memory-mapped table of per-slot download progress shared with worker processes.
+
+The supervisor creates one small file-backed table and hands each active job a slot.
+The worker writes phase, progress and transferred bytes straight into its slot, and
+status reads sample the table on demand, so progress never crosses the event pipe.
+Each slot is guarded by a sequence counter (a seqlock): the single writer makes it
+odd while updating, and readers retry until they see the same even value twice.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+PROGRESS_TABLE_MODE = os.getenv("SPOTDL_PROGRESS_TABLE", "1").strip().lower()
+SLOT_SIZE = 128
+DETAIL_BYTES = 64
+_SEQUENCE = struct.Struct("=I")
+# phase index, progress_known, progress, bytes downloaded, bytes total, updated_at, detail
+_BODY = struct.Struct(f"=BBxxdQQd{DETAIL_BYTES}s")
+_BODY_OFFSET = 8
+PHASES = ("downloading", "resolving", "postprocessing", "searching")
+_PHASE_INDEX = {phase: index for index, phase in enumerate(PHASES)}
+_READ_ATTEMPTS = 16
+
+
+def progress_table_enabled() -> bool:
+    return PROGRESS_TABLE_MODE not in {"0", "off", "false", "no"}
+
+
+@dataclass(frozen=True)
+class ProgressSample:
+    """One consistent read of a worker's progress slot."""
+
+    phase: str
+    detail: str
+    progress: float
+    progress_known: bool
+    bytes_downloaded: int
+    bytes_total: int
+    updated_at: float
+
+
+class ProgressTable:
+    """Fixed-size array of progress slots backed by a shared memory-mapped file."""
+
+    def __init__(self, path: Path, slots: int, *, owner: bool = False) -> None:
+        self.path = Path(path)
+        self.slots = slots
+        self._owner = owner
+        self._free = list(range(slots - 1, -1, -1)) if owner else []
+        self._lock = threading.Lock()
+        with self.path.open("r+b") as handle:
+            self._map = mmap.mmap(handle.fileno(), slots * SLOT_SIZE)
+
+    @classmethod
+    def create(cls, slots: int) -> "ProgressTable":
+        """Create a zeroed table, preferring RAM-backed `/dev/shm` where it exists."""
+        directory = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
+        fd, path = tempfile.mkstemp(prefix="spotdl-progress-", suffix=".bin", dir=directory)
+        try:
+            os.ftruncate(fd, max(1, slots) * SLOT_SIZE)
+        finally:
+            os.close(fd)
+        return cls(Path(path), max(1, slots), owner=True)
+
+    @classmethod
+    def attach(cls, path: str | Path) -> "ProgressTable":
+        """Map an existing table, e.g. from inside a worker process."""
+        size = os.path.getsize(path)
+        return cls(Path(path), size // SLOT_SIZE)
+
+    def acquire(self) -> Optional[int]:
+        """Reserve a cleared slot for a new job, or return `None` when all are taken."""
+        with self._lock:
+            if not self._free:
+                return None
+            slot = self._free.pop()
+        self._map[slot * SLOT_SIZE:(slot + 1) * SLOT_SIZE] = bytes(SLOT_SIZE)
+        return slot
+
+    def release(self, slot: int) -> None:
+        with self._lock:
+            if 0 <= slot < self.slots and slot not in self._free:
+                self._free.append(slot)
+
+    def sequence(self, slot: int) -> int:
+        """Return the slot's write counter; it changes on every update."""
+        return _SEQUENCE.unpack_from(self._map, slot * SLOT_SIZE)[0]
+
+    def write(
+        self,
+        slot: int,
+        *,
+        phase: str,
+        detail: str,
+        progress: float,
+        progress_known: bool,
+        bytes_downloaded: int = 0,
+        bytes_total: int = 0,
+    ) -> None:
+        """Publish one update; only the worker that owns the slot may call this."""
+        offset = slot * SLOT_SIZE
+        sequence = _SEQUENCE.unpack_from(self._map, offset)[0]
+        _SEQUENCE.pack_into(self._map, offset, (sequence + 1) & 0xFFFFFFFF)
+        _BODY.pack_into(
+            self._map,
+            offset + _BODY_OFFSET,
+            _PHASE_INDEX.get(phase, 0),
+            1 if progress_known else 0,
+            float(progress),
+            max(0, int(bytes_downloaded)),
+            max(0, int(bytes_total)),
+            time.time(),
+            detail.encode("utf-8")[:DETAIL_BYTES],
+        )
+        _SEQUENCE.pack_into(self._map, offset, (sequence + 2) & 0xFFFFFFFF)
+
+    def read(self, slot: int) -> Optional[ProgressSample]:
+        """Return the slot's latest update, or `None` if nothing was written yet."""
+        offset = slot * SLOT_SIZE
+        for _ in range(_READ_ATTEMPTS):
+            before = _SEQUENCE.unpack_from(self._map, offset)[0]
+            if before == 0:
+                return None
+            if before & 1:
+                continue
+            phase, known, progress, done, total, updated_at, detail = _BODY.unpack_from(
+                self._map, offset + _BODY_OFFSET
+            )
+            if _SEQUENCE.unpack_from(self._map, offset)[0] == before:
+                return ProgressSample(
+                    phase=PHASES[phase] if phase < len(PHASES) else PHASES[0],
+                    detail=detail.rstrip(b"\0").decode("utf-8", "ignore"),
+                    progress=progress,
+                    progress_known=bool(known),
+                    bytes_downloaded=done,
+                    bytes_total=total,
+                    updated_at=updated_at,
+                )
+        return None
+
+    def close(self) -> None:
+        self._map.close()
+        if self._owner:
+            try:
+                self.path.unlink()
+            except OSError:
+                pass
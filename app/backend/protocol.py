@@ -5,7 +5,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any, Optional
 
-DEFAULT_AUDIO_PROVIDERS = ("youtube-music", "piped", "youtube")
+# Search order for audio; each retry of a failed job moves the first provider to the back.
+DEFAULT_AUDIO_PROVIDERS = ("youtube", "youtube-music", "piped")
 DEFAULT_SEARCH_QUERY = "{artist} - {title}"
 OUTPUT_TEMPLATE = "{artists} - {title}.{output-ext}"
 
@@ -23,6 +24,12 @@ class DownloadJobSpec:
     source_url: Optional[str] = None
     audio_providers: tuple[str, ...] = DEFAULT_AUDIO_PROVIDERS
     search_query: str = DEFAULT_SEARCH_QUERY
+    extraction: Optional[dict[str, Any]] = None
+    progress_table: Optional[str] = None
+    progress_slot: Optional[int] = None
+    profile: Optional[str] = None
+    # Track length in seconds from metadata lookups that cached no song payload.
+    duration: Optional[float] = None
 
     def to_payload(self) -> dict[str, Any]:
         """Return a JSON-serializable worker payload."""
@@ -36,4 +43,9 @@ class DownloadJobSpec:
             "source_url": self.source_url,
             "audio_providers": list(self.audio_providers),
             "search_query": self.search_query,
+            "extraction": self.extraction,
+            "progress_table": self.progress_table,
+            "progress_slot": self.progress_slot,
+            "profile": self.profile,
+            "duration": self.duration,
         }
@@ -0,0 +1,169 @@
+"""Cross-process token bucket shared by every worker that talks to the Spotify API."""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Callable, Iterator, Mapping, Optional
+
+from config import SETTINGS_DIR
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows only
+    fcntl = None
+    import msvcrt
+
+SPOTIFY_RATE_PER_SECOND = max(0.1, float(os.getenv("SPOTDL_SPOTIFY_RATE", "4")))
+SPOTIFY_RATE_BURST = max(1, int(os.getenv("SPOTDL_SPOTIFY_BURST", "8")))
+SPOTIFY_MAX_BACKOFF = max(1, int(os.getenv("SPOTDL_SPOTIFY_MAX_BACKOFF", "120")))
+SPOTIFY_RATE_STATE_FILE = Path(
+    os.getenv("SPOTDL_SPOTIFY_RATE_FILE", "").strip() or SETTINGS_DIR / "spotify-rate.json"
+)
+
+
+class RateLimitTimeout(RuntimeError):
+    """Raised when a token could not be acquired before the caller's deadline."""
+
+
+def _lock_file(handle) -> None:
+    if fcntl is not None:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+    else:  # pragma: no cover - Windows only
+        handle.seek(0)
+        msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+
+
+def _unlock_file(handle) -> None:
+    if fcntl is not None:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+    else:  # pragma: no cover - Windows only
+        handle.seek(0)
+        msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def retry_after_seconds(headers: Optional[Mapping[str, Any]], *, default: float) -> float:
+    """Parse a `Retry-After` header given as delta-seconds or an HTTP date."""
+    if not headers:
+        return default
+
+    raw_value = None
+    for key, value in headers.items():
+        if str(key).lower() == "retry-after":
+            raw_value = str(value).strip()
+            break
+    if not raw_value:
+        return default
+
+    try:
+        return max(0.0, float(raw_value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(raw_value)
+    except (TypeError, ValueError):
+        return default
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class SharedTokenBucket:
+    """Token bucket whose state lives in a lock-protected file shared by all processes."""
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        rate: float = SPOTIFY_RATE_PER_SECOND,
+        burst: int = SPOTIFY_RATE_BURST,
+        max_backoff: float = SPOTIFY_MAX_BACKOFF,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.path = Path(path)
+        self.rate = max(0.001, float(rate))
+        self.burst = max(1, int(burst))
+        self.max_backoff = max(0.0, float(max_backoff))
+        self._clock = clock
+        self._sleep = sleep
+
+    @contextmanager
+    def _locked_state(self) -> Iterator[dict[str, float]]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        with os.fdopen(fd, "r+", encoding="utf-8") as handle:
+            _lock_file(handle)
+            try:
+                handle.seek(0)
+                raw = handle.read()
+                try:
+                    state = json.loads(raw) if raw.strip() else {}
+                except json.JSONDecodeError:
+                    state = {}
+                if not isinstance(state, dict):
+                    state = {}
+
+                yield state
+
+                handle.seek(0)
+                handle.truncate()
+                handle.write(json.dumps(state))
+                handle.flush()
+            finally:
+                _unlock_file(handle)
+
+    def _refill(self, state: dict[str, float], now: float) -> float:
+        try:
+            tokens = float(state.get("tokens", self.burst))
+            updated_at = float(state.get("updated_at", now))
+        except (TypeError, ValueError):
+            tokens, updated_at = float(self.burst), now
+
+        tokens = min(float(self.burst), tokens + max(0.0, now - updated_at) * self.rate)
+        state["tokens"] = tokens
+        state["updated_at"] = now
+        return tokens
+
+    def try_acquire(self) -> float:
+        """Take one token and return `0.0`, or return how long to wait before retrying."""
+        now = self._clock()
+        with self._locked_state() as state:
+            tokens = self._refill(state, now)
+            blocked_until = float(state.get("blocked_until") or 0.0)
+            if blocked_until > now:
+                return blocked_until - now
+            if tokens >= 1.0:
+                state["tokens"] = tokens - 1.0
+                return 0.0
+            return (1.0 - tokens) / self.rate
+
+    def acquire(self, *, timeout: Optional[float] = None) -> None:
+        """Block until a token is available across every participating process."""
+        deadline = None if timeout is None else self._clock() + timeout
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                return
+            if deadline is not None and self._clock() + wait > deadline:
+                raise RateLimitTimeout(
+                    f"Spotify rate limiter could not grant a request within {timeout} seconds."
+                )
+            self._sleep(min(wait, 1.0))
+
+    def defer(self, seconds: float) -> float:
+        """Pause every participant, e.g. after Spotify answers 429 with `Retry-After`."""
+        delay = min(max(0.0, float(seconds)), self.max_backoff)
+        now = self._clock()
+        with self._locked_state() as state:
+            self._refill(state, now)
+            blocked_until = float(state.get("blocked_until") or 0.0)
+            state["blocked_until"] = max(blocked_until, now + delay)
+            state["tokens"] = 0.0
+        return delay
+
+
+spotify_rate_limiter = SharedTokenBucket(SPOTIFY_RATE_STATE_FILE)
@@ -0,0 +1,137 @@
+"""Decide which failed downloads are worth another attempt, when, and with which provider."""
+
+from __future__ import annotations
+
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional, Sequence
+
+from app.backend.workers import WorkerOutcome
+
+LOGGER = logging.getLogger(__name__)
+
+# Total attempts per job, the first one included.
+RETRY_MAX_ATTEMPTS = max(1, int(os.getenv("SPOTDL_RETRY_ATTEMPTS", "3")))
+RETRY_BASE_DELAY = max(0.0, float(os.getenv("SPOTDL_RETRY_BASE_DELAY", "5")))
+RETRY_MAX_DELAY = max(1.0, float(os.getenv("SPOTDL_RETRY_MAX_DELAY", "120")))
+# Retries allowed per minute across all jobs, so a provider outage cannot double the load on it.
+RETRY_BUDGET = max(0, int(os.getenv("SPOTDL_RETRY_BUDGET", "30")))
+# Providers that are throttling us need longer to recover than a dropped connection does.
+REASON_DELAY_FACTOR = {"throttled": 4.0}
+
+# Failures that another attempt cannot fix: bad input, missing setup, user or resource limits,
+# and jobs that already used their whole hard deadline.
+PERMANENT_ERROR_CLASSES = frozenset(
+    {"unsupported_input", "missing_spotify_credentials", "cpu_limit", "terminated", "monitor_error", "hard_timeout"}
+)
+_MESSAGE_PATTERNS: tuple[tuple[str, tuple[str, ...]], ...] = (
+    (
+        "throttled",
+        ("429", "too many requests", "rate limit", "rate-limit", "sign in to confirm", "http error 403", "quota"),
+    ),
+    (
+        "network",
+        (
+            "timed out",
+            "connection reset",
+            "connection refused",
+            "connection aborted",
+            "remote end closed",
+            "temporary failure in name resolution",
+            "name or service not known",
+            "network is unreachable",
+            "urlopen error",
+            "incomplete read",
+            "http error 5",
+        ),
+    ),
+    ("no_match", ("no results found", "did not return a downloadable result", "video unavailable")),
+)
+
+
+def classify_failure(outcome: WorkerOutcome) -> Optional[str]:
+    """Return why a failed attempt looks transient (`throttled`, `network`, ...), or `None`."""
+    error_class = outcome.error_class or "download_error"
+    if error_class in PERMANENT_ERROR_CLASSES:
+        return None
+    if error_class in {"idle_timeout", "heartbeat_timeout"}:
+        return "stalled"
+    if error_class in {"worker_exit", "no_result"}:
+        return "crashed"
+
+    text = " ".join([outcome.error_message or "", *outcome.stderr_tail]).lower()
+    for reason, patterns in _MESSAGE_PATTERNS:
+        if any(pattern in text for pattern in patterns):
+            return reason
+    return None
+
+
+def backoff_delay(attempt: int, *, base: float, cap: float, rng: Callable[[], float] = random.random) -> float:
+    """Exponential backoff with equal jitter for the wait before `attempt` (2 for the first retry)."""
+    ceiling = min(cap, base * 2 ** max(0, attempt - 2))
+    return ceiling / 2 + rng() * ceiling / 2
+
+
+def rotate_providers(providers: Sequence[str]) -> tuple[str, ...]:
+    """Move the provider that just failed to the back of the search order."""
+    return (*providers[1:], *providers[:1])
+
+
+@dataclass(frozen=True)
+class RetryDecision:
+    attempt: int
+    reason: str
+    delay: float
+
+
+class RetryPolicy:
+    """Classify failed attempts and hand out retries from a global per-minute budget."""
+
+    def __init__(
+        self,
+        *,
+        max_attempts: int = RETRY_MAX_ATTEMPTS,
+        base_delay: float = RETRY_BASE_DELAY,
+        max_delay: float = RETRY_MAX_DELAY,
+        budget_per_minute: int = RETRY_BUDGET,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Callable[[], float] = random.random,
+    ) -> None:
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget_per_minute = budget_per_minute
+        self._clock = clock
+        self._rng = rng
+        self._tokens = float(budget_per_minute)
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+
+    def _take_budget(self) -> bool:
+        with self._lock:
+            now = self._clock()
+            refill = (now - self._updated_at) * self.budget_per_minute / 60.0
+            self._tokens = min(float(self.budget_per_minute), self._tokens + refill)
+            self._updated_at = now
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+    def decide(self, outcome: WorkerOutcome, attempt: int) -> Optional[RetryDecision]:
+        """Return when and why to run attempt `attempt + 1`, or `None` to fail the job now."""
+        if attempt >= self.max_attempts:
+            return None
+        reason = classify_failure(outcome)
+        if reason is None:
+            return None
+        if not self._take_budget():
+            LOGGER.warning("Retry budget of %s per minute is used up; not retrying", self.budget_per_minute)
+            return None
+        base = self.base_delay * REASON_DELAY_FACTOR.get(reason, 1.0)
+        delay = backoff_delay(attempt + 1, base=base, cap=self.max_delay, rng=self._rng)
+        return RetryDecision(attempt=attempt + 1, reason=reason, delay=delay)
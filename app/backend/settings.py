@@ -7,11 +7,13 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Optional
 
+from app.backend.profiling import normalize_profile_mode
 from config import DEFAULT_DOWNLOAD_DIR, QUALITY_OPTIONS, SETTINGS_DIR, SETTINGS_FILE
 
 SUPPORTED_FORMATS = {"mp3", "flac", "opus", "ogg", "m4a", "wav"}
 DEFAULT_QUALITY = "best"
 DEFAULT_FORMAT = "mp3"
+MAX_PRIORITY = 10
 
 
 @dataclass(frozen=True)
@@ -23,6 +25,8 @@ class DownloadRequest:
     format: str
     bitrate: str
     source_url: Optional[str] = None
+    profile: Optional[str] = None
+    priority: int = 0
 
 
 class SettingsStore:
@@ -101,6 +105,15 @@ def normalize_format(value: Any) -> str:
     return format_name if format_name in SUPPORTED_FORMATS else DEFAULT_FORMAT
 
 
+def normalize_priority(value: Any) -> int:
+    """Clamp a request priority to `-MAX_PRIORITY..MAX_PRIORITY`; anything else is 0."""
+    try:
+        priority = int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+    return max(-MAX_PRIORITY, min(MAX_PRIORITY, priority))
+
+
 def build_download_request(
     payload: dict[str, Any],
     *,
@@ -116,6 +129,8 @@ def build_download_request(
         format=format_name,
         bitrate=QUALITY_OPTIONS[quality],
         source_url=source_url,
+        profile=normalize_profile_mode(payload.get("profile")),
+        priority=normalize_priority(payload.get("priority")),
     )
 
 
@@ -1,13 +1,20 @@
-"""Shared Spotify credential/bootstrap helpers for isolated worker processes."""
+"""Shared Spotify credential/bootstrap helpers for isolated worker processes.
+
+spotDL and spotipy are imported inside the helpers so workers that never touch
+Spotify (direct media links) do not pay for loading them.
+"""
 
 from __future__ import annotations
 
+import logging
 import os
 from pathlib import Path
 from typing import Any, Optional
 
-from spotdl.utils.config import get_config, get_config_file
-from spotdl.utils.spotify import SpotifyClient
+from app.backend.ratelimit import SharedTokenBucket, retry_after_seconds, spotify_rate_limiter
+
+LOGGER = logging.getLogger(__name__)
+SPOTIFY_THROTTLE_RETRIES = max(0, int(os.getenv("SPOTDL_SPOTIFY_THROTTLE_RETRIES", "4")))
 
 _LOCAL_ENV_LOADED = False
 
@@ -57,6 +64,8 @@ def _get_env_override(*names: str) -> Optional[str]:
 
 def load_spotify_settings() -> tuple[dict[str, Any], str]:
     """Resolve Spotify credentials from env vars or the spotDL config file."""
+    from spotdl.utils.config import get_config, get_config_file
+
     config = get_config()
     config_path = str(get_config_file())
 
@@ -76,8 +85,53 @@ def load_spotify_settings() -> tuple[dict[str, Any], str]:
     return settings, config_path
 
 
+def install_rate_limiter(
+    client: Any,
+    limiter: SharedTokenBucket = spotify_rate_limiter,
+    *,
+    max_retries: int = SPOTIFY_THROTTLE_RETRIES,
+) -> None:
+    """Route every Spotify API call in this process through the shared token bucket."""
+    from spotipy.exceptions import SpotifyException
+
+    internal_call = getattr(client, "_internal_call", None)
+    if not callable(internal_call) or getattr(internal_call, "rate_limited", False):
+        return
+
+    # Let the shared limiter own 429 backoff instead of urllib3 sleeping per process.
+    status_forcelist = getattr(client, "status_forcelist", None)
+    if status_forcelist and 429 in status_forcelist and callable(getattr(client, "_build_session", None)):
+        client.status_forcelist = tuple(code for code in status_forcelist if code != 429)
+        client._build_session()
+
+    def rate_limited_call(method, url, payload, params):
+        attempt = 0
+        while True:
+            limiter.acquire()
+            try:
+                return internal_call(method, url, payload, dict(params or {}))
+            except SpotifyException as exc:
+                if exc.http_status != 429 or attempt >= max_retries:
+                    raise
+                delay = limiter.defer(retry_after_seconds(exc.headers, default=2.0 ** attempt))
+                attempt += 1
+                LOGGER.warning(
+                    "Spotify throttled %s %s; backing off %.1fs (attempt %s/%s)",
+                    method,
+                    url,
+                    delay,
+                    attempt,
+                    max_retries,
+                )
+
+    rate_limited_call.rate_limited = True
+    client._internal_call = rate_limited_call
+
+
 def configure_spotify_client() -> str:
     """Initialize the spotDL Spotify client or raise a clear configuration error."""
+    from spotdl.utils.spotify import SpotifyClient
+
     settings, config_path = load_spotify_settings()
     if not settings["client_id"] or not settings["client_secret"]:
         raise SpotifyConfigurationError(
@@ -99,5 +153,6 @@ def configure_spotify_client() -> str:
         if "already been initialized" not in str(exc):
             raise SpotifyConfigurationError(str(exc)) from exc
 
+    install_rate_limiter(SpotifyClient())
     return config_path
 
@@ -0,0 +1,167 @@
+"""Per-phase job timing breakdowns, and rolling summaries of recent jobs' timings and resources."""
+
+from __future__ import annotations
+
+import math
+import os
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Mapping, Optional, Sequence
+
+PHASE_STATS_WINDOW = max(10, int(os.getenv("SPOTDL_PHASE_STATS_WINDOW", "500")))
+PERCENTILES = (50, 90, 99)
+# Supervisor-side phases; everything after `launching` is reported by the worker.
+SUPERVISOR_PHASES = ("queued", "launching", "retrying")
+TERMINAL_PHASES = ("completed", "failed", "cancelled")
+# Supervisor phases spent waiting rather than running a worker.
+WAITING_PHASES = ("queued", "retrying")
+# Worker phases whose length grows with the track; the others take about as long for any job.
+DURATION_PHASES = ("downloading", "postprocessing")
+
+
+def phase_breakdown(
+    timeline: Sequence[tuple[str, float]],
+    worker_phase_seconds: Optional[Mapping[str, float]] = None,
+) -> dict[str, float]:
+    """Turn `(phase, entered_at)` marks into seconds per phase.
+
+    Worker phases use the worker's own clock when it reported one, because progress
+    written to the shared table never produces a phase mark on the parent side.
+    """
+    seconds: dict[str, float] = {}
+    for (phase, entered_at), (_next_phase, left_at) in zip(timeline, timeline[1:]):
+        if phase in TERMINAL_PHASES:
+            continue
+        seconds[phase] = seconds.get(phase, 0.0) + max(0.0, left_at - entered_at)
+
+    if worker_phase_seconds:
+        for phase in [phase for phase in seconds if phase not in SUPERVISOR_PHASES]:
+            del seconds[phase]
+        for phase, value in worker_phase_seconds.items():
+            try:
+                seconds[str(phase)] = max(0.0, float(value))
+            except (TypeError, ValueError):
+                continue
+
+    if timeline and timeline[-1][0] in TERMINAL_PHASES:
+        seconds["total"] = max(0.0, timeline[-1][1] - timeline[0][1])
+    return {phase: round(value, 3) for phase, value in seconds.items()}
+
+
+def _percentile(sorted_values: Sequence[float], percentile: int) -> float:
+    rank = max(1, math.ceil(percentile / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+@dataclass(frozen=True)
+class RunEstimate:
+    """Typical worker run time of recent completed jobs, from launch to completion."""
+
+    fixed_seconds: float
+    seconds_per_audio_second: Optional[float]
+    typical_seconds: float
+
+    def seconds(self, duration: Optional[float] = None) -> float:
+        """Estimate the run time of a job, scaled to its track length when that is known."""
+        if duration is None or self.seconds_per_audio_second is None:
+            return self.typical_seconds
+        return self.fixed_seconds + self.seconds_per_audio_second * duration
+
+
+class PhaseTimings:
+    """Keep the breakdowns of recently finished jobs and summarize them on demand."""
+
+    def __init__(self, window: int = PHASE_STATS_WINDOW) -> None:
+        self._samples: deque[tuple[str, dict[str, float], Optional[float]]] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, outcome: str, breakdown: Mapping[str, float], duration: Optional[float] = None) -> None:
+        """Keep one job's breakdown, with its track length in seconds when that was known."""
+        if breakdown:
+            with self._lock:
+                self._samples.append((outcome, dict(breakdown), duration))
+
+    def percentiles(self, *, outcome: Optional[str] = None) -> dict[str, dict[str, float]]:
+        """Return `{phase: {"count": n, "p50": s, "p90": s, "p99": s}}` over the window."""
+        with self._lock:
+            samples = [breakdown for sample_outcome, breakdown, _ in self._samples if outcome in (None, sample_outcome)]
+
+        values: dict[str, list[float]] = {}
+        for breakdown in samples:
+            for phase, value in breakdown.items():
+                values.setdefault(phase, []).append(value)
+
+        summary: dict[str, dict[str, float]] = {}
+        for phase, phase_values in values.items():
+            phase_values.sort()
+            summary[phase] = {"count": len(phase_values)}
+            for percentile in PERCENTILES:
+                summary[phase][f"p{percentile}"] = _percentile(phase_values, percentile)
+        return summary
+
+    def run_estimate(self) -> Optional[RunEstimate]:
+        """Summarize recent completed jobs as medians; `None` until one has completed.
+
+        Time in `DURATION_PHASES` is scaled per second of audio, using the jobs whose
+        track length was known.
+        """
+        with self._lock:
+            samples = [(breakdown, duration) for outcome, breakdown, duration in self._samples if outcome == "completed"]
+        runs: list[float] = []
+        fixed: list[float] = []
+        rates: list[float] = []
+        for breakdown, duration in samples:
+            if "total" not in breakdown:
+                continue
+            run = breakdown["total"] - sum(breakdown.get(phase, 0.0) for phase in WAITING_PHASES)
+            scaled = sum(breakdown.get(phase, 0.0) for phase in DURATION_PHASES)
+            runs.append(max(0.0, run))
+            if duration:
+                fixed.append(max(0.0, run - scaled))
+                rates.append(scaled / duration)
+        if not runs:
+            return None
+        return RunEstimate(
+            fixed_seconds=_percentile(sorted(fixed), 50) if fixed else 0.0,
+            seconds_per_audio_second=_percentile(sorted(rates), 50) if rates else None,
+            typical_seconds=_percentile(sorted(runs), 50),
+        )
+
+
+class ResourceLog:
+    """Keep the resources of recently finished worker runs and rank the heaviest on demand.
+
+    Retried attempts are kept too, so a track that burns CPU on every attempt shows up.
+    """
+
+    def __init__(self, window: int = PHASE_STATS_WINDOW) -> None:
+        self._runs: deque[dict[str, Any]] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, link: str, job_id: str, outcome: str, resources: Mapping[str, Any]) -> None:
+        """Keep one run's `JobResources.to_payload()` with the job it belongs to."""
+        user = resources.get("cpu_user_seconds")
+        system = resources.get("cpu_system_seconds")
+        run = {
+            "link": link,
+            "job_id": job_id,
+            "outcome": outcome,
+            "wall_seconds": resources.get("wall_seconds"),
+            "cpu_seconds": None if user is None and system is None else round((user or 0.0) + (system or 0.0), 3),
+            "peak_rss_bytes": resources.get("peak_rss_bytes"),
+            "bytes_downloaded": resources.get("bytes_downloaded"),
+        }
+        with self._lock:
+            self._runs.append(run)
+
+    def heaviest(self, limit: int = 10) -> dict[str, object]:
+        """Return the top `limit` runs by CPU time and by peak RSS over the window."""
+        with self._lock:
+            runs = list(self._runs)
+
+        def top(key: str) -> list[dict[str, Any]]:
+            measured = [run for run in runs if run[key] is not None]
+            return sorted(measured, key=lambda run: run[key], reverse=True)[:limit]
+
+        return {"runs": len(runs), "cpu": top("cpu_seconds"), "peak_rss": top("peak_rss_bytes")}
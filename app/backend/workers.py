@@ -5,18 +5,38 @@ from __future__ import annotations
 import json
 import logging
 import os
+import signal
 import subprocess
 import sys
 import threading
 import time
 from collections import deque
 from dataclasses import dataclass, field
-from datetime import datetime, timezone
 from pathlib import Path
 from queue import Empty, Queue
-from typing import Callable, Optional
-
+from typing import Callable, Optional, Union
+
+from app.backend.deadlines import HEARTBEAT_INTERVAL, JobDeadlines
+from app.backend.framing import (
+    FrameDecoder,
+    FrameError,
+    ProgressRecord,
+    WorkerEvent,
+    binary_framing_enabled,
+    preferred_codec,
+)
+from app.backend.joblog import JobLogWriter, default_job_log_writer
+from app.backend.metrics import WORKER_SPAWN_SECONDS, WORKER_TIMEOUTS
+from app.backend.profiling import (
+    PROFILE_IMPORTS,
+    is_importtime_line,
+    profile_path,
+    summarize_import_times,
+    worker_command,
+)
+from app.backend.progress_table import ProgressTable
 from app.backend.protocol import DownloadJobSpec
+from app.backend.zygote import WORKER_MODULES, WorkerZygote, ZygoteProcess, shared_zygote
 from config import SETTINGS_DIR
 
 LOGGER = logging.getLogger(__name__)
@@ -27,12 +47,42 @@ DOWNLOAD_HARD_TIMEOUT = max(
     int(os.getenv("SPOTDL_HARD_TIMEOUT", "900")),
 )
 JOB_LOG_DIR = SETTINGS_DIR / "logs"
+WORKER_MEMORY_LIMIT_MB = max(0, int(os.getenv("SPOTDL_WORKER_MEMORY_LIMIT_MB", "0")))
+WORKER_CPU_LIMIT = max(0, int(os.getenv("SPOTDL_WORKER_CPU_LIMIT", "0")))
+# Load tests swap in a stand-in that speaks the same protocol, e.g. `benchmarks.standin_worker`.
+WORKER_MODULE = os.getenv("SPOTDL_WORKER_MODULE", "app.backend.download_worker").strip()
+# Seconds a cancelled worker group gets to exit after SIGTERM before it is killed.
+WORKER_TERMINATE_GRACE = max(0.1, float(os.getenv("SPOTDL_TERMINATE_GRACE", "2")))
 
 
 class WorkerProtocolError(RuntimeError):
     """Raised when a worker emits malformed protocol data."""
 
 
+@dataclass(frozen=True)
+class JobResources:
+    """Resources one worker consumed, from `wait4` rusage and worker-reported counters."""
+
+    wall_seconds: float
+    cpu_user_seconds: Optional[float] = None
+    cpu_system_seconds: Optional[float] = None
+    peak_rss_bytes: Optional[int] = None
+    bytes_downloaded: Optional[int] = None
+    bytes_written: Optional[int] = None
+    phase_seconds: dict[str, float] = field(default_factory=dict)
+
+    def to_payload(self) -> dict[str, object]:
+        return {
+            "wall_seconds": self.wall_seconds,
+            "cpu_user_seconds": self.cpu_user_seconds,
+            "cpu_system_seconds": self.cpu_system_seconds,
+            "peak_rss_bytes": self.peak_rss_bytes,
+            "bytes_downloaded": self.bytes_downloaded,
+            "bytes_written": self.bytes_written,
+            "phase_seconds": dict(self.phase_seconds),
+        }
+
+
 @dataclass(frozen=True)
 class WorkerOutcome:
     """Final result of a monitored worker subprocess."""
@@ -42,6 +92,21 @@ class WorkerOutcome:
     file_path: Optional[str] = None
     stderr_tail: tuple[str, ...] = ()
     log_path: Optional[str] = None
+    resources: Optional[JobResources] = None
+    # Short machine-readable failure class, e.g. the worker's error code or `idle_timeout`.
+    error_class: Optional[str] = None
+
+
+def _maxrss_bytes(value: int) -> int:
+    # macOS reports ru_maxrss in bytes, Linux and the BSDs in kilobytes.
+    return value if sys.platform == "darwin" else value * 1024
+
+
+def _optional_int(value: object) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
 
 
 def job_log_path(job_id: str) -> Path:
@@ -73,14 +138,42 @@ class WorkerMonitor:
     spec: DownloadJobSpec
     idle_timeout: int = DOWNLOAD_IDLE_TIMEOUT
     hard_timeout: int = DOWNLOAD_HARD_TIMEOUT
-    _process: Optional[subprocess.Popen[str]] = field(default=None, init=False)
+    heartbeat_interval: float = HEARTBEAT_INTERVAL
+    zygote: Optional[WorkerZygote] = None
+    log_writer: JobLogWriter = field(default=default_job_log_writer, repr=False)
+    worker_module: str = WORKER_MODULE
+    _process: Optional[Union[subprocess.Popen[str], ZygoteProcess]] = field(default=None, init=False)
     _stderr_tail: deque[str] = field(default_factory=lambda: deque(maxlen=40), init=False)
     _termination_reason: Optional[str] = field(default=None, init=False)
+    _kill_at: Optional[float] = field(default=None, init=False)
     _lock: threading.Lock = field(default_factory=threading.Lock, init=False)
     _log_path: Optional[Path] = field(default=None, init=False)
+    _rusage: Optional[tuple[float, float, int]] = field(default=None, init=False)
 
     def _command(self) -> list[str]:
-        return [sys.executable, "-m", "app.backend.download_worker"]
+        return worker_command(self.worker_module)
+
+    def _spawn(self) -> Union[subprocess.Popen[str], ZygoteProcess]:
+        """Fork from the preloaded zygote when available, otherwise exec a fresh worker."""
+        # Import profiling needs a cold interpreter; forked workers import nothing.
+        zygote = None
+        if not PROFILE_IMPORTS and self.worker_module in WORKER_MODULES:
+            zygote = self.zygote if self.zygote is not None else shared_zygote()
+        if zygote is not None:
+            process = zygote.spawn(self.worker_module)
+            if process is not None:
+                return process
+
+        return subprocess.Popen(
+            self._command(),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+            # Own process group, so cancelling also reaches the ffmpeg processes it starts.
+            start_new_session=os.name == "posix",
+        )
 
     @staticmethod
     def _pump_stream(stream, sink: Queue[str]) -> None:
@@ -90,60 +183,197 @@ class WorkerMonitor:
         finally:
             stream.close()
 
+    def _poll(self, process: Union[subprocess.Popen[str], ZygoteProcess]) -> Optional[int]:
+        """Poll the worker, reaping exec'd workers with `wait4` to capture their rusage."""
+        if isinstance(process, ZygoteProcess):
+            return_code = process.poll()
+            if return_code is not None and process.rusage is not None:
+                self._rusage = process.rusage
+            return return_code
+        if process.returncode is not None or not hasattr(os, "wait4"):
+            return process.poll()
+        try:
+            pid, status, usage = os.wait4(process.pid, os.WNOHANG)
+        except ChildProcessError:
+            return process.poll()
+        if pid == 0:
+            return None
+        process.returncode = os.waitstatus_to_exitcode(status)
+        self._rusage = (usage.ru_utime, usage.ru_stime, usage.ru_maxrss)
+        return process.returncode
+
+    def _resources(self, started_at: float, final_event: Optional[dict[str, object]]) -> JobResources:
+        stats = final_event.get("stats") if final_event else None
+        if not isinstance(stats, dict):
+            stats = {}
+        phase_seconds = stats.get("phase_seconds")
+        user, system, maxrss = self._rusage if self._rusage is not None else (None, None, None)
+        return JobResources(
+            wall_seconds=round(time.monotonic() - started_at, 3),
+            cpu_user_seconds=round(user, 3) if user is not None else None,
+            cpu_system_seconds=round(system, 3) if system is not None else None,
+            peak_rss_bytes=_maxrss_bytes(maxrss) if maxrss is not None else None,
+            bytes_downloaded=_optional_int(stats.get("bytes_downloaded")),
+            bytes_written=_optional_int(stats.get("bytes_written")),
+            phase_seconds=dict(phase_seconds) if isinstance(phase_seconds, dict) else {},
+        )
+
+    @staticmethod
+    def _pump_frames(stream, sink: Queue, decoder: FrameDecoder) -> None:
+        """Decode binary frames off the raw pipe and queue them one read at a time."""
+        corrupt = False
+        try:
+            raw = stream.buffer
+            while True:
+                chunk = raw.read1(65536)
+                if not chunk:
+                    break
+                if corrupt:
+                    # Keep draining so a confused worker never blocks on a full pipe.
+                    continue
+                try:
+                    events = decoder.feed(chunk)
+                except FrameError as exc:
+                    corrupt = True
+                    sink.put(WorkerProtocolError(f"invalid frame: {exc}"))
+                    continue
+                if events:
+                    sink.put(events)
+        finally:
+            stream.close()
+
+    @staticmethod
+    def _signal_group(process: Union[subprocess.Popen[str], ZygoteProcess], signum: int) -> None:
+        """Signal the worker's whole process group, or just the worker where groups are unavailable."""
+        if os.name == "posix":
+            try:
+                os.killpg(process.pid, signum)
+                return
+            except ProcessLookupError:
+                # Already gone, or a fresh fork that has not called setsid yet.
+                pass
+            except PermissionError:
+                LOGGER.warning("Not permitted to signal worker group %s", process.pid)
+        if isinstance(process, ZygoteProcess):
+            process.send_signal(signum)
+        elif process.returncode is None:
+            # Not `send_signal`: its `poll()` could reap the worker before the monitor's `wait4`.
+            # Until the monitor reaps it, the pid is ours even if the worker already exited.
+            try:
+                os.kill(process.pid, signum)
+            except ProcessLookupError:
+                pass
+
     def terminate(self, reason: Optional[str] = None) -> None:
-        """Terminate the worker process, escalating to kill if it lingers."""
+        """Ask the worker group to exit without waiting; the monitor loop kills it if it lingers."""
         with self._lock:
-            self._termination_reason = reason or "Worker terminated."
+            if self._termination_reason is None:
+                self._termination_reason = reason or "Worker terminated."
+                self._kill_at = time.monotonic() + WORKER_TERMINATE_GRACE
             process = self._process
 
-        if process is None or process.poll() is not None:
+        # Only the monitor loop reaps the worker, so its rusage is never lost to a poll here.
+        if process is None or process.returncode is not None:
             return
+        self._signal_group(process, signal.SIGTERM)
 
-        process.terminate()
-        deadline = time.monotonic() + 2.0
-        while process.poll() is None and time.monotonic() < deadline:
-            time.sleep(0.05)
-
-        if process.poll() is None:
-            process.kill()
-
-    def run(self, on_event: Callable[[dict[str, object]], None]) -> WorkerOutcome:
-        """Run the worker subprocess until completion, failure, or timeout."""
-        stdout_queue: Queue[str] = Queue()
-        stderr_queue: Queue[str] = Queue()
+    def kill(self) -> None:
+        """Kill the worker group immediately, e.g. when the app is exiting."""
+        with self._lock:
+            if self._termination_reason is None:
+                self._termination_reason = "Worker killed."
+            process = self._process
+        if process is not None:
+            self._signal_group(process, signal.SIGKILL)
+
+    def run(
+        self,
+        on_event: Callable[[WorkerEvent], None],
+        *,
+        on_events: Optional[Callable[[list[WorkerEvent]], None]] = None,
+    ) -> WorkerOutcome:
+        """Run the worker subprocess until completion, failure, or timeout.
+
+        With `on_events`, every burst of events drained from the worker in one
+        pass is delivered as a single batch instead of one `on_event` call each.
+        Under binary framing, progress arrives as `ProgressRecord`s, not dicts.
+        """
         self._log_path = job_log_path(self.spec.job_id)
         self._log_path.parent.mkdir(parents=True, exist_ok=True)
 
-        def log_line(kind: str, message: str) -> None:
-            timestamp = datetime.now(timezone.utc).isoformat()
-            with self._log_path.open("a", encoding="utf-8") as log_file:
-                log_file.write(f"{timestamp} {kind} {message}\n")
+        def deliver(events: list[WorkerEvent]) -> None:
+            for event in events:
+                on_event(event)
 
+        job_log = self.log_writer.open(self._log_path)
+        progress_table = None
+        if self.spec.progress_table and self.spec.progress_slot is not None:
+            try:
+                progress_table = ProgressTable.attach(self.spec.progress_table)
+            except OSError:
+                LOGGER.warning("Could not map progress table %s", self.spec.progress_table, exc_info=True)
+        try:
+            return self._monitor(on_events or deliver, job_log.write, progress_table)
+        finally:
+            job_log.close()
+            if progress_table is not None:
+                progress_table.close()
+
+    def _monitor(
+        self,
+        on_events: Callable[[list[WorkerEvent]], None],
+        log_line: Callable[[str, str], None],
+        progress_table: Optional[ProgressTable] = None,
+    ) -> WorkerOutcome:
+        stdout_queue: Queue[Union[str, list[WorkerEvent], WorkerProtocolError]] = Queue()
+        stderr_queue: Queue[str] = Queue()
         log_line("JOB", f"link={self.spec.link}")
         if self.spec.source_url:
             log_line("JOB", f"source_url={self.spec.source_url}")
 
-        process = subprocess.Popen(
-            self._command(),
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            bufsize=1,
-        )
+        spawned_at = time.time()
+        spawn_started = time.monotonic()
+        process = self._spawn()
         with self._lock:
             self._process = process
+            terminating = self._termination_reason is not None
+        if terminating:
+            # Cancelled while the worker was still launching.
+            self._signal_group(process, signal.SIGTERM)
 
         assert process.stdin is not None
         assert process.stdout is not None
         assert process.stderr is not None
 
-        process.stdin.write(json.dumps(self.spec.to_payload(), ensure_ascii=True))
+        payload = self.spec.to_payload()
+        payload["spawned_at"] = spawned_at
+        payload["heartbeat_interval"] = self.heartbeat_interval
+        deadlines = JobDeadlines.for_job(
+            self.spec,
+            idle_timeout=self.idle_timeout,
+            hard_timeout=self.hard_timeout,
+            heartbeat_interval=self.heartbeat_interval,
+        )
+        log_line("DEADLINES", deadlines.describe())
+        if self.spec.profile:
+            payload["profile_path"] = str(profile_path(self._log_path, self.spec.profile))
+            log_line("PROFILE", f"mode={self.spec.profile} path={payload['profile_path']}")
+        if WORKER_MEMORY_LIMIT_MB or WORKER_CPU_LIMIT:
+            payload["limits"] = {
+                "memory_bytes": WORKER_MEMORY_LIMIT_MB * 1024 * 1024,
+                "cpu_seconds": WORKER_CPU_LIMIT,
+            }
+        decoder: Optional[FrameDecoder] = None
+        if binary_framing_enabled():
+            decoder = FrameDecoder(preferred_codec())
+            payload["framing"] = "binary"
+            payload["codec"] = decoder.codec
+        process.stdin.write(json.dumps(payload, ensure_ascii=True))
         process.stdin.close()
 
         stdout_thread = threading.Thread(
-            target=self._pump_stream,
-            args=(process.stdout, stdout_queue),
+            target=self._pump_stream if decoder is None else self._pump_frames,
+            args=(process.stdout, stdout_queue) if decoder is None else (process.stdout, stdout_queue, decoder),
             daemon=True,
             name=f"worker-stdout-{self.spec.job_id[:8]}",
         )
@@ -157,32 +387,81 @@ class WorkerMonitor:
         stderr_thread.start()
 
         started_at = time.monotonic()
+        # Heartbeats only show the worker is alive; everything else counts as progress.
         last_output_at = started_at
+        last_alive_at = started_at
+        heartbeats = False
+        phase = "starting"
+        timed_out: Optional[tuple[str, str]] = None
         final_event: Optional[dict[str, object]] = None
+        first_event_seen = False
+        import_lines: list[str] = []
+        progress_sequence = 0
 
         while True:
             had_output = False
+            batch: list[WorkerEvent] = []
 
             while True:
                 try:
-                    line = stdout_queue.get_nowait()
+                    item = stdout_queue.get_nowait()
                 except Empty:
                     break
                 had_output = True
-                last_output_at = time.monotonic()
-                if not line:
+                last_alive_at = time.monotonic()
+                if isinstance(item, WorkerProtocolError):
+                    last_output_at = time.monotonic()
+                    self._stderr_tail.append(str(item))
+                    log_line("PARSE_ERROR", str(item))
                     continue
-                log_line("STDOUT", line)
-                try:
-                    event = parse_worker_event(line)
-                except WorkerProtocolError as exc:
-                    self._stderr_tail.append(str(exc))
-                    log_line("PARSE_ERROR", str(exc))
-                    continue
-
-                on_event(event)
-                if event["type"] in {"completed", "failed"}:
-                    final_event = event
+                if isinstance(item, list):
+                    events = item
+                else:
+                    if not item:
+                        continue
+                    try:
+                        events = [parse_worker_event(item)]
+                    except WorkerProtocolError as exc:
+                        last_output_at = time.monotonic()
+                        log_line("STDOUT", item)
+                        self._stderr_tail.append(str(exc))
+                        log_line("PARSE_ERROR", str(exc))
+                        continue
+                    if events[0]["type"] != "heartbeat":
+                        log_line("STDOUT", item)
+
+                for event in events:
+                    if isinstance(event, ProgressRecord):
+                        last_output_at = time.monotonic()
+                        phase = event.phase or phase
+                        log_line("PROGRESS", f"{event.phase} {event.progress:.1f} {event.detail}")
+                        batch.append(event)
+                        continue
+                    phase = str(event.get("phase") or phase)
+                    if event["type"] == "heartbeat":
+                        heartbeats = True
+                        continue
+                    last_output_at = time.monotonic()
+                    if decoder is not None:
+                        log_line("EVENT", json.dumps(event, ensure_ascii=True))
+                    if not first_event_seen:
+                        first_event_seen = True
+                        spawn_seconds = time.monotonic() - spawn_started
+                        WORKER_SPAWN_SECONDS.observe(
+                            spawn_seconds,
+                            method="zygote" if isinstance(process, ZygoteProcess) else "exec",
+                        )
+                        log_line(
+                            "STARTUP",
+                            f"first_event_ms={spawn_seconds * 1000.0:.1f}"
+                            f" worker_startup_ms={event.get('startup_ms', '')}",
+                        )
+                    batch.append(event)
+                    if event["type"] in {"completed", "failed"}:
+                        final_event = event
+
+            if batch:
+                on_events(batch)
 
             while True:
                 try:
@@ -190,45 +469,85 @@ class WorkerMonitor:
                 except Empty:
                     break
                 had_output = True
-                last_output_at = time.monotonic()
-                if line:
+                last_output_at = last_alive_at = time.monotonic()
+                if line and PROFILE_IMPORTS and is_importtime_line(line):
+                    import_lines.append(line)
+                elif line:
                     self._stderr_tail.append(line)
                     log_line("STDERR", line)
                     if DEBUG_OUTPUT:
                         LOGGER.info("[worker %s stderr] %s", self.spec.job_id[:8], line)
 
-            return_code = process.poll()
+            return_code = self._poll(process)
             if return_code is not None and stdout_queue.empty() and stderr_queue.empty():
                 break
 
             now = time.monotonic()
-            if return_code is None and self.hard_timeout and (now - started_at) > self.hard_timeout:
-                self.terminate(
-                    f"spotDL exceeded the hard timeout of {self.hard_timeout} seconds."
-                )
-                return WorkerOutcome(
-                    success=False,
-                    error_message=f"spotDL exceeded the hard timeout of {self.hard_timeout} seconds.",
-                    stderr_tail=tuple(self._stderr_tail),
-                    log_path=str(self._log_path),
-                )
-
-            if return_code is None and self.idle_timeout and (now - last_output_at) > self.idle_timeout:
-                self.terminate(
-                    f"spotDL produced no output for {self.idle_timeout} seconds."
-                )
-                return WorkerOutcome(
-                    success=False,
-                    error_message=f"spotDL produced no output for {self.idle_timeout} seconds.",
-                    stderr_tail=tuple(self._stderr_tail),
-                    log_path=str(self._log_path),
-                )
+            if progress_table is not None:
+                # Progress written to shared memory counts as output for the idle timeout.
+                sequence = progress_table.sequence(self.spec.progress_slot)
+                if sequence != progress_sequence:
+                    progress_sequence = sequence
+                    last_output_at = last_alive_at = now
+                    sample = progress_table.read(self.spec.progress_slot)
+                    if sample is not None and sample.phase:
+                        phase = sample.phase
+            if return_code is None and timed_out is None:
+                idle_budget = deadlines.idle_budget(phase)
+                if deadlines.hard_timeout and (now - started_at) > deadlines.hard_timeout:
+                    timed_out = (
+                        "hard_timeout",
+                        f"spotDL exceeded the hard timeout of {deadlines.hard_timeout:g} seconds.",
+                    )
+                    WORKER_TIMEOUTS.inc(kind="hard")
+                elif idle_budget and (now - last_output_at) > idle_budget:
+                    timed_out = (
+                        "idle_timeout",
+                        f"spotDL made no progress for {idle_budget:g} seconds while {phase}.",
+                    )
+                    WORKER_TIMEOUTS.inc(kind="idle")
+                elif heartbeats and (now - last_alive_at) > deadlines.heartbeat_timeout:
+                    timed_out = (
+                        "heartbeat_timeout",
+                        f"Worker stopped sending heartbeats for {deadlines.heartbeat_timeout:g} seconds.",
+                    )
+                    WORKER_TIMEOUTS.inc(kind="heartbeat")
+                if timed_out is not None:
+                    self.terminate(timed_out[1])
+
+            kill_at = self._kill_at
+            if return_code is None and kill_at is not None and now >= kill_at:
+                log_line("KILL", f"worker group still running {WORKER_TERMINATE_GRACE:g}s after SIGTERM")
+                self._signal_group(process, signal.SIGKILL)
+                self._kill_at = None
 
             if not had_output:
                 time.sleep(0.05)
 
+        if self._termination_reason or process.returncode != 0:
+            # Children such as ffmpeg can outlive a crashed or cancelled worker.
+            self._signal_group(process, signal.SIGKILL)
         stdout_thread.join(timeout=0.5)
         stderr_thread.join(timeout=0.5)
+        if import_lines:
+            importtime_path = self._log_path.with_suffix(".importtime")
+            importtime_path.write_text("\n".join(import_lines) + "\n", encoding="utf-8")
+            for summary in summarize_import_times(import_lines):
+                log_line("IMPORTTIME", summary)
+
+        resources = self._resources(started_at, final_event)
+        log_line("RESOURCES", json.dumps(resources.to_payload(), sort_keys=True))
+
+        if timed_out is not None:
+            error_class, error_message = timed_out
+            return WorkerOutcome(
+                success=False,
+                error_message=error_message,
+                stderr_tail=tuple(self._stderr_tail),
+                log_path=str(self._log_path),
+                resources=resources,
+                error_class=error_class,
+            )
 
         if final_event and final_event["type"] == "completed":
             file_path = final_event.get("file_path")
@@ -237,6 +556,7 @@ class WorkerMonitor:
                 file_path=str(file_path) if file_path else None,
                 stderr_tail=tuple(self._stderr_tail),
                 log_path=str(self._log_path),
+                resources=resources,
             )
 
         if final_event and final_event["type"] == "failed":
@@ -246,6 +566,8 @@ class WorkerMonitor:
                 error_message=str(error_message) if error_message else "Download failed.",
                 stderr_tail=tuple(self._stderr_tail),
                 log_path=str(self._log_path),
+                resources=resources,
+                error_class=str(final_event.get("code") or "download_error"),
             )
 
         if process.returncode == 0:
@@ -254,9 +576,20 @@ class WorkerMonitor:
                 error_message="Worker exited without reporting a final result.",
                 stderr_tail=tuple(self._stderr_tail),
                 log_path=str(self._log_path),
+                resources=resources,
+                error_class="no_result",
             )
 
         error_message = self._termination_reason or f"Worker exited with code {process.returncode}."
+        error_class = "terminated" if self._termination_reason else "worker_exit"
+        if (
+            WORKER_CPU_LIMIT
+            and not self._termination_reason
+            and hasattr(signal, "SIGXCPU")
+            and process.returncode == -signal.SIGXCPU
+        ):
+            error_message = f"Worker exceeded the CPU time limit of {WORKER_CPU_LIMIT} seconds."
+            error_class = "cpu_limit"
         if self._stderr_tail:
             error_message = f"{error_message} {' | '.join(self._stderr_tail)}"
 
@@ -265,4 +598,6 @@ class WorkerMonitor:
             error_message=error_message,
             stderr_tail=tuple(self._stderr_tail),
             log_path=str(self._log_path),
+            resources=resources,
+            error_class=error_class,
         )
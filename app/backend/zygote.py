@@ -0,0 +1,354 @@
+"""Preloaded fork server that starts per-job workers without a cold interpreter exec."""
+
+from __future__ import annotations
+
+import gc
+import importlib
+import logging
+import os
+import select
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+
+LOGGER = logging.getLogger(__name__)
+ZYGOTE_MODE = os.getenv("SPOTDL_WORKER_ZYGOTE", "auto").strip().lower()
+ZYGOTE_START_TIMEOUT = max(1, int(os.getenv("SPOTDL_ZYGOTE_START_TIMEOUT", "60")))
+PRELOAD_MODULES = (
+    "spotdl.download.downloader",
+    "spotdl.types.song",
+    "yt_dlp",
+    "rapidfuzz.fuzz",
+    "app.backend.download_worker",
+    "app.backend.metadata_worker",
+)
+WORKER_MODULES = frozenset({"app.backend.download_worker", "app.backend.metadata_worker"})
+
+
+def zygote_supported() -> bool:
+    """Return whether this platform can fork workers and pass them pipe descriptors."""
+    return hasattr(os, "fork") and hasattr(socket, "send_fds") and sys.platform != "win32"
+
+
+def zygote_enabled() -> bool:
+    """Resolve `SPOTDL_WORKER_ZYGOTE`; `auto` only forks on Linux, where it is safe."""
+    if not zygote_supported() or ZYGOTE_MODE in {"0", "off", "false", "no"}:
+        return False
+    if ZYGOTE_MODE == "auto":
+        return sys.platform.startswith("linux")
+    return True
+
+
+class ZygoteProcess:
+    """`subprocess.Popen`-shaped handle for a worker forked by the zygote."""
+
+    def __init__(self, pid: int, control: socket.socket, stdin, stdout, stderr) -> None:
+        self.pid = pid
+        self.stdin = stdin
+        self.stdout = stdout
+        self.stderr = stderr
+        self.returncode: Optional[int] = None
+        # (user seconds, system seconds, max RSS as reported by the OS), sent by the zygote.
+        self.rusage: Optional[tuple[float, float, int]] = None
+        self._control = control
+        self._buffer = b""
+        self._lock = threading.Lock()
+
+    def _read_exit(self, timeout: Optional[float]) -> None:
+        with self._lock:
+            if self.returncode is not None:
+                return
+            self._control.settimeout(timeout)
+            try:
+                while b"\n" not in self._buffer:
+                    chunk = self._control.recv(64)
+                    if not chunk:
+                        # The zygote died; its children die with their pipes.
+                        self._buffer += b"exit -9\n"
+                        break
+                    self._buffer += chunk
+            except (BlockingIOError, socket.timeout):
+                return
+            except OSError:
+                self._buffer += b"exit -9\n"
+
+            fields = self._buffer.split(b"\n", 1)[0].decode("ascii", "replace").split()
+            try:
+                self.returncode = int(fields[1])
+            except (IndexError, ValueError):
+                self.returncode = -1
+            try:
+                self.rusage = (float(fields[2]), float(fields[3]), int(fields[4]))
+            except (IndexError, ValueError):
+                pass
+            self._control.close()
+
+    def poll(self) -> Optional[int]:
+        self._read_exit(0.0)
+        return self.returncode
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        self._read_exit(timeout)
+        if self.returncode is None:
+            raise subprocess.TimeoutExpired(f"zygote worker {self.pid}", timeout or 0.0)
+        return self.returncode
+
+    def send_signal(self, signum: int) -> None:
+        if self.poll() is not None:
+            return
+        try:
+            os.kill(self.pid, signum)
+        except ProcessLookupError:
+            pass
+
+    def terminate(self) -> None:
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self) -> None:
+        self.send_signal(signal.SIGKILL)
+
+
+class WorkerZygote:
+    """Parent-side client that starts the zygote once and asks it to fork workers."""
+
+    def __init__(self, *, start_timeout: int = ZYGOTE_START_TIMEOUT) -> None:
+        self.start_timeout = start_timeout
+        self._socket_dir = Path(tempfile.mkdtemp(prefix="spotdl-zygote-"))
+        self.socket_path = self._socket_dir / "zygote.sock"
+        self._process: Optional[subprocess.Popen[bytes]] = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Launch the zygote and wait for it to finish preloading in the background."""
+        with self._lock:
+            if self._process is not None:
+                return
+            self._process = subprocess.Popen(
+                [sys.executable, "-m", "app.backend.zygote", str(self.socket_path)],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+            )
+        threading.Thread(
+            target=self._await_ready,
+            daemon=True,
+            name="worker-zygote-start",
+        ).start()
+
+    def _await_ready(self) -> None:
+        process = self._process
+        assert process is not None and process.stdout is not None
+        line = process.stdout.readline()
+        if line.strip() == b"ready":
+            self._ready.set()
+            LOGGER.info("Worker zygote %s is ready", process.pid)
+        else:
+            LOGGER.warning("Worker zygote failed to start; using cold worker launches")
+
+    def alive(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        return self._ready.wait(self.start_timeout if timeout is None else timeout)
+
+    def spawn(self, module: str = "app.backend.download_worker") -> Optional[ZygoteProcess]:
+        """Fork one worker with fresh stdio pipes, or return `None` to fall back to exec."""
+        if module not in WORKER_MODULES or not self._ready.is_set() or not self.alive():
+            return None
+
+        stdin_read, stdin_write = os.pipe()
+        stdout_read, stdout_write = os.pipe()
+        stderr_read, stderr_write = os.pipe()
+        control = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            control.connect(str(self.socket_path))
+            socket.send_fds(control, [module.encode("ascii")], [stdin_read, stdout_write, stderr_write])
+            reply = b""
+            while b"\n" not in reply:
+                chunk = control.recv(64)
+                if not chunk:
+                    raise OSError("zygote closed the connection before forking")
+                reply += chunk
+            pid = int(reply.split(b"\n", 1)[0])
+        except (OSError, ValueError):
+            LOGGER.warning("Worker zygote spawn failed; using a cold worker launch", exc_info=True)
+            control.close()
+            for fd in (stdin_write, stdout_read, stderr_read):
+                os.close(fd)
+            return None
+        finally:
+            for fd in (stdin_read, stdout_write, stderr_write):
+                os.close(fd)
+
+        process = ZygoteProcess(
+            pid,
+            control,
+            os.fdopen(stdin_write, "w", encoding="utf-8", buffering=1),
+            os.fdopen(stdout_read, "r", encoding="utf-8"),
+            os.fdopen(stderr_read, "r", encoding="utf-8", errors="replace"),
+        )
+        # Anything the zygote already queued after the pid belongs to the exit notice.
+        process._buffer = reply.split(b"\n", 1)[1]  # noqa: SLF001
+        return process
+
+    def stop(self) -> None:
+        """Stop the zygote; already forked workers keep running to completion."""
+        process = self._process
+        if process is not None and process.poll() is None:
+            assert process.stdin is not None
+            process.stdin.close()
+            try:
+                process.wait(timeout=2.0)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        if process is not None and process.stdout is not None:
+            process.stdout.close()
+        shutil.rmtree(self._socket_dir, ignore_errors=True)
+
+
+_shared_zygote: Optional[WorkerZygote] = None
+_shared_lock = threading.Lock()
+
+
+def shared_zygote() -> Optional[WorkerZygote]:
+    """Return the process-wide zygote, starting it on first use when enabled."""
+    global _shared_zygote
+    if not zygote_enabled():
+        return None
+    with _shared_lock:
+        if _shared_zygote is None:
+            _shared_zygote = WorkerZygote()
+            _shared_zygote.start()
+        return _shared_zygote
+
+
+def _run_child(
+    module: str,
+    fds: list[int],
+    inherited: list[socket.socket],
+    wakeup_fds: tuple[int, int],
+) -> None:
+    """Turn a freshly forked zygote child into a worker wired to the parent's pipes."""
+    exit_code = 0
+    try:
+        # Lead a new process group so the parent can signal the worker and its ffmpeg children together.
+        os.setsid()
+        signal.set_wakeup_fd(-1)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        for fd in wakeup_fds:
+            os.close(fd)
+        for sock in inherited:
+            sock.close()
+        for target, fd in enumerate(fds):
+            os.dup2(fd, target)
+            os.close(fd)
+
+        sys.stdin = open(0, "r", encoding="utf-8", closefd=False)
+        sys.stdout = open(1, "w", encoding="utf-8", buffering=1, closefd=False)
+        sys.stderr = open(2, "w", encoding="utf-8", buffering=1, closefd=False)
+        logging.getLogger().handlers.clear()
+
+        importlib.import_module(module).main()
+    except SystemExit as exc:
+        exit_code = exc.code if isinstance(exc.code, int) else 1
+    except BaseException:
+        import traceback
+
+        traceback.print_exc()
+        exit_code = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(exit_code)
+
+
+def serve(socket_path: str) -> None:
+    """Preload the worker stack, then fork one child per spawn request until stdin closes."""
+    for module in PRELOAD_MODULES:
+        importlib.import_module(module)
+    gc.collect()
+    gc.freeze()
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(64)
+    children: dict[int, socket.socket] = {}
+
+    # SIGCHLD writes to this pipe so finished workers are reported without polling.
+    wakeup_read, wakeup_write = os.pipe()
+    os.set_blocking(wakeup_read, False)
+    os.set_blocking(wakeup_write, False)
+    signal.set_wakeup_fd(wakeup_write)
+    signal.signal(signal.SIGCHLD, lambda _signum, _frame: None)
+    print("ready", flush=True)
+
+    while True:
+        try:
+            readable, _, _ = select.select([server, sys.stdin, wakeup_read], [], [], 1.0)
+        except InterruptedError:
+            continue
+        if sys.stdin in readable and not os.read(sys.stdin.fileno(), 1):
+            break
+        if wakeup_read in readable:
+            try:
+                os.read(wakeup_read, 4096)
+            except BlockingIOError:
+                pass
+
+        if server in readable:
+            connection, _ = server.accept()
+            try:
+                message, fds, _flags, _address = socket.recv_fds(connection, 256, 3)
+            except OSError:
+                connection.close()
+                message, fds = b"", []
+            module = message.decode("ascii", "replace")
+            if module in WORKER_MODULES and len(fds) == 3:
+                pid = os.fork()
+                if pid == 0:
+                    _run_child(
+                        module,
+                        fds,
+                        [server, connection, *children.values()],
+                        (wakeup_read, wakeup_write),
+                    )
+                children[pid] = connection
+                connection.sendall(f"{pid}\n".encode("ascii"))
+            else:
+                connection.close()
+            for fd in fds:
+                os.close(fd)
+
+        while children:
+            try:
+                pid, status, usage = os.wait4(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            connection = children.pop(pid, None)
+            if connection is None:
+                continue
+            notice = (
+                f"exit {os.waitstatus_to_exitcode(status)} "
+                f"{usage.ru_utime:.3f} {usage.ru_stime:.3f} {usage.ru_maxrss}\n"
+            )
+            try:
+                connection.sendall(notice.encode("ascii"))
+            except OSError:
+                pass
+            connection.close()
+
+    server.close()
+
+
+if __name__ == "__main__":
+    serve(sys.argv[1])
@@ -3,11 +3,21 @@
 from __future__ import annotations
 
 import faulthandler
+import itertools
 import logging
+import os
 import sys
 import threading
+import tracemalloc
+from collections import OrderedDict
+from typing import Optional
 
 LOGGER = logging.getLogger(__name__)
+THREAD_PREFIXES = ("download-", "worker-stdout-", "worker-stderr-", "expand-")
+# Like PYTHONTRACEMALLOC: the number of frames to keep, and 0 leaves tracing off at startup.
+TRACEMALLOC_FRAMES = max(0, int(os.getenv("SPOTDL_TRACEMALLOC", "0")))
+# `tracemalloc` snapshots kept as diff baselines; the oldest is dropped beyond this.
+MAX_MEMORY_SNAPSHOTS = 8
 
 
 class _SpotipyRateLimitFilter(logging.Filter):
@@ -86,10 +96,108 @@ def _install_exception_logging() -> None:
     threading.excepthook = _log_thread_exception
 
 
+def thread_counts(prefixes: tuple[str, ...] = THREAD_PREFIXES) -> dict[str, object]:
+    """Count live threads, grouped by the name prefixes the supervisor uses."""
+    threads = threading.enumerate()
+    by_prefix = {prefix: 0 for prefix in prefixes}
+    other: dict[str, int] = {}
+    for thread in threads:
+        prefix = next((prefix for prefix in prefixes if thread.name.startswith(prefix)), None)
+        if prefix is not None:
+            by_prefix[prefix] += 1
+        else:
+            other[thread.name] = other.get(thread.name, 0) + 1
+    return {"total": len(threads), "by_prefix": by_prefix, "other": other}
+
+
+def _format_stat(stat) -> dict[str, object]:
+    frame = stat.traceback[0]
+    return {
+        "location": f"{frame.filename}:{frame.lineno}",
+        "size_bytes": stat.size,
+        "count": stat.count,
+    }
+
+
+def _format_diff(stat) -> dict[str, object]:
+    return {**_format_stat(stat), "size_diff_bytes": stat.size_diff, "count_diff": stat.count_diff}
+
+
+class MemoryTracker:
+    """Report `tracemalloc` top allocators, and the growth since a snapshot taken earlier.
+
+    Tracing is off until started, because it slows allocation-heavy code noticeably.
+    Snapshots are taken explicitly and kept by id, so reading a report never moves
+    the baseline another viewer is diffing against.
+    """
+
+    def __init__(self, max_snapshots: int = MAX_MEMORY_SNAPSHOTS) -> None:
+        self.max_snapshots = max(1, max_snapshots)
+        self._snapshots: OrderedDict[int, tracemalloc.Snapshot] = OrderedDict()
+        self._snapshot_ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def start(self, frames: int = TRACEMALLOC_FRAMES) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(max(1, frames))
+
+    def stop(self) -> None:
+        with self._lock:
+            self._snapshots.clear()
+        tracemalloc.stop()
+
+    @staticmethod
+    def _take() -> tracemalloc.Snapshot:
+        # Leave out tracemalloc's own bookkeeping allocations.
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        return tracemalloc.take_snapshot().filter_traces(filters)
+
+    def snapshot(self) -> Optional[int]:
+        """Keep a snapshot to diff later reports against and return its id, or `None` when not tracing."""
+        if not tracemalloc.is_tracing():
+            return None
+        snapshot = self._take()
+        with self._lock:
+            snapshot_id = next(self._snapshot_ids)
+            self._snapshots[snapshot_id] = snapshot
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+        return snapshot_id
+
+    def report(self, *, limit: int = 15, group_by: str = "lineno", since: Optional[int] = None) -> dict[str, object]:
+        """Return top allocators, and the diff against snapshot `since` when given.
+
+        Raises `KeyError` when `since` is not a snapshot this tracker still keeps.
+        """
+        if not tracemalloc.is_tracing():
+            return {"tracing": False}
+
+        with self._lock:
+            previous = self._snapshots[since] if since is not None else None
+        snapshot = self._take()
+        current, peak = tracemalloc.get_traced_memory()
+        report: dict[str, object] = {
+            "tracing": True,
+            "traced_bytes": current,
+            "peak_traced_bytes": peak,
+            "top": [_format_stat(stat) for stat in snapshot.statistics(group_by)[:limit]],
+            "since": since,
+            "diff": None,
+        }
+        if previous is not None:
+            report["diff"] = [_format_diff(stat) for stat in snapshot.compare_to(previous, group_by)[:limit]]
+        return report
+
+
+memory_tracker = MemoryTracker()
+
+
 def enable_terminal_diagnostics() -> None:
     """Enable line-buffered logging and Python fault dumps."""
     _configure_logging()
     _install_exception_logging()
+    if TRACEMALLOC_FRAMES:
+        memory_tracker.start()
     try:
         faulthandler.enable(all_threads=True)
     except (AttributeError, RuntimeError):
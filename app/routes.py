@@ -4,12 +4,17 @@ from __future__ import annotations
 
 from pathlib import Path
 
-from flask import Flask, jsonify, render_template, request
+from flask import Flask, jsonify, render_template, request, send_file
 
+from app.backend.admission import Overloaded
+from app.backend.covers import COVER_MAX_AGE, CoverFetchError
 from app.backend.inputs import UnsupportedInputError
 from app.backend.metadata import MetadataError
+from app.backend.metrics import REQUESTS_REJECTED, registry as metrics_registry
 from app.backend.os import best_initial_directory, choose_directory
+from app.backend.profiling import PROFILE_SAMPLE_INTERVAL, profile_process
 from app.backend.settings import build_download_request
+from app.diagnostics import memory_tracker, thread_counts
 from config import APP_NAME
 
 
@@ -17,11 +22,41 @@ def register_routes(
     app: Flask,
     *,
     metadata_service,
+    metadata_lookups,
     download_service,
     settings_store,
+    cover_cache,
+    client_limiter,
 ) -> None:
     """Attach all HTTP routes to the Flask application."""
 
+    def _overloaded_response(exc: Overloaded):
+        REQUESTS_REJECTED.inc(code=exc.code)
+        response = jsonify({"error": str(exc), "code": exc.code})
+        response.status_code = 429
+        response.headers["Retry-After"] = str(exc.retry_after)
+        return response
+
+    def _metadata_payload(metadata: dict[str, str]) -> dict[str, str]:
+        payload = dict(metadata)
+        payload["cover"] = cover_cache.proxy_url(payload.get("cover") or "")
+        return payload
+
+    def _lookup_response(lookup):
+        if lookup.status == "done":
+            return jsonify({**_metadata_payload(lookup.metadata), "id": lookup.lookup_id, "status": "done"})
+        if lookup.status == "error":
+            error = lookup.error
+            body = {"id": lookup.lookup_id, "status": "error", "error": str(error), "code": error.code}
+            return jsonify(body), error.status_code
+        if lookup.status == "cancelled":
+            body = {"id": lookup.lookup_id, "status": "cancelled", "error": "Metadata lookup cancelled."}
+            return jsonify(body), 410
+        response = jsonify({"id": lookup.lookup_id, "status": "pending"})
+        response.status_code = 202
+        response.headers["Location"] = f"/meta/{lookup.lookup_id}"
+        return response
+
     @app.route("/favicon.ico")
     def favicon():
         """Serve the bundled favicon without emitting a noisy 404."""
@@ -69,24 +104,77 @@ def register_routes(
     @app.route("/meta", methods=["POST"])
     def meta_endpoint():
         """Fetch best-effort metadata without blocking the main app process."""
+        try:
+            client_limiter.acquire(request.remote_addr)
+        except Overloaded as exc:
+            return _overloaded_response(exc)
+
         data = request.get_json(force=True) or {}
         link = str(data.get("link") or "").strip()
 
         if not link:
             return jsonify({"error": "Missing link"}), 400
 
+        if data.get("async"):
+            # Answer at once with a lookup id to poll, instead of holding this thread.
+            try:
+                lookup = metadata_lookups.submit(link)
+            except UnsupportedInputError as exc:
+                return jsonify({"error": str(exc)}), 400
+            except Overloaded as exc:
+                return _overloaded_response(exc)
+            return _lookup_response(lookup)
+
         try:
             metadata = metadata_service.get_metadata(link)
         except UnsupportedInputError as exc:
             return jsonify({"error": str(exc)}), 400
         except MetadataError as exc:
             return jsonify({"error": str(exc), "code": exc.code}), exc.status_code
+        except Overloaded as exc:
+            return _overloaded_response(exc)
+
+        return jsonify(_metadata_payload(metadata))
 
-        return jsonify(metadata)
+    @app.route("/meta/<lookup_id>")
+    def meta_lookup_endpoint(lookup_id: str):
+        """Poll an async metadata lookup: 202 while pending, the metadata once done."""
+        lookup = metadata_lookups.get(lookup_id)
+        if lookup is None:
+            return jsonify({"error": "Unknown or expired metadata lookup."}), 404
+        return _lookup_response(lookup)
+
+    @app.route("/meta/<lookup_id>", methods=["DELETE"])
+    def cancel_meta_lookup_endpoint(lookup_id: str):
+        """Cancel an async metadata lookup, e.g. because its row was removed."""
+        if not metadata_lookups.cancel(lookup_id):
+            return jsonify({"error": "Unknown or expired metadata lookup."}), 404
+        return "", 204
+
+    @app.route("/cover/<key>")
+    def cover_endpoint(key: str):
+        """Serve cached, resized cover art so rows never hotlink full-size CDN images."""
+        size = request.args.get("size", type=int)
+        try:
+            cover_path, mimetype = cover_cache.thumbnail(key, size)
+        except FileNotFoundError:
+            return "", 404
+        except CoverFetchError as exc:
+            return jsonify({"error": str(exc)}), 502
+
+        response = send_file(cover_path, mimetype=mimetype, max_age=COVER_MAX_AGE, conditional=True)
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
 
     @app.route("/download", methods=["POST"])
     def download_endpoint():
         """Queue a download immediately and let the supervisor own the rest."""
+        try:
+            client_limiter.acquire(request.remote_addr)
+        except Overloaded as exc:
+            return _overloaded_response(exc)
+
         data = request.get_json(force=True) or {}
         link = str(data.get("link") or "").strip()
 
@@ -104,6 +192,8 @@ def register_routes(
             download_service.start_download(link, download_request)
         except UnsupportedInputError as exc:
             return jsonify({"error": str(exc)}), 400
+        except Overloaded as exc:
+            return _overloaded_response(exc)
         return "", 204
 
     @app.route("/status")
@@ -113,6 +203,89 @@ def register_routes(
         links = [link.strip() for link in links_param.split(",") if link.strip()]
         return jsonify(download_service.get_status(links))
 
+    @app.route("/stats/phases")
+    def phase_stats_endpoint():
+        """Get rolling per-phase timing percentiles for recent jobs."""
+        return jsonify(download_service.phase_percentiles())
+
+    @app.route("/stats/resources")
+    def resource_stats_endpoint():
+        """Get the recent jobs that used the most CPU time and peak RSS."""
+        try:
+            limit = min(100, max(1, int(request.args.get("limit", "10"))))
+        except ValueError:
+            return jsonify({"error": "limit must be an integer."}), 400
+        return jsonify(download_service.heaviest_jobs(limit))
+
+    @app.route("/metrics")
+    def metrics_endpoint():
+        """Expose counters and histograms in the Prometheus text format."""
+        load = download_service.load_snapshot()
+        body = metrics_registry.render(
+            {
+                "spotdl_queue_depth": ("Downloads waiting for a worker slot.", load["queued"]),
+                "spotdl_active_workers": ("Download workers currently running.", load["active"]),
+                "spotdl_retrying_jobs": ("Failed downloads waiting out their backoff.", load["retrying"]),
+                "spotdl_concurrency_limit": ("Maximum concurrent download workers.", load["concurrency_limit"]),
+            }
+        )
+        return app.response_class(body, mimetype="text/plain; version=0.0.4")
+
+    @app.route("/debug/profile")
+    def profile_endpoint():
+        """Sample this process's thread stacks for a few seconds and return folded stacks."""
+        try:
+            seconds = min(60.0, max(0.01, float(request.args.get("seconds", "5"))))
+            interval = min(1.0, max(0.001, float(request.args.get("interval", PROFILE_SAMPLE_INTERVAL))))
+        except ValueError:
+            return jsonify({"error": "seconds and interval must be numbers."}), 400
+        return app.response_class(profile_process(seconds, interval=interval), mimetype="text/plain")
+
+    @app.route("/debug/memory")
+    def memory_endpoint():
+        """Report thread counts, in-memory container sizes and tracemalloc allocators.
+
+        `?since=<snapshot_id>` adds the growth since a snapshot taken with
+        `POST /debug/memory/snapshots`; reading this never changes any state.
+        """
+        try:
+            limit = min(100, max(1, int(request.args.get("limit", "15"))))
+            since = int(request.args["since"]) if request.args.get("since") else None
+        except ValueError:
+            return jsonify({"error": "limit and since must be integers."}), 400
+        try:
+            tracemalloc_report = memory_tracker.report(limit=limit, since=since)
+        except KeyError:
+            return jsonify({"error": f"Unknown or expired memory snapshot {since}."}), 404
+        return jsonify(
+            {
+                "threads": thread_counts(),
+                "sizes": {**download_service.container_sizes(), **metadata_service.cache_sizes()},
+                "tracemalloc": tracemalloc_report,
+            }
+        )
+
+    @app.route("/debug/memory/tracemalloc", methods=["POST"])
+    def tracemalloc_endpoint():
+        """Start or stop tracemalloc with `{"action": "start"}` or `{"action": "stop"}`."""
+        data = request.get_json(silent=True) or {}
+        action = str(data.get("action") or "").strip().lower()
+        if action == "start":
+            memory_tracker.start()
+        elif action == "stop":
+            memory_tracker.stop()
+        else:
+            return jsonify({"error": "action must be start or stop."}), 400
+        return jsonify({"tracing": action == "start"})
+
+    @app.route("/debug/memory/snapshots", methods=["POST"])
+    def memory_snapshot_endpoint():
+        """Take a tracemalloc snapshot to diff later `/debug/memory?since=` reports against."""
+        snapshot_id = memory_tracker.snapshot()
+        if snapshot_id is None:
+            return jsonify({"error": "tracemalloc is not tracing."}), 409
+        return jsonify({"snapshot_id": snapshot_id}), 201
+
     @app.route("/cancel", methods=["POST"])
     def cancel_endpoint():
         """Cancel an active download."""
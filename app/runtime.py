@@ -8,6 +8,7 @@ import socket
 import sys
 import threading
 
+from app.backend.zygote import shared_zygote
 from app.diagnostics import enable_terminal_diagnostics
 from app.web import create_app
 from config import APP_NAME, PORT, WINDOW_HEIGHT, WINDOW_WIDTH
@@ -75,6 +76,9 @@ def main() -> None:
         LOGGER.info("Starting development server at http://%s:%s", SERVER_HOST, PORT)
         if _should_probe_server_socket(use_reloader=use_reloader):
             _ensure_server_can_bind(SERVER_HOST, PORT)
+        else:
+            # Only the reloader child serves requests, so only it needs a warm zygote.
+            shared_zygote()
         app.run(
             host=SERVER_HOST,
             port=PORT,
@@ -85,6 +89,7 @@ def main() -> None:
         )
         return
 
+    shared_zygote()
     server_thread = threading.Thread(
         target=run_server,
         args=(app,),
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import atexit
 import logging
 from pathlib import Path
 
@@ -12,7 +13,10 @@ except ImportError as exc:
         "Missing app dependencies. Run `./setup`, then `./dev` or `./run`."
     ) from exc
 
+from app.backend.admission import ClientRateLimiter
+from app.backend.covers import CoverCache, default_cover_cache
 from app.backend.jobs import DownloadSupervisor
+from app.backend.lookups import MetadataLookups
 from app.backend.metadata import MetadataService
 from app.backend.settings import default_settings_store
 from app.routes import register_routes
@@ -30,6 +34,9 @@ def create_app(
     metadata_service: MetadataService | None = None,
     download_service: DownloadSupervisor | None = None,
     active_settings_store=None,
+    cover_cache: CoverCache | None = None,
+    metadata_lookups: MetadataLookups | None = None,
+    client_limiter: ClientRateLimiter | None = None,
 ) -> Flask:
     """Create and configure Flask application."""
     resource_dir = _project_root()
@@ -39,8 +46,14 @@ def create_app(
         static_folder=str(resource_dir / "static"),
     )
     metadata_service = metadata_service or MetadataService()
-    download_service = download_service or DownloadSupervisor(metadata_service)
+    metadata_lookups = metadata_lookups or MetadataLookups(metadata_service)
+    if download_service is None:
+        download_service = DownloadSupervisor(metadata_service)
+        # Workers run in their own process groups, so they no longer die with the app's terminal.
+        atexit.register(download_service.shutdown)
     active_settings_store = active_settings_store or default_settings_store
+    cover_cache = cover_cache or default_cover_cache
+    client_limiter = client_limiter or ClientRateLimiter()
 
     def _log_request_exception(sender, exception, **extra) -> None:
         LOGGER.exception(
@@ -67,7 +80,10 @@ def create_app(
     register_routes(
         app,
         metadata_service=metadata_service,
+        metadata_lookups=metadata_lookups,
         download_service=download_service,
         settings_store=active_settings_store,
+        cover_cache=cover_cache,
+        client_limiter=client_limiter,
     )
     return app
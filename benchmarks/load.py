@@ -0,0 +1,227 @@
+"""Offline end-to-end load harness: Flask routes -> supervisor -> monitors -> stand-in workers.
+
+Every job runs as a real subprocess (`benchmarks.standin_worker`) that speaks the worker
+protocol and writes a real file, so no network, spotDL or yt-dlp is involved. The harness
+submits jobs through `POST /download`, polls `/status` like the UI does, and then reports
+throughput, tail latency and whether each hang, crash and malformed worker was
+detected as the failure it should be.
+
+    python -m benchmarks.load [--jobs 200] [--concurrency 8] [--idle-timeout 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import math
+import os
+import shutil
+import tempfile
+import time
+from collections import Counter
+from functools import partial
+from pathlib import Path
+from typing import Optional
+
+from app.backend import workers
+from app.backend.jobs import MAX_QUEUED_DOWNLOADS, DownloadSupervisor
+from app.backend.metadata import MetadataService
+from app.backend.retries import RetryPolicy
+from app.backend.settings import SettingsStore
+from app.web import create_app
+from benchmarks.standin_worker import JobPlan, load_config, plan_job
+
+TERMINAL_STATUSES = {"done", "error", "idle"}
+
+
+def _link(index: int) -> str:
+    return f"https://open.spotify.com/track/load{index:08d}"
+
+
+def expected_outcome(plan: JobPlan, hard_timeout: float) -> str:
+    """Return the status (`done`) or error class the supervisor should report for a plan."""
+    if plan.scenario == "hang":
+        return "idle_timeout"
+    if plan.scenario == "crash":
+        return "worker_exit"
+    if plan.scenario == "malformed":
+        return "no_result"
+    if plan.resolve_seconds + plan.search_seconds + plan.download_seconds > hard_timeout:
+        return "hard_timeout"
+    return "done"
+
+
+def _actual_outcome(payload: dict[str, object]) -> str:
+    if payload["status"] == "done":
+        return "done"
+    return str(payload.get("error_class") or payload["status"])
+
+
+def _percentile(values: list[float], percentile: int) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(percentile / 100 * len(ordered))) - 1]
+
+
+def _summary(values: list[float], scale: float = 1.0) -> str:
+    percentiles = " ".join(f"p{p}={_percentile(values, p) * scale:.2f}" for p in (50, 90, 99))
+    return f"{percentiles} max={max(values, default=0.0) * scale:.2f}"
+
+
+def run(args: argparse.Namespace) -> int:
+    config = load_config(args.config)
+    os.environ["SPOTDL_STANDIN_CONFIG"] = json.dumps(config)
+    root = Path(tempfile.mkdtemp(prefix="spotdl-load-"))
+    # Keep job logs with the run instead of the user's settings directory.
+    workers.JOB_LOG_DIR = root / "logs"
+    workers.JOB_LOG_DIR.mkdir()
+
+    settings_store = SettingsStore(
+        default_download_dir=root / "music",
+        settings_dir=root,
+        settings_file=root / "settings.json",
+    )
+    settings_store.set_download_dir(root / "music")
+    metadata_service = MetadataService()
+    supervisor = DownloadSupervisor(
+        metadata_service,
+        concurrency_limit=args.concurrency,
+        max_queued=args.max_queued,
+        retry_policy=RetryPolicy(max_attempts=args.retry_attempts, base_delay=0.5),
+        monitor_factory=partial(
+            workers.WorkerMonitor,
+            worker_module="benchmarks.standin_worker",
+            idle_timeout=args.idle_timeout,
+            hard_timeout=args.hard_timeout,
+        ),
+    )
+    client = create_app(
+        metadata_service=metadata_service,
+        download_service=supervisor,
+        active_settings_store=settings_store,
+    ).test_client()
+
+    links = [_link(index) for index in range(args.jobs)]
+    plans = {link: plan_job(link, config) for link in links}
+    submit_seconds: list[float] = []
+    rejected: Counter[str] = Counter()
+    poll_seconds: list[float] = []
+    final: dict[str, dict[str, object]] = {}
+
+    started = time.perf_counter()
+    try:
+        for link in links:
+            while True:
+                request_started = time.perf_counter()
+                response = client.post("/download", json={"link": link})
+                submit_seconds.append(time.perf_counter() - request_started)
+                if response.status_code != 429:
+                    break
+                # Shed by admission control: back off as the UI does and resubmit.
+                rejected[response.get_json()["code"]] += 1
+                time.sleep(float(response.headers["Retry-After"]))
+            if response.status_code != 204:
+                raise RuntimeError(f"POST /download returned {response.status_code} for {link}")
+
+        deadline = time.monotonic() + args.deadline
+        pending = list(links)
+        while pending and time.monotonic() < deadline:
+            poll_started = time.perf_counter()
+            statuses = client.get("/status?links=" + ",".join(pending)).get_json()
+            poll_seconds.append(time.perf_counter() - poll_started)
+            for link in pending:
+                if statuses[link]["status"] in TERMINAL_STATUSES:
+                    final[link] = statuses[link]
+            pending = [link for link in pending if link not in final]
+            time.sleep(args.poll_interval)
+        wall_seconds = time.perf_counter() - started
+    finally:
+        supervisor.shutdown()
+
+    outcomes = Counter()
+    mismatches: Counter[tuple[str, str]] = Counter()
+    latencies: list[float] = []
+    queue_waits: list[float] = []
+    detection_lag: dict[str, list[float]] = {"idle_timeout": [], "hard_timeout": []}
+    bad_files = 0
+    for link, payload in final.items():
+        expected = expected_outcome(plans[link], args.hard_timeout)
+        actual = _actual_outcome(payload)
+        outcomes[actual] += 1
+        if actual != expected:
+            mismatches[(expected, actual)] += 1
+        phase_seconds = payload.get("phase_seconds") or {}
+        latencies.append(float(phase_seconds.get("total", 0.0)))
+        queue_waits.append(float(phase_seconds.get("queued", 0.0)))
+        if actual == expected == "idle_timeout":
+            # The stand-in goes silent right after its `starting` event.
+            detection_lag["idle_timeout"].append(float(phase_seconds.get("starting", 0.0)) - args.idle_timeout)
+        elif actual == expected == "hard_timeout":
+            running = float(phase_seconds.get("total", 0.0)) - float(phase_seconds.get("queued", 0.0))
+            detection_lag["hard_timeout"].append(running - args.hard_timeout)
+        if actual == "done":
+            file_path = Path(str(payload.get("file_path") or ""))
+            if not file_path.is_file() or file_path.stat().st_size != plans[link].file_bytes:
+                bad_files += 1
+
+    scenarios = Counter(plan.scenario for plan in plans.values())
+    print(
+        f"{args.jobs} jobs, concurrency {args.concurrency}, "
+        f"idle timeout {args.idle_timeout}s, hard timeout {args.hard_timeout}s"
+    )
+    print(f"scenarios: {dict(sorted(scenarios.items()))}")
+    print(f"finished {len(final)}/{args.jobs} in {wall_seconds:.1f}s ({len(final) / wall_seconds:.1f} jobs/s)")
+    print(f"outcomes: {dict(sorted(outcomes.items()))}")
+    print(f"job latency s (queued -> final): {_summary(latencies)}")
+    print(f"queue wait s: {_summary(queue_waits)}")
+    print(f"POST /download ms: {_summary(submit_seconds, 1000.0)}")
+    if rejected:
+        print(f"POST /download answered 429 and retried: {dict(sorted(rejected.items()))}")
+    print(f"GET /status ms: {_summary(poll_seconds, 1000.0)}")
+    for kind, lags in detection_lag.items():
+        if lags:
+            print(f"{kind} detection lag s (beyond the timeout): {_summary(lags)}")
+    print(f"outcome accuracy: {len(final) - sum(mismatches.values())}/{len(final)} as expected")
+    for (expected, actual), count in sorted(mismatches.items()):
+        print(f"  expected {expected}, got {actual}: {count}")
+    if bad_files:
+        print(f"completed jobs with a missing or wrong-sized file: {bad_files}")
+
+    if args.keep:
+        print(f"kept run directory {root}")
+    else:
+        shutil.rmtree(root, ignore_errors=True)
+    return 0 if len(final) == args.jobs and not mismatches and not bad_files else 1
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--max-queued", type=int, default=MAX_QUEUED_DOWNLOADS, help="download queue cap")
+    parser.add_argument(
+        "--retry-attempts",
+        type=int,
+        default=1,
+        help="attempts per job; injected faults repeat on every attempt, so retries only add latency",
+    )
+    parser.add_argument("--idle-timeout", type=int, default=3)
+    parser.add_argument("--hard-timeout", type=int, default=30)
+    parser.add_argument("--poll-interval", type=float, default=0.25)
+    parser.add_argument("--deadline", type=float, default=900.0, help="give up after this many seconds")
+    parser.add_argument(
+        "--config",
+        default=None,
+        help="JSON overrides for the stand-in, e.g. '{\"hang\": 0.1, \"file_bytes\": 65536}'",
+    )
+    parser.add_argument("--keep", action="store_true", help="keep downloaded files and job logs")
+    parser.add_argument("--verbose", action="store_true", help="show supervisor logs while running")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR)
+    raise SystemExit(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Events-per-second benchmark for the worker event protocol.
+
+Compares the JSON-lines protocol with length-prefixed binary frames on one core:
+worker-side encoding, parent-side decoding, and decoding plus `JobStore` apply.
+
+    python -m benchmarks.protocol [--events 200000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Callable
+
+from app.backend.framing import FrameDecoder, FrameEncoder, preferred_codec
+from app.backend.jobs import JobStore
+from app.backend.workers import parse_worker_event
+
+LINK = "https://open.spotify.com/track/benchmark"
+JOB_ID = "benchmark"
+READ_SIZE = 65536
+
+
+def _events(count: int) -> list[dict[str, object]]:
+    """Build a download-shaped stream: mostly progress, with a phase change every 50."""
+    events: list[dict[str, object]] = []
+    for index in range(count):
+        if index % 50 == 0:
+            events.append({"type": "phase", "phase": "downloading", "detail": f"Downloading part {index}"})
+        else:
+            events.append(
+                {
+                    "type": "progress",
+                    "phase": "downloading",
+                    "detail": "Downloading",
+                    "progress": (index % 100) + 0.5,
+                    "progress_known": True,
+                }
+            )
+    return events
+
+
+def _chunks(data: bytes) -> list[bytes]:
+    return [data[offset:offset + READ_SIZE] for offset in range(0, len(data), READ_SIZE)]
+
+
+def _json_lines_encode(events: list[dict[str, object]]) -> bytes:
+    return b"".join((json.dumps(event, ensure_ascii=True) + "\n").encode("ascii") for event in events)
+
+
+def _json_lines_decode(chunks: list[bytes]) -> list[dict[str, object]]:
+    decoded: list[dict[str, object]] = []
+    pending = b""
+    for chunk in chunks:
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        decoded.extend(parse_worker_event(line.decode("utf-8")) for line in lines if line)
+    return decoded
+
+
+def _framed_encode(events: list[dict[str, object]], codec: str) -> bytes:
+    encoder = FrameEncoder(codec)
+    return b"".join(encoder.encode(event) for event in events)
+
+
+def _framed_decode(chunks: list[bytes], codec: str) -> list[object]:
+    decoder = FrameDecoder(codec)
+    decoded: list[object] = []
+    for chunk in chunks:
+        decoded.extend(decoder.feed(chunk))
+    return decoded
+
+
+def _apply(decode: Callable[[], list], store: JobStore) -> None:
+    store.apply_worker_events(LINK, JOB_ID, decode())
+
+
+def _rate(count: int, func: Callable[[], object], repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return count / best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    events = _events(args.events)
+    codec = preferred_codec()
+    store = JobStore()
+    store.queue_job(LINK, JOB_ID)
+
+    json_chunks = _chunks(_json_lines_encode(events))
+    framed_chunks = _chunks(_framed_encode(events, codec))
+    rows = [
+        (
+            "json-lines",
+            _rate(args.events, lambda: _json_lines_encode(events), args.repeats),
+            _rate(args.events, lambda: _json_lines_decode(json_chunks), args.repeats),
+            _rate(args.events, lambda: _apply(lambda: _json_lines_decode(json_chunks), store), args.repeats),
+            sum(map(len, json_chunks)) / args.events,
+        ),
+        (
+            f"framed ({codec})",
+            _rate(args.events, lambda: _framed_encode(events, codec), args.repeats),
+            _rate(args.events, lambda: _framed_decode(framed_chunks, codec), args.repeats),
+            _rate(args.events, lambda: _apply(lambda: _framed_decode(framed_chunks, codec), store), args.repeats),
+            sum(map(len, framed_chunks)) / args.events,
+        ),
+    ]
+
+    print(f"{args.events} events, best of {args.repeats}, events/second on one core")
+    print(f"{'protocol':<18}{'encode':>12}{'decode':>12}{'decode+apply':>14}{'bytes/event':>13}")
+    for name, encode_rate, decode_rate, apply_rate, size in rows:
+        print(f"{name:<18}{encode_rate:>12,.0f}{decode_rate:>12,.0f}{apply_rate:>14,.0f}{size:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
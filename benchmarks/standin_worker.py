@@ -0,0 +1,216 @@
+"""Offline stand-in for `app.backend.download_worker` used by the load harness.
+
+It reads the same JSON payload on stdin and speaks the same event protocol, but
+instead of spotDL and yt-dlp it sleeps through simulated resolve, search and download
+phases and writes a real file of a chosen size. Some jobs are deliberately slow,
+hang, crash or print malformed output, so timeout and failure handling are exercised.
+
+The scenario for each job is derived from its link and `SPOTDL_STANDIN_CONFIG` (JSON),
+so the harness can predict every job's expected outcome without talking to the worker.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+DEFAULT_CONFIG: dict[str, Any] = {
+    "seed": 0,
+    # Uniform ranges in seconds.
+    "resolve_seconds": [0.05, 0.2],
+    "search_seconds": [0.05, 0.3],
+    "download_seconds": [0.2, 1.0],
+    "file_bytes": 1024 * 1024,
+    # Scenario probabilities; whatever is left over behaves normally.
+    "throttle": 0.05,
+    "throttle_factor": 8.0,
+    "hang": 0.02,
+    "crash": 0.02,
+    "malformed": 0.02,
+    # Start a child that ignores SIGTERM, like an ffmpeg transcode, and optionally ignore it too.
+    "child_process": False,
+    "ignore_sigterm": False,
+    # Stop the whole process (SIGSTOP) this many seconds in, so even heartbeats cease.
+    "freeze_after": None,
+}
+PROGRESS_INTERVAL = 0.1
+SCENARIOS = ("hang", "crash", "malformed", "throttle")
+
+
+@dataclass(frozen=True)
+class JobPlan:
+    """What the stand-in will do for one link."""
+
+    scenario: str
+    resolve_seconds: float
+    search_seconds: float
+    download_seconds: float
+    file_bytes: int
+
+
+def load_config(raw: str | None = None) -> dict[str, Any]:
+    raw = os.getenv("SPOTDL_STANDIN_CONFIG", "") if raw is None else raw
+    return {**DEFAULT_CONFIG, **(json.loads(raw) if raw.strip() else {})}
+
+
+def plan_job(link: str, config: dict[str, Any]) -> JobPlan:
+    """Pick a deterministic scenario and phase durations for `link`."""
+    rng = random.Random(f"{config['seed']}:{link}")
+    roll = rng.random()
+    scenario = "ok"
+    for name in SCENARIOS:
+        if roll < float(config[name]):
+            scenario = name
+            break
+        roll -= float(config[name])
+
+    download_seconds = rng.uniform(*config["download_seconds"])
+    if scenario == "throttle":
+        download_seconds *= float(config["throttle_factor"])
+    return JobPlan(
+        scenario=scenario,
+        resolve_seconds=rng.uniform(*config["resolve_seconds"]),
+        search_seconds=rng.uniform(*config["search_seconds"]),
+        download_seconds=download_seconds,
+        file_bytes=int(config["file_bytes"]),
+    )
+
+
+def _event_writer(payload: dict[str, Any]) -> Callable[[dict[str, Any]], None]:
+    lock = threading.Lock()
+    if payload.get("framing") == "binary":
+        from app.backend.framing import FrameEncoder
+
+        encoder = FrameEncoder(str(payload.get("codec") or "json"))
+        stream = sys.stdout.buffer
+
+        def write_frame(event: dict[str, Any]) -> None:
+            with lock:
+                stream.write(encoder.encode(event))
+                stream.flush()
+
+        return write_frame
+
+    def write_line(event: dict[str, Any]) -> None:
+        with lock:
+            sys.stdout.write(json.dumps(event, ensure_ascii=True) + "\n")
+            sys.stdout.flush()
+
+    return write_line
+
+
+def _download(plan: JobPlan, target: Path, emit: Callable[[dict[str, Any]], None]) -> None:
+    """Write `plan.file_bytes` to `target` spread over the download duration, with progress."""
+    steps = max(1, int(plan.download_seconds / PROGRESS_INTERVAL))
+    chunk = bytes(min(plan.file_bytes, 1024 * 1024))
+    written = 0
+    with target.open("wb") as handle:
+        for step in range(1, steps + 1):
+            goal = plan.file_bytes * step // steps
+            while written < goal:
+                size = min(len(chunk), goal - written)
+                handle.write(chunk[:size])
+                written += size
+            time.sleep(plan.download_seconds / steps)
+            emit(
+                {
+                    "type": "progress",
+                    "phase": "downloading",
+                    "detail": "Downloading",
+                    "progress": step * 100.0 / steps,
+                    "progress_known": True,
+                }
+            )
+
+
+def _start_child() -> subprocess.Popen:
+    code = "import signal, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); time.sleep(3600)"
+    return subprocess.Popen([sys.executable, "-c", code], stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL)
+
+
+def _start_heartbeats(payload: dict[str, Any], emit: Callable[[dict[str, Any]], None], phase: list[str]) -> None:
+    interval = float(payload.get("heartbeat_interval") or 0)
+    if interval <= 0:
+        return
+
+    def beat() -> None:
+        while True:
+            time.sleep(interval)
+            emit({"type": "heartbeat", "phase": phase[0]})
+
+    threading.Thread(target=beat, daemon=True).start()
+
+
+def main() -> None:
+    payload = json.load(sys.stdin)
+    emit = _event_writer(payload)
+    config = load_config()
+    plan = plan_job(str(payload.get("link") or ""), config)
+    if config["ignore_sigterm"]:
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    child = _start_child() if config["child_process"] else None
+    phase_seconds: dict[str, float] = {}
+    current_phase = ["starting"]
+    _start_heartbeats(payload, emit, current_phase)
+    if config["freeze_after"] is not None:
+        threading.Timer(float(config["freeze_after"]), os.kill, (os.getpid(), signal.SIGSTOP)).start()
+
+    def run_phase(phase: str, detail: str, work: Callable[[], None]) -> None:
+        current_phase[0] = phase
+        emit({"type": "phase", "phase": phase, "detail": detail})
+        started = time.monotonic()
+        work()
+        phase_seconds[phase] = round(time.monotonic() - started, 3)
+
+    emit(
+        {
+            "type": "phase",
+            "phase": "starting",
+            "detail": "Stand-in worker started",
+            "child_pid": child.pid if child is not None else None,
+        }
+    )
+    if plan.scenario == "hang":
+        while True:
+            time.sleep(3600)
+
+    run_phase("resolving", "Resolving metadata", lambda: time.sleep(plan.resolve_seconds))
+    if plan.scenario == "crash":
+        sys.stderr.write("stand-in worker crashed on purpose\n")
+        sys.stderr.flush()
+        os._exit(3)
+
+    run_phase("searching", "Searching YouTube", lambda: time.sleep(plan.search_seconds))
+    if plan.scenario == "malformed":
+        sys.stdout.write("{not json\n")
+        sys.stdout.flush()
+        return
+
+    directory = Path(str(payload.get("download_directory") or ".")).expanduser()
+    directory.mkdir(parents=True, exist_ok=True)
+    target = directory / f"standin-{payload.get('job_id')}.mp3"
+    run_phase("downloading", "Downloading", lambda: _download(plan, target, emit))
+    emit(
+        {
+            "type": "completed",
+            "file_path": str(target),
+            "stats": {
+                "phase_seconds": phase_seconds,
+                "bytes_downloaded": plan.file_bytes,
+                "bytes_written": plan.file_bytes,
+            },
+        }
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""Throughput and latency benchmarks for `DownloadSupervisor`, `JobStore` and `/status`.
+
+Fake monitors stand in for worker subprocesses (the stub pattern from
+`tests/test_backend_jobs.py`) and replay a download-shaped event stream, so the numbers
+are the supervisor's own lock, queue and bookkeeping costs rather than spotDL's.
+
+    python -m benchmarks.supervisor [--jobs 10000,100000] [--concurrency 1,4,16]
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from app.backend.jobs import DownloadSupervisor, JobStore
+from app.backend.settings import DownloadRequest
+from app.backend.workers import WorkerOutcome
+from app.web import create_app
+
+REQUEST = DownloadRequest(
+    download_directory=Path("/tmp/benchmark"),
+    quality="best",
+    format="mp3",
+    bitrate="auto",
+)
+PROGRESS_BATCH = 8
+
+
+class _MetadataStub:
+    def get_cached_song_payload(self, _link: str):
+        return None
+
+    def get_cached_duration(self, _link: str):
+        return None
+
+    def cache_sizes(self) -> dict[str, int]:
+        return {}
+
+
+class _SettingsStoreStub:
+    def get_download_dir(self) -> Path:
+        return REQUEST.download_directory
+
+
+def _link(index: int) -> str:
+    return f"https://open.spotify.com/track/bench{index:08d}"
+
+
+def _event_batches(progress_events: int) -> list[list[dict[str, object]]]:
+    """Build one job's stream as the monitor delivers it: coalesced progress in small batches."""
+    progress = [
+        {
+            "type": "progress",
+            "phase": "downloading",
+            "detail": "Downloading",
+            "progress": (index + 1) * 100.0 / progress_events,
+            "progress_known": True,
+        }
+        for index in range(progress_events)
+    ]
+    return [
+        [{"type": "phase", "phase": "starting", "detail": "Using cached metadata"}],
+        [{"type": "phase", "phase": "searching", "detail": "Searching YouTube"}],
+        *(progress[offset:offset + PROGRESS_BATCH] for offset in range(0, len(progress), PROGRESS_BATCH)),
+        [{"type": "completed", "file_path": "/tmp/benchmark/song.mp3"}],
+    ]
+
+
+class _Recorder:
+    """Collects monitor start/finish times shared by every fake monitor of one run."""
+
+    def __init__(self, batches: list[list[dict[str, object]]]) -> None:
+        self.batches = batches
+        self.gate = threading.Event()
+        self.starts: list[float] = []
+        self.finishes: list[float] = []
+        self.lock = threading.Lock()
+
+    def factory(self, spec) -> "_SyntheticMonitor":
+        return _SyntheticMonitor(spec, self)
+
+
+class _SyntheticMonitor:
+    def __init__(self, spec, recorder: _Recorder) -> None:
+        self.spec = spec
+        self._recorder = recorder
+
+    def run(self, on_event, on_events=None) -> WorkerOutcome:
+        recorder = self._recorder
+        with recorder.lock:
+            recorder.starts.append(time.perf_counter())
+        recorder.gate.wait()
+        deliver = on_events or (lambda events: [on_event(event) for event in events])
+        for batch in recorder.batches:
+            deliver(batch)
+        with recorder.lock:
+            recorder.finishes.append(time.perf_counter())
+        return WorkerOutcome(success=True, file_path=f"/tmp/benchmark/{self.spec.job_id}.mp3")
+
+    def terminate(self, _reason=None) -> None:
+        self._recorder.gate.set()
+
+
+def _percentiles_ms(values: list[float]) -> tuple[float, float]:
+    if not values:
+        return 0.0, 0.0
+    ordered = sorted(values)
+
+    def rank(percentile: int) -> float:
+        return ordered[max(1, math.ceil(percentile / 100 * len(ordered))) - 1] * 1000.0
+
+    return rank(50), rank(99)
+
+
+def _wait_drained(supervisor: DownloadSupervisor, timeout: float = 600.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        load = supervisor.load_snapshot()
+        if not load["queued"] and not load["active"] and not load["retrying"]:
+            return
+        time.sleep(0.005)
+    raise TimeoutError("supervisor did not drain")
+
+
+def _supervisor(recorder: _Recorder, concurrency: int, max_queued: int) -> DownloadSupervisor:
+    return DownloadSupervisor(
+        _MetadataStub(),
+        concurrency_limit=concurrency,
+        monitor_factory=recorder.factory,
+        max_queued=max_queued,
+    )
+
+
+def bench_queue(jobs: int, concurrency: int, progress_events: int) -> dict[str, float]:
+    """Enqueue `jobs` behind closed monitors, then release them and time the drain.
+
+    Slot handoff latency is the gap between a monitor returning and the next queued job's
+    monitor starting, i.e. the supervisor's completion + dispatch path. Finishes and starts
+    are paired by order, so above a limit of 1 it is an approximation.
+    """
+    recorder = _Recorder(_event_batches(progress_events))
+    supervisor = _supervisor(recorder, concurrency, jobs)
+
+    started = time.perf_counter()
+    for index in range(jobs):
+        supervisor.start_download(_link(index), REQUEST)
+    enqueue_seconds = time.perf_counter() - started
+
+    released = time.perf_counter()
+    recorder.gate.set()
+    _wait_drained(supervisor)
+    drain_seconds = time.perf_counter() - released
+
+    finishes = sorted(recorder.finishes)
+    handoff_starts = sorted(recorder.starts)[concurrency:]
+    handoffs = [max(0.0, start - finish) for start, finish in zip(handoff_starts, finishes)]
+    handoff_p50, handoff_p99 = _percentiles_ms(handoffs)
+    events = jobs * sum(len(batch) for batch in recorder.batches)
+    return {
+        "enqueue_per_s": jobs / enqueue_seconds,
+        "drain_jobs_per_s": jobs / drain_seconds,
+        "events_per_s": events / drain_seconds,
+        "handoff_p50_ms": handoff_p50,
+        "handoff_p99_ms": handoff_p99,
+    }
+
+
+def bench_apply(rows: int, progress_events: int, repeats: int = 3) -> float:
+    """Return `JobStore.apply_worker_events` throughput with `rows` other jobs stored."""
+    store = JobStore()
+    for index in range(rows):
+        store.queue_job(_link(index), f"job-{index}")
+    batches = _event_batches(progress_events)[2:-1]
+    events = sum(len(batch) for batch in batches)
+    targets = [(_link(index), f"job-{index}") for index in range(0, rows, max(1, rows // 100))]
+
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for link, job_id in targets:
+            for batch in batches:
+                store.apply_worker_events(link, job_id, batch)
+        best = min(best, time.perf_counter() - started)
+    return events * len(targets) / best
+
+
+def bench_status(rows: int, poll_sizes: list[int], concurrency: int, samples: int) -> dict[int, tuple[float, float]]:
+    """Time `/status` through the Flask test client with `rows` jobs queued.
+
+    The UI polls every queued or downloading row, so a poll covers up to `rows` links.
+    """
+    recorder = _Recorder(_event_batches(1))
+    supervisor = _supervisor(recorder, concurrency, rows)
+    for index in range(rows):
+        supervisor.start_download(_link(index), REQUEST)
+    client = create_app(
+        metadata_service=_MetadataStub(),
+        download_service=supervisor,
+        active_settings_store=_SettingsStoreStub(),
+    ).test_client()
+
+    results: dict[int, tuple[float, float]] = {}
+    try:
+        for poll_size in poll_sizes:
+            size = min(rows, poll_size)
+            url = "/status?links=" + ",".join(_link(index) for index in range(rows - size, rows))
+            timings = []
+            for _ in range(samples):
+                started = time.perf_counter()
+                response = client.get(url)
+                timings.append(time.perf_counter() - started)
+                assert response.status_code == 200
+            results[size] = _percentiles_ms(timings)
+    finally:
+        recorder.gate.set()
+        _wait_drained(supervisor)
+    return results
+
+
+def _int_list(value: str) -> list[int]:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def _print_table(title: str, header: list[str], rows: list[list[str]]) -> None:
+    print(f"\n{title}")
+    widths = [max(len(cell) for cell in column) for column in zip(header, *rows)]
+    for row in (header, *rows):
+        print("  ".join(cell.rjust(width) for cell, width in zip(row, widths)))
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=_int_list, default=[10_000])
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 2, 8, 32])
+    parser.add_argument("--progress-events", type=int, default=40, help="progress events per job")
+    parser.add_argument("--status-polls", type=_int_list, default=[1, 100, 1000])
+    parser.add_argument("--status-samples", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    queue_rows = []
+    for jobs in args.jobs:
+        for concurrency in args.concurrency:
+            result = bench_queue(jobs, concurrency, args.progress_events)
+            queue_rows.append(
+                [
+                    f"{jobs:,}",
+                    str(concurrency),
+                    f"{result['enqueue_per_s']:,.0f}",
+                    f"{result['drain_jobs_per_s']:,.0f}",
+                    f"{result['events_per_s']:,.0f}",
+                    f"{result['handoff_p50_ms']:.3f}",
+                    f"{result['handoff_p99_ms']:.3f}",
+                ]
+            )
+    _print_table(
+        "Queue: enqueue, drain and completion-to-dispatch handoff",
+        ["jobs", "limit", "enqueue/s", "drain jobs/s", "events/s", "handoff p50 ms", "handoff p99 ms"],
+        queue_rows,
+    )
+
+    _print_table(
+        "JobStore.apply_worker_events with N stored rows",
+        ["rows", "events/s"],
+        [[f"{rows:,}", f"{bench_apply(rows, args.progress_events):,.0f}"] for rows in args.jobs],
+    )
+
+    status_rows = []
+    for rows in args.jobs:
+        for size, (p50, p99) in bench_status(rows, args.status_polls, args.concurrency[0], args.status_samples).items():
+            status_rows.append([f"{rows:,}", f"{size:,}", f"{p50:.2f}", f"{p99:.2f}"])
+    _print_table("/status via the Flask test client", ["rows", "links polled", "p50 ms", "p99 ms"], status_rows)
+
+
+if __name__ == "__main__":
+    main()
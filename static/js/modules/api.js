@@ -13,6 +13,50 @@ async function parseJsonResponse(response, fallbackMessage) {
     return payload;
 }
 
+const METADATA_POLL_MIN_MS = 250;
+const METADATA_POLL_MAX_MS = 2000;
+const OVERLOAD_BACKOFF_MIN_MS = 500;
+const OVERLOAD_BACKOFF_MAX_MS = 30000;
+const OVERLOAD_MAX_ATTEMPTS = 8;
+
+function delay(ms, signal) {
+    return new Promise((resolve, reject) => {
+        if (signal?.aborted) {
+            reject(signal.reason);
+            return;
+        }
+        const timer = setTimeout(resolve, ms);
+        signal?.addEventListener('abort', () => {
+            clearTimeout(timer);
+            reject(signal.reason);
+        }, { once: true });
+    });
+}
+
+function overloadDelayMs(response, attempt) {
+    const retryAfterMs = Number(response.headers.get('Retry-After')) * 1000 || 0;
+    const backoffMs = Math.min(OVERLOAD_BACKOFF_MIN_MS * 2 ** attempt, OVERLOAD_BACKOFF_MAX_MS);
+    const waitMs = Math.max(retryAfterMs, backoffMs);
+    // Jitter so a burst of rows shed together does not come back together.
+    return waitMs + Math.random() * waitMs * 0.25;
+}
+
+async function postJson(url, body, { signal } = {}) {
+    // The server answers 429 with Retry-After when it is shedding load; wait and resend.
+    for (let attempt = 1; ; attempt += 1) {
+        const response = await fetch(url, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(body),
+            signal
+        });
+        if (response.status !== 429 || attempt >= OVERLOAD_MAX_ATTEMPTS) {
+            return response;
+        }
+        await delay(overloadDelayMs(response, attempt - 1), signal);
+    }
+}
+
 export async function fetchSettings() {
     const response = await fetch('/settings');
     return parseJsonResponse(response, 'Failed to load saved settings.');
@@ -27,21 +71,36 @@ export async function pickDownloadDirectoryRequest(source = 'settings') {
     return parseJsonResponse(response, 'Could not choose a download folder.');
 }
 
-export async function fetchMetadata(link) {
-    const response = await fetch('/meta', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ link })
-    });
-    return parseJsonResponse(response, 'Failed to load track metadata');
+export async function fetchMetadata(link, { signal } = {}) {
+    // The server answers 202 with a lookup id on a cache miss; poll it instead of
+    // holding a request open for the whole lookup.
+    let response = await postJson('/meta', { link, async: true }, { signal });
+    if (response.status !== 202) {
+        return parseJsonResponse(response, 'Failed to load track metadata');
+    }
+
+    const { id } = await response.json();
+    const lookupUrl = `/meta/${encodeURIComponent(id)}`;
+    let pollDelay = METADATA_POLL_MIN_MS;
+    try {
+        for (;;) {
+            await delay(pollDelay, signal);
+            response = await fetch(lookupUrl, { signal });
+            if (response.status !== 202) {
+                return parseJsonResponse(response, 'Failed to load track metadata');
+            }
+            pollDelay = Math.min(pollDelay * 1.5, METADATA_POLL_MAX_MS);
+        }
+    } catch (error) {
+        if (signal?.aborted) {
+            fetch(lookupUrl, { method: 'DELETE', keepalive: true }).catch(() => { });
+        }
+        throw error;
+    }
 }
 
 export async function startDownloadRequest(link, settings, options = {}) {
-    const response = await fetch('/download', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ link, ...settings, ...options })
-    });
+    const response = await postJson('/download', { link, ...settings, ...options });
 
     if (response.ok) {
         return {};
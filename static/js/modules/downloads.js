@@ -94,6 +94,21 @@ export function showInFinder(link) {
         });
 }
 
+function describeEstimate(data) {
+    // Seconds from now until an epoch timestamp in the status payload, as a rough phrase.
+    const untilText = (at) => {
+        const seconds = Math.max(0, at - Date.now() / 1000);
+        return seconds < 90 ? `${Math.ceil(seconds)}s` : `${Math.round(seconds / 60)} min`;
+    };
+    if (data.queue_position && data.estimated_start_at) {
+        return `#${data.queue_position} in queue, starts in about ${untilText(data.estimated_start_at)}`;
+    }
+    if (data.estimated_completion_at) {
+        return `Done in about ${untilText(data.estimated_completion_at)}`;
+    }
+    return '';
+}
+
 export function startStatusPolling() {
     setInterval(() => {
         const links = Object.keys(state.rows).filter(link => {
@@ -130,11 +145,15 @@ export function startStatusPolling() {
                     showToast(data.error_message, 'error', 7000);
                 }
 
+                const statusCell = state.rows[link].querySelector('.status-cell');
+                if (statusCell) {
+                    statusCell.title = describeEstimate(data);
+                }
+
                 if (data.status === 'downloading') {
                     const progressKnown = Boolean(data.progress_known);
                     let progressBar = state.rows[link].querySelector('.progress-bar');
                     if (!progressBar) {
-                        const statusCell = state.rows[link].querySelector('.status-cell');
                         progressBar = addProgressBar(statusCell, data.progress, !progressKnown, data.detail || '');
                     }
                     updateProgressBar(progressBar, data.progress, !progressKnown, data.detail || '');
@@ -13,6 +13,11 @@ export function normalizeInputLink(rawLink) {
             if (trackIndex >= 0 && trackId) {
                 return `${url.protocol}//${url.hostname}/track/${trackId}`;
             }
+            const listIndex = parts.findIndex(part => ['playlist', 'album'].includes(part.toLowerCase()));
+            const listId = parts[listIndex + 1];
+            if (listIndex >= 0 && listId) {
+                return `${url.protocol}//${url.hostname}/${parts[listIndex].toLowerCase()}/${listId}`;
+            }
         }
 
         return url.toString();
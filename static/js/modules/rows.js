@@ -26,6 +26,7 @@ let rowActions = {
 const METADATA_FETCH_CONCURRENCY = 2;
 let activeMetadataFetches = 0;
 const pendingMetadataFetches = [];
+const metadataFetchControllers = new Map();
 
 export function setRowActionHandlers(actions) {
     rowActions = { ...rowActions, ...actions };
@@ -68,10 +69,15 @@ function drainMetadataQueue() {
         }
 
         activeMetadataFetches += 1;
-        fetchMetadata(job.link)
+        const controller = new AbortController();
+        metadataFetchControllers.set(job.link, controller);
+        fetchMetadata(job.link, { signal: controller.signal })
             .then(job.resolve)
             .catch(job.reject)
             .finally(() => {
+                if (metadataFetchControllers.get(job.link) === controller) {
+                    metadataFetchControllers.delete(job.link);
+                }
                 activeMetadataFetches -= 1;
                 drainMetadataQueue();
             });
@@ -85,6 +91,14 @@ function enqueueMetadataFetch(link) {
     });
 }
 
+function cancelMetadataFetch(link) {
+    const controller = metadataFetchControllers.get(link);
+    if (controller) {
+        metadataFetchControllers.delete(link);
+        controller.abort();
+    }
+}
+
 function createStatusElement(status) {
     const statusContainer = document.createElement('div');
     statusContainer.className = `status ${status}`;
@@ -117,6 +131,8 @@ function createRowElement(link, data) {
     const coverImg = document.createElement('img');
     coverImg.className = 'cover-image';
     coverImg.alt = 'Cover';
+    coverImg.loading = 'lazy';
+    coverImg.decoding = 'async';
     coverImg.addEventListener('error', () => {
         coverImg.src = DEFAULT_COVER_DATA_URI;
     });
@@ -280,6 +296,7 @@ export function rmRow(link) {
 
     const row = state.rows[link];
     const trackTitle = row.querySelector('.title-cell').textContent;
+    cancelMetadataFetch(link);
 
     row.style.transition = 'all 0.25s ease';
     row.style.opacity = '0';
@@ -362,8 +379,8 @@ export function addRow(link) {
             showToast(`Added: ${normalizedMetadata.title || 'Unknown track'}`, 'success', 3000);
         })
         .catch(error => {
-            console.error('Error fetching metadata:', error);
             if (!state.rows[link]) return;
+            console.error('Error fetching metadata:', error);
 
             updateRowData(link, {
                 cover: '',
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import threading
+import tracemalloc
+import unittest
+
+from app.diagnostics import MemoryTracker, thread_counts
+
+
+class ThreadCountTests(unittest.TestCase):
+    def test_threads_are_grouped_by_supervisor_prefix(self) -> None:
+        release = threading.Event()
+        threads = [
+            threading.Thread(target=release.wait, name=name, daemon=True)
+            for name in ("download-aaaa", "download-bbbb", "worker-stdout-aaaa")
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            counts = thread_counts()
+        finally:
+            release.set()
+            for thread in threads:
+                thread.join()
+
+        self.assertGreaterEqual(counts["by_prefix"]["download-"], 2)
+        self.assertGreaterEqual(counts["by_prefix"]["worker-stdout-"], 1)
+        self.assertIn("MainThread", counts["other"])
+        self.assertGreaterEqual(counts["total"], 4)
+
+
+class MemoryTrackerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.was_tracing = tracemalloc.is_tracing()
+
+    def tearDown(self) -> None:
+        if not self.was_tracing:
+            tracemalloc.stop()
+
+    def test_report_is_empty_until_tracing_starts(self) -> None:
+        if self.was_tracing:
+            self.skipTest("tracemalloc is already enabled for this interpreter")
+        self.assertEqual(MemoryTracker().report(), {"tracing": False})
+
+    def test_report_diffs_against_the_requested_snapshot(self) -> None:
+        tracker = MemoryTracker()
+        tracker.start()
+
+        baseline = tracker.snapshot()
+        first = tracker.report(limit=5)
+        retained = [bytearray(1024) for _ in range(200)]
+        second = tracker.report(limit=5, since=baseline)
+        # Reading a report leaves the baseline in place for the next reader.
+        third = tracker.report(limit=5, since=baseline)
+
+        self.assertTrue(first["tracing"])
+        self.assertIsNone(first["diff"])
+        self.assertTrue(second["top"])
+        for report in (second, third):
+            self.assertGreater(max(stat["size_diff_bytes"] for stat in report["diff"]), 100_000)
+            self.assertTrue(any(__file__ in stat["location"] for stat in report["diff"]))
+        del retained
+
+    def test_oldest_snapshots_expire(self) -> None:
+        tracker = MemoryTracker(max_snapshots=1)
+        tracker.start()
+
+        first = tracker.snapshot()
+        tracker.snapshot()
+
+        with self.assertRaises(KeyError):
+            tracker.report(since=first)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import time
+import tracemalloc
 import unittest
 from pathlib import Path
 
+from app.backend.admission import ClientRateLimiter
+from app.backend.jobs import DownloadQueueFull
 from app.backend.metadata import MetadataError
 from app.web import create_app
 
@@ -27,25 +31,35 @@ class _SettingsStoreStub:
 
 
 class _MetadataStub:
-    def get_metadata(self, link: str):
+    metadata_concurrency = 2
+
+    def peek_metadata(self, _link: str):
+        return None
+
+    def get_metadata(self, link: str, *, cancel_event=None):
         if link.endswith("bad"):
             raise MetadataError("bad metadata", status_code=502)
         return {
             "title": "Song",
             "artist": "Artist",
             "album": "Album",
-            "cover": "",
+            "cover": "https://i.scdn.co/image/cover" if link.endswith("cover") else "",
         }
 
     def get_cached_song_payload(self, _link: str):
         return None
 
+    def cache_sizes(self):
+        return {"metadata_cache": 3, "extraction_cache": 1}
+
 
 class _DownloadStub:
     def __init__(self) -> None:
         self.started = []
 
     def start_download(self, link, request) -> None:
+        if link.endswith("full"):
+            raise DownloadQueueFull("1000 downloads are already queued.", retry_after=7)
         self.started.append((link, request))
 
     def get_status(self, links):
@@ -64,10 +78,31 @@ class _DownloadStub:
     def cancel_download(self, _link):
         return True
 
+    def phase_percentiles(self):
+        return {"completed": {"resolving": {"count": 3, "p50": 1.5, "p90": 2.0, "p99": 2.0}}, "failed": {}}
+
+    def load_snapshot(self):
+        return {"queued": 4, "active": 2, "retrying": 1, "concurrency_limit": 2}
+
+    def heaviest_jobs(self, limit):
+        run = {"link": "https://open.spotify.com/track/slow", "job_id": "j1", "outcome": "completed"}
+        return {"runs": 1, "cpu": [{**run, "cpu_seconds": 42.0}][:limit], "peak_rss": []}
+
+    def container_sizes(self):
+        return {"queue": 4, "active": 2, "retrying": 1, "jobs": 9}
+
     def reveal_downloaded_file(self, _link):
         return Path("/tmp/music/song.mp3")
 
 
+class _CoverCacheStub:
+    def proxy_url(self, url):
+        return "/cover/abc" if url else ""
+
+    def thumbnail(self, key, _size=None):
+        raise FileNotFoundError(key)
+
+
 class AppRouteTests(unittest.TestCase):
     def test_download_route_accepts_current_frontend_shape(self) -> None:
         metadata = _MetadataStub()
@@ -101,6 +136,104 @@ class AppRouteTests(unittest.TestCase):
             "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
         )
 
+    def test_phase_stats_route_returns_percentiles(self) -> None:
+        app = create_app(
+            metadata_service=_MetadataStub(),
+            download_service=_DownloadStub(),
+            active_settings_store=_SettingsStoreStub(),
+        )
+
+        response = app.test_client().get("/stats/phases")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["completed"]["resolving"]["p50"], 1.5)
+
+    def test_resource_stats_route_returns_the_heaviest_jobs(self) -> None:
+        app = create_app(
+            metadata_service=_MetadataStub(),
+            download_service=_DownloadStub(),
+            active_settings_store=_SettingsStoreStub(),
+        )
+        client = app.test_client()
+
+        response = client.get("/stats/resources?limit=3")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["cpu"][0]["cpu_seconds"], 42.0)
+        self.assertEqual(client.get("/stats/resources?limit=many").status_code, 400)
+
+    def test_metrics_route_renders_prometheus_text(self) -> None:
+        app = create_app(
+            metadata_service=_MetadataStub(),
+            download_service=_DownloadStub(),
+            active_settings_store=_SettingsStoreStub(),
+        )
+
+        response = app.test_client().get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.mimetype.startswith("text/plain"))
+        body = response.get_data(as_text=True)
+        self.assertIn("spotdl_queue_depth 4", body)
+        self.assertIn("spotdl_active_workers 2", body)
+        self.assertIn("spotdl_retrying_jobs 1", body)
+        self.assertIn("spotdl_concurrency_limit 2", body)
+        self.assertIn("# TYPE spotdl_job_phase_seconds histogram", body)
+        self.assertIn("# TYPE spotdl_worker_timeouts_total counter", body)
+
+    def test_debug_profile_route_returns_folded_stacks(self) -> None:
+        app = create_app(
+            metadata_service=_MetadataStub(),
+            download_service=_DownloadStub(),
+            active_settings_store=_SettingsStoreStub(),
+        )
+        client = app.test_client()
+
+        response = client.get("/debug/profile?seconds=0.05&interval=0.005")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("MainThread;", response.get_data(as_text=True))
+        self.assertEqual(client.get("/debug/profile?seconds=soon").status_code, 400)
+
+    def test_debug_memory_route_reports_threads_and_sizes(self) -> None:
+        app = create_app(
+            metadata_service=_MetadataStub(),
+            download_service=_DownloadStub(),
+            active_settings_store=_SettingsStoreStub(),
+        )
+
+        response = app.test_client().get("/debug/memory")
+        self.assertEqual(response.status_code, 200)
+        payload = response.get_json()
+        self.assertIn("download-", payload["threads"]["by_prefix"])
+        self.assertEqual(
+            payload["sizes"],
+            {"queue": 4, "active": 2, "retrying": 1, "jobs": 9, "metadata_cache": 3, "extraction_cache": 1},
+        )
+        self.assertIn("tracing", payload["tracemalloc"])
+
+    def test_debug_memory_tracing_is_toggled_and_diffed_through_post(self) -> None:
+        app = create_app(
+            metadata_service=_MetadataStub(),
+            download_service=_DownloadStub(),
+            active_settings_store=_SettingsStoreStub(),
+        )
+        client = app.test_client()
+        self.addCleanup(client.post, "/debug/memory/tracemalloc", json={"action": "stop"})
+
+        was_tracing = tracemalloc.is_tracing()
+        self.assertEqual(client.get("/debug/memory?tracemalloc=start").status_code, 200)
+        self.assertEqual(tracemalloc.is_tracing(), was_tracing)
+        self.assertEqual(client.post("/debug/memory/tracemalloc", json={"action": "pause"}).status_code, 400)
+        response = client.post("/debug/memory/tracemalloc", json={"action": "start"})
+        self.assertEqual(response.get_json(), {"tracing": True})
+        response = client.post("/debug/memory/snapshots")
+        self.assertEqual(response.status_code, 201)
+        snapshot_id = response.get_json()["snapshot_id"]
+
+        for _ in range(2):
+            report = client.get(f"/debug/memory?since={snapshot_id}").get_json()["tracemalloc"]
+            self.assertEqual(report["since"], snapshot_id)
+            self.assertIsNotNone(report["diff"])
+        self.assertEqual(client.get("/debug/memory?since=999999").status_code, 404)
+        self.assertEqual(client.get("/debug/memory?since=soon").status_code, 400)
+
     def test_status_route_returns_detail_and_phase(self) -> None:
         app = create_app(
             metadata_service=_MetadataStub(),
@@ -115,6 +248,76 @@ class AppRouteTests(unittest.TestCase):
         self.assertEqual(payload["https://open.spotify.com/track/123"]["phase"], "queued")
         self.assertEqual(payload["https://open.spotify.com/track/123"]["detail"], "Queued")
 
+    def test_meta_route_proxies_cover_art(self) -> None:
+        app = create_app(
+            metadata_service=_MetadataStub(),
+            download_service=_DownloadStub(),
+            active_settings_store=_SettingsStoreStub(),
+            cover_cache=_CoverCacheStub(),
+        )
+        client = app.test_client()
+
+        response = client.post("/meta", json={"link": "https://open.spotify.com/track/cover"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["cover"], "/cover/abc")
+        self.assertEqual(client.get("/cover/missing").status_code, 404)
+
+    def test_async_meta_route_returns_a_lookup_to_poll(self) -> None:
+        app = create_app(
+            metadata_service=_MetadataStub(),
+            download_service=_DownloadStub(),
+            active_settings_store=_SettingsStoreStub(),
+            cover_cache=_CoverCacheStub(),
+        )
+        client = app.test_client()
+
+        response = client.post("/meta", json={"link": "https://open.spotify.com/track/cover", "async": True})
+        self.assertEqual(response.status_code, 202)
+        lookup_id = response.get_json()["id"]
+        self.assertEqual(response.headers["Location"], f"/meta/{lookup_id}")
+
+        deadline = time.monotonic() + 2.0
+        while response.status_code == 202 and time.monotonic() < deadline:
+            time.sleep(0.01)
+            response = client.get(f"/meta/{lookup_id}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["title"], "Song")
+        self.assertEqual(response.get_json()["cover"], "/cover/abc")
+
+        failed = client.post("/meta", json={"link": "https://open.spotify.com/track/bad", "async": True})
+        failed_id = failed.get_json()["id"]
+        deadline = time.monotonic() + 2.0
+        while failed.status_code == 202 and time.monotonic() < deadline:
+            time.sleep(0.01)
+            failed = client.get(f"/meta/{failed_id}")
+        self.assertEqual(failed.status_code, 502)
+        self.assertEqual(failed.get_json()["error"], "bad metadata")
+
+        self.assertEqual(client.delete(f"/meta/{lookup_id}").status_code, 204)
+        self.assertEqual(client.get("/meta/unknown").status_code, 404)
+        self.assertEqual(client.delete("/meta/unknown").status_code, 404)
+
+    def test_overloaded_requests_get_429_with_retry_after(self) -> None:
+        app = create_app(
+            metadata_service=_MetadataStub(),
+            download_service=_DownloadStub(),
+            active_settings_store=_SettingsStoreStub(),
+            client_limiter=ClientRateLimiter(rate=0.5, burst=2),
+        )
+        client = app.test_client()
+
+        full = client.post("/download", json={"link": "https://open.spotify.com/track/full"})
+        self.assertEqual(full.status_code, 429)
+        self.assertEqual(full.headers["Retry-After"], "7")
+        self.assertEqual(full.get_json()["code"], "download_queue_full")
+
+        self.assertEqual(client.post("/meta", json={"link": "https://open.spotify.com/track/1"}).status_code, 200)
+        limited = client.post("/download", json={"link": "https://open.spotify.com/track/2"})
+        self.assertEqual(limited.status_code, 429)
+        self.assertEqual(limited.headers["Retry-After"], "2")
+        self.assertEqual(limited.get_json()["code"], "rate_limited")
+        self.assertIn('spotdl_requests_rejected_total{code="rate_limited"}', client.get("/metrics").get_data(as_text=True))
+
 
 if __name__ == "__main__":
     unittest.main()
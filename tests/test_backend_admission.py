@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import threading
+import time
+import unittest
+
+from app.backend.admission import ClientRateLimiter, RateLimited, retry_after_for
+from app.backend.metadata import MetadataBusy, MetadataError, MetadataService
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class ClientRateLimiterTests(unittest.TestCase):
+    def test_burst_is_admitted_then_refilled_at_the_rate(self) -> None:
+        clock = _Clock()
+        limiter = ClientRateLimiter(rate=2.0, burst=3, clock=clock)
+        for _ in range(3):
+            limiter.acquire("10.0.0.1")
+
+        with self.assertRaises(RateLimited) as raised:
+            limiter.acquire("10.0.0.1")
+        self.assertEqual(raised.exception.retry_after, 1)
+        self.assertEqual(raised.exception.code, "rate_limited")
+
+        limiter.acquire("10.0.0.2")
+        clock.now += 0.5
+        limiter.acquire("10.0.0.1")
+
+    def test_zero_rate_disables_the_limit(self) -> None:
+        limiter = ClientRateLimiter(rate=0, burst=1)
+        for _ in range(10):
+            limiter.acquire("10.0.0.1")
+
+    def test_idle_clients_are_forgotten_beyond_the_cap(self) -> None:
+        limiter = ClientRateLimiter(rate=1.0, burst=1, max_clients=2, clock=_Clock())
+        for client in ("a", "b", "c"):
+            limiter.acquire(client)
+        # "a" was evicted, so it starts again with a full bucket.
+        limiter.acquire("a")
+        with self.assertRaises(RateLimited):
+            limiter.acquire("c")
+
+    def test_retry_after_is_whole_seconds_within_bounds(self) -> None:
+        self.assertEqual(retry_after_for(0.0), 1)
+        self.assertEqual(retry_after_for(2.1), 3)
+        self.assertEqual(retry_after_for(10_000), 60)
+
+
+class MetadataAdmissionTests(unittest.TestCase):
+    def test_lookups_waiting_for_a_worker_slot_are_bounded(self) -> None:
+        service = MetadataService(metadata_concurrency=1, max_pending=2)
+        gate = threading.Event()
+        service._run_worker = lambda _request, _cancel_event: (gate.wait(2.0), ("", ""))[1]  # noqa: SLF001
+
+        def lookup(link: str) -> None:
+            with self.assertRaises(MetadataError):  # the stubbed worker returns no data
+                service.get_metadata(link)
+
+        workers = [
+            threading.Thread(target=lookup, args=(f"https://open.spotify.com/track/t{index}",))
+            for index in range(2)
+        ]
+        for worker in workers:
+            worker.start()
+        deadline = time.monotonic() + 2.0
+        while service._pending < 2 and time.monotonic() < deadline:  # noqa: SLF001
+            time.sleep(0.01)
+
+        with self.assertRaises(MetadataBusy) as raised:
+            service.get_metadata("https://open.spotify.com/track/t2")
+        self.assertEqual(raised.exception.code, "metadata_busy")
+        self.assertEqual(raised.exception.retry_after, 2)
+
+        gate.set()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(service._pending, 0)  # noqa: SLF001
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from io import BytesIO
+from pathlib import Path
+from unittest.mock import patch
+
+from PIL import Image
+
+from app.backend.covers import CoverCache, cover_key
+
+COVER_URL = "https://i.scdn.co/image/cover-1"
+
+
+def _png_bytes(side: int = 640) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (side, side), color=(200, 40, 40)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class CoverCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._temp_dir.cleanup)
+        self.cache = CoverCache(Path(self._temp_dir.name))
+
+    def test_proxy_url_only_rewrites_remote_covers(self) -> None:
+        self.assertEqual(self.cache.proxy_url(COVER_URL), f"/cover/{cover_key(COVER_URL)}")
+        self.assertEqual(self.cache.proxy_url(""), "")
+        self.assertEqual(self.cache.proxy_url("data:image/png;base64,xx"), "data:image/png;base64,xx")
+
+    def test_thumbnail_fetches_once_and_resizes(self) -> None:
+        key = self.cache.proxy_url(COVER_URL).rsplit("/", 1)[-1]
+        with patch.object(CoverCache, "_fetch", return_value=_png_bytes()) as fetch:
+            thumb, mimetype = self.cache.thumbnail(key, 200)
+            self.cache.thumbnail(key, 200)
+
+        self.assertEqual(fetch.call_count, 1)
+        self.assertEqual(mimetype, "image/jpeg")
+        with Image.open(thumb) as image:
+            self.assertEqual(image.size, (256, 256))
+        self.assertEqual(self.cache.cached_original(COVER_URL), self.cache.original(key))
+
+    def test_unknown_key_raises_file_not_found(self) -> None:
+        with self.assertRaises(FileNotFoundError):
+            self.cache.thumbnail("0" * 32)
+        with self.assertRaises(FileNotFoundError):
+            self.cache.thumbnail("../settings")
+        self.assertIsNone(self.cache.cached_original(COVER_URL))
+
+    def test_eviction_drops_least_recently_used_images(self) -> None:
+        payload = _png_bytes(64)
+        cache = CoverCache(Path(self._temp_dir.name), max_bytes=len(payload) * 2)
+        keys = []
+        for index in range(3):
+            url = f"{COVER_URL}-{index}"
+            keys.append(cache.proxy_url(url).rsplit("/", 1)[-1])
+            data = payload + bytes([index])
+            with patch.object(CoverCache, "_fetch", return_value=data):
+                original = cache.original(keys[-1])
+            os.utime(original, (index, index))
+
+        self.assertIsNone(cache.cached_original(f"{COVER_URL}-0"))
+        self.assertIsNotNone(cache.cached_original(f"{COVER_URL}-2"))
+
+
+if __name__ == "__main__":
+    unittest.main()
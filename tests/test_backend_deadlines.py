@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import json
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from app.backend.deadlines import HARD_TIMEOUT_BASE, JobDeadlines, track_duration
+from app.backend.jobs import DownloadSupervisor
+from app.backend.metadata import MetadataService
+from app.backend.metadata_worker import _spotify_track_metadata
+from app.backend.protocol import DownloadJobSpec
+from app.backend.settings import DownloadRequest
+from app.backend.workers import WorkerOutcome
+
+
+def _spec(format_name: str = "mp3", song_payload=None, extraction=None) -> DownloadJobSpec:
+    return DownloadJobSpec(
+        job_id="deadlines",
+        link="https://open.spotify.com/track/abc",
+        download_directory="/tmp/music",
+        format=format_name,
+        bitrate="auto",
+        song_payload=song_payload,
+        extraction=extraction,
+    )
+
+
+class JobDeadlineTests(unittest.TestCase):
+    def test_unknown_length_keeps_the_configured_timeouts(self) -> None:
+        deadlines = JobDeadlines.for_job(_spec(), idle_timeout=60, hard_timeout=900, heartbeat_interval=5)
+
+        self.assertEqual(deadlines.hard_timeout, 900)
+        self.assertEqual(deadlines.idle_budget("downloading"), 60)
+        self.assertEqual(deadlines.idle_budget("postprocessing"), 60)
+        self.assertEqual(deadlines.idle_budget("resolving"), 30)
+        self.assertEqual(deadlines.heartbeat_timeout, 15)
+
+    def test_phase_budgets_never_exceed_the_idle_timeout(self) -> None:
+        deadlines = JobDeadlines.for_job(_spec(), idle_timeout=3, hard_timeout=30)
+
+        self.assertEqual(deadlines.idle_budget("starting"), 3)
+        self.assertEqual(deadlines.idle_budget("resolving"), 3)
+        self.assertEqual(deadlines.idle_budget("searching"), 3)
+
+    def test_long_lossless_tracks_get_longer_conversion_and_hard_budgets(self) -> None:
+        single = JobDeadlines.for_job(_spec("mp3", {"duration": 180}), idle_timeout=60, hard_timeout=900)
+        mix = JobDeadlines.for_job(_spec("flac", {"duration": 3600}), idle_timeout=60, hard_timeout=900)
+
+        self.assertEqual(single.hard_timeout, HARD_TIMEOUT_BASE + 180)
+        self.assertEqual(single.idle_budget("postprocessing"), 60)
+        self.assertEqual(mix.hard_timeout, HARD_TIMEOUT_BASE + 7200)
+        self.assertEqual(mix.idle_budget("postprocessing"), 1800)
+        self.assertEqual(mix.idle_budget("downloading"), 60)
+
+    def test_disabled_hard_timeout_stays_disabled(self) -> None:
+        deadlines = JobDeadlines.for_job(_spec("mp3", {"duration": 180}), idle_timeout=60, hard_timeout=0)
+
+        self.assertEqual(deadlines.hard_timeout, 0)
+
+    def test_duration_falls_back_to_the_cached_extraction(self) -> None:
+        self.assertEqual(track_duration(_spec(extraction={"duration": 42})), 42.0)
+        self.assertIsNone(track_duration(_spec(song_payload={"duration": "?"})))
+
+
+
+class _SpecRecorder:
+    def __init__(self, spec, specs: list) -> None:
+        specs.append(spec)
+
+    def run(self, on_event, on_events=None):
+        return WorkerOutcome(success=True, file_path="/tmp/music/mix.flac")
+
+    def terminate(self, _reason=None) -> None:
+        pass
+
+
+class FastMetadataDurationTests(unittest.TestCase):
+    LINK = "https://open.spotify.com/track/longmix"
+
+    def test_fast_lookup_reports_the_track_length(self) -> None:
+        track = {"id": "longmix", "name": "Mix", "duration_ms": 3_600_000, "artists": [], "album": {}}
+        with patch("spotdl.utils.spotify.SpotifyClient") as client:
+            client.return_value.track.return_value = track
+            metadata, duration = _spotify_track_metadata(self.LINK)
+
+        self.assertEqual(metadata["title"], "Mix")
+        self.assertEqual(duration, 3600.0)
+
+    def test_fast_mode_spotify_job_gets_duration_scaled_deadlines(self) -> None:
+        service = MetadataService(metadata_mode="fast")
+        reply = {"ok": True, "metadata": {"title": "Mix"}, "song_payload": None, "extraction": None, "duration": 3600.0}
+        service._run_worker = lambda _request, _cancel_event: (json.dumps(reply), "")  # noqa: SLF001
+        service.get_metadata(self.LINK)
+        self.assertIsNone(service.get_cached_song_payload(self.LINK))
+
+        specs: list = []
+        supervisor = DownloadSupervisor(service, monitor_factory=lambda spec: _SpecRecorder(spec, specs))
+        request = DownloadRequest(download_directory=Path("/tmp/music"), quality="best", format="flac", bitrate="auto")
+        supervisor.start_download(self.LINK, request)
+
+        (spec,) = specs
+        self.assertEqual(track_duration(spec), 3600.0)
+        deadlines = JobDeadlines.for_job(spec, idle_timeout=60, hard_timeout=900)
+        self.assertEqual(deadlines.hard_timeout, HARD_TIMEOUT_BASE + 7200)
+        self.assertEqual(deadlines.idle_budget("postprocessing"), 1800)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,19 @@
 from __future__ import annotations
 
 import unittest
+from pathlib import Path
 from unittest.mock import patch
 
 from spotdl.types.song import Song
 
-from app.backend.download_worker import _apply_source_override, _resolve_download_url
+from app.backend.download_worker import (
+    _apply_source_override,
+    _detail_to_phase,
+    _download,
+    _PhaseClock,
+    _ProgressCoalescer,
+    _resolve_download_url,
+)
 from app.backend.inputs import UnsupportedInputError
 
 
@@ -113,5 +121,89 @@ class DownloadWorkerSearchTests(unittest.TestCase):
             )
 
 
+class ProgressCoalescerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.now = 0.0
+        self.coalescer = _ProgressCoalescer(min_interval=0.5, min_delta=2.0, clock=lambda: self.now)
+
+    @staticmethod
+    def _progress(detail: str, value: float) -> dict[str, object]:
+        return {"type": "progress", "detail": detail, "progress": value, "progress_known": True}
+
+    def test_small_or_early_updates_are_held_back(self) -> None:
+        self.assertEqual(len(self.coalescer.offer(self._progress("Downloading", 1.0))), 1)
+        self.now = 0.1
+        self.assertEqual(self.coalescer.offer(self._progress("Downloading", 9.0)), [])
+        self.now = 0.7
+        self.assertEqual(self.coalescer.offer(self._progress("Downloading", 9.5)), [self._progress("Downloading", 9.5)])
+        self.now = 1.5
+        self.assertEqual(self.coalescer.offer(self._progress("Downloading", 10.0)), [])
+
+    def test_final_value_and_detail_change_are_never_dropped(self) -> None:
+        self.coalescer.offer(self._progress("Downloading", 1.0))
+        self.assertEqual(self.coalescer.offer(self._progress("Downloading", 2.0)), [])
+        self.assertEqual(
+            self.coalescer.offer(self._progress("Converting", 0.0)),
+            [self._progress("Downloading", 2.0), self._progress("Converting", 0.0)],
+        )
+        self.assertEqual(len(self.coalescer.offer(self._progress("Converting", 100.0))), 1)
+
+    def test_pending_value_is_flushed_before_other_events(self) -> None:
+        self.coalescer.offer(self._progress("Downloading", 1.0))
+        self.coalescer.offer(self._progress("Downloading", 1.5))
+        self.assertEqual(self.coalescer.take_pending(), self._progress("Downloading", 1.5))
+        self.assertIsNone(self.coalescer.take_pending())
+
+
+class _FakeDownloader:
+    errors: list[str] = []
+
+    def download_song(self, song):
+        return song, Path("/tmp/music/song.mp3")
+
+
+class DownloadPhaseTests(unittest.TestCase):
+    def test_provider_search_is_its_own_phase(self) -> None:
+        events: list[dict] = []
+        song = Song.from_dict(_song_payload())
+        with (
+            patch("app.backend.download_worker._emit", events.append),
+            patch("app.backend.download_worker._build_song", return_value=(song, None)),
+            patch("app.backend.download_worker._reuse_cached_cover"),
+            patch(
+                "app.backend.download_worker._resolve_download_url",
+                return_value=("https://www.youtube.com/watch?v=dQw4w9WgXcQ", "query"),
+            ),
+            patch("app.backend.download_worker._build_downloader", return_value=_FakeDownloader()),
+            patch("app.backend.download_worker._finalize_output_path", side_effect=lambda _song, path, _expected: path),
+        ):
+            _download({"link": song.url, "download_directory": "/tmp/music", "audio_providers": ["youtube"]})
+
+        self.assertEqual(
+            [(event["phase"], event["detail"]) for event in events if event["type"] == "phase"],
+            [("searching", "Searching YouTube"), ("searching", "Matched YouTube")],
+        )
+        self.assertEqual(events[-1], {"type": "completed", "file_path": "/tmp/music/song.mp3"})
+
+    def test_spotdl_progress_details_map_to_phases(self) -> None:
+        self.assertEqual(_detail_to_phase("Searching"), "searching")
+        self.assertEqual(_detail_to_phase("Processing"), "downloading")
+        self.assertEqual(_detail_to_phase("Converting"), "postprocessing")
+
+
+class PhaseClockTests(unittest.TestCase):
+    def test_time_accumulates_per_phase_including_the_current_one(self) -> None:
+        now = [10.0]
+        clock = _PhaseClock(clock=lambda: now[0])
+        clock.enter("starting")
+        now[0] = 10.5
+        clock.enter("resolving")
+        now[0] = 12.0
+        clock.enter("starting")
+        now[0] = 12.25
+
+        self.assertEqual(clock.seconds(), {"starting": 0.75, "resolving": 1.5})
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from app.backend.framing import FrameDecoder, FrameEncoder, FrameError, ProgressRecord
+from app.backend.protocol import DownloadJobSpec
+from app.backend.workers import WorkerMonitor
+
+
+class FramingTests(unittest.TestCase):
+    def test_progress_round_trips_as_typed_record(self) -> None:
+        frame = FrameEncoder().encode(
+            {
+                "type": "progress",
+                "phase": "postprocessing",
+                "detail": "Converting",
+                "progress": 42.5,
+                "progress_known": True,
+            }
+        )
+
+        (record,) = FrameDecoder().feed(frame)
+        self.assertEqual(record, ProgressRecord("postprocessing", "Converting", 42.5, True))
+
+        searching = {"type": "progress", "phase": "searching", "detail": "Searching", "progress": 0.0, "progress_known": False}
+        (record,) = FrameDecoder().feed(FrameEncoder().encode(searching))
+        self.assertEqual(record.phase, "searching")
+
+    def test_decoder_waits_for_whole_frames(self) -> None:
+        encoder = FrameEncoder()
+        stream = encoder.encode({"type": "phase", "phase": "resolving", "detail": "Searching YouTube"})
+        stream += encoder.encode({"type": "completed", "file_path": "/tmp/song.mp3"})
+        decoder = FrameDecoder()
+
+        self.assertEqual(decoder.feed(stream[:7]), [])
+        events = decoder.feed(stream[7:-3]) + decoder.feed(stream[-3:])
+
+        self.assertEqual([event["type"] for event in events], ["phase", "completed"])
+        self.assertEqual(decoder.pending_bytes, 0)
+
+    def test_unknown_frame_kind_is_rejected(self) -> None:
+        with self.assertRaises(FrameError):
+            FrameDecoder().feed(b"\x09\x00\x00\x00\x00")
+
+    def test_worker_monitor_negotiates_binary_framing(self) -> None:
+        spec = DownloadJobSpec(
+            job_id="framing-test",
+            link="ftp://example.invalid/song",
+            download_directory="/tmp/music",
+            format="mp3",
+            bitrate="auto",
+            song_payload=None,
+        )
+        events = []
+        with tempfile.TemporaryDirectory() as log_dir:
+            with (
+                patch("app.backend.workers.JOB_LOG_DIR", Path(log_dir)),
+                patch("app.backend.workers.binary_framing_enabled", return_value=True),
+                patch("app.backend.workers.shared_zygote", return_value=None),
+            ):
+                outcome = WorkerMonitor(spec).run(events.append)
+            log_text = (Path(log_dir) / "framing-test.log").read_text(encoding="utf-8")
+
+        self.assertFalse(outcome.success)
+        self.assertIn("supported", outcome.error_message)
+        self.assertEqual([event["type"] for event in events], ["phase", "failed"])
+        self.assertIn(" EVENT ", log_text)
+        self.assertNotIn("PARSE_ERROR", log_text)
+
+
+if __name__ == "__main__":
+    unittest.main()
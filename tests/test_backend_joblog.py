@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from app.backend.joblog import JobLogWriter
+
+
+class JobLogWriterTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._temp_dir.cleanup)
+        self.root = Path(self._temp_dir.name)
+
+    def test_lines_are_buffered_until_close(self) -> None:
+        writer = JobLogWriter(flush_interval=60.0)
+        path = self.root / "job.log"
+        job_log = writer.open(path)
+        job_log.write("JOB", "link=https://example.com")
+        job_log.write("STDOUT", '{"type":"progress"}')
+
+        self.assertFalse(path.exists())
+        job_log.close()
+
+        lines = path.read_text(encoding="utf-8").splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].endswith(" JOB link=https://example.com"))
+        self.assertIn(" STDOUT ", lines[1])
+
+    def test_size_threshold_flushes_before_close(self) -> None:
+        writer = JobLogWriter(flush_interval=60.0, flush_bytes=1024)
+        path = self.root / "chatty.log"
+        job_log = writer.open(path)
+        for index in range(64):
+            job_log.write("STDERR", f"line {index} " + "x" * 32)
+
+        for _ in range(50):
+            if path.exists() and path.stat().st_size:
+                break
+            time.sleep(0.02)
+        self.assertTrue(path.exists())
+        job_log.close()
+        self.assertEqual(len(path.read_text(encoding="utf-8").splitlines()), 64)
+
+    def test_concurrent_jobs_keep_their_own_files(self) -> None:
+        writer = JobLogWriter(flush_interval=0.05)
+        logs = [writer.open(self.root / f"job-{index}.log") for index in range(4)]
+        for line in range(25):
+            for job_log in logs:
+                job_log.write("STDOUT", f"{job_log.path.stem} {line}")
+        for job_log in logs:
+            job_log.close()
+
+        for job_log in logs:
+            lines = job_log.path.read_text(encoding="utf-8").splitlines()
+            self.assertEqual(len(lines), 25)
+            self.assertTrue(all(f" {job_log.path.stem} " in line for line in lines))
+
+
+if __name__ == "__main__":
+    unittest.main()
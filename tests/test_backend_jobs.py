@@ -1,19 +1,52 @@
 from __future__ import annotations
 
+import json
 import threading
 import time
 import unittest
+from dataclasses import replace
 from pathlib import Path
+from typing import Optional
 
-from app.backend.jobs import DownloadSupervisor
+from app.backend.jobs import (
+    DEFAULT_JOB_SECONDS,
+    DownloadQueueFull,
+    DownloadSupervisor,
+    JobStore,
+    create_scheduling_policy,
+)
+from app.backend.metadata import MetadataService
+from app.backend.metrics import JOB_RETRIES, JOBS_FINISHED
+from app.backend.retries import RetryPolicy
 from app.backend.settings import DownloadRequest
-from app.backend.workers import WorkerOutcome
+from app.backend.workers import JobResources, WorkerOutcome
 
 
 class _MetadataStub:
     def get_cached_song_payload(self, _link: str):
         return None
 
+    def get_cached_duration(self, _link: str):
+        return None
+
+    def get_cached_extraction(self, _link: str):
+        return None
+
+
+class _DurationMetadataStub:
+    def __init__(self, durations: dict[str, int]) -> None:
+        self._durations = durations
+
+    def get_cached_song_payload(self, link: str):
+        duration = self._durations.get(link)
+        return None if duration is None else {"duration": duration}
+
+    def get_cached_duration(self, _link: str):
+        return None
+
+    def get_cached_extraction(self, _link: str):
+        return None
+
 
 class _BlockingMonitor:
     def __init__(self, spec, gate: threading.Event) -> None:
@@ -21,7 +54,7 @@ class _BlockingMonitor:
         self._gate = gate
         self._terminated = False
 
-    def run(self, on_event):
+    def run(self, on_event, on_events=None):
         on_event(
             {
                 "type": "phase",
@@ -42,6 +75,39 @@ class _BlockingMonitor:
         self._gate.set()
 
 
+class _FlakyMonitor:
+    """Fail with a network error until `failures` attempts have been made."""
+
+    def __init__(self, spec, attempts: list, failures: int) -> None:
+        self.spec = spec
+        self._attempts = attempts
+        self._failures = failures
+
+    def run(self, on_event, on_events=None):
+        self._attempts.append(self.spec)
+        if len(self._attempts) <= self._failures:
+            return WorkerOutcome(
+                success=False,
+                error_message="ERROR: unable to download webpage: <urlopen error timed out>",
+                error_class="download_error",
+                resources=JobResources(wall_seconds=1.0, cpu_user_seconds=2.0, peak_rss_bytes=4096),
+            )
+        return WorkerOutcome(
+            success=True,
+            file_path=f"/tmp/{self.spec.job_id}.mp3",
+            resources=JobResources(wall_seconds=1.0, cpu_user_seconds=1.0, peak_rss_bytes=8192),
+        )
+
+    def terminate(self, _reason=None) -> None:
+        pass
+
+
+def _wait_for(predicate, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
 class DownloadSupervisorTests(unittest.TestCase):
     def _request(self) -> DownloadRequest:
         return DownloadRequest(
@@ -73,7 +139,16 @@ class DownloadSupervisorTests(unittest.TestCase):
         self.assertEqual(queued["https://open.spotify.com/track/three"]["status"], "queued")
         self.assertTrue(queued["https://open.spotify.com/track/three"]["log_path"].endswith(".log"))
         self.assertEqual(queued["https://open.spotify.com/track/three"]["stderr_tail"], [])
+        self.assertEqual(
+            supervisor.load_snapshot(),
+            {"queued": 1, "active": 2, "retrying": 0, "concurrency_limit": 2},
+        )
+        self.assertEqual(
+            supervisor.container_sizes(),
+            {"queue": 1, "active": 2, "retrying": 0, "collections": 0, "jobs": 3},
+        )
 
+        completed_before = JOBS_FINISHED.value(outcome="completed", error_class="none")
         gate.set()
         time.sleep(0.3)
         statuses = supervisor.get_status(
@@ -85,6 +160,10 @@ class DownloadSupervisorTests(unittest.TestCase):
         )
         self.assertEqual(statuses["https://open.spotify.com/track/one"]["status"], "done")
         self.assertEqual(statuses["https://open.spotify.com/track/two"]["status"], "done")
+        self.assertGreaterEqual(
+            JOBS_FINISHED.value(outcome="completed", error_class="none") - completed_before,
+            2,
+        )
 
     def test_cancel_queued_job_returns_to_idle(self) -> None:
         gate = threading.Event()
@@ -109,6 +188,501 @@ class DownloadSupervisorTests(unittest.TestCase):
         self.assertEqual(status["detail"], "Cancelled")
         gate.set()
 
+    def test_queue_length_is_capped(self) -> None:
+        gate = threading.Event()
+        supervisor = DownloadSupervisor(
+            _MetadataStub(),
+            concurrency_limit=1,
+            monitor_factory=lambda spec: _BlockingMonitor(spec, gate),
+            max_queued=1,
+        )
+        supervisor.start_download("https://open.spotify.com/track/running", self._request())
+        supervisor.start_download("https://open.spotify.com/track/queued", self._request())
+        # A duplicate of a queued link is not a new job, so it is not refused.
+        supervisor.start_download("https://open.spotify.com/track/queued", self._request())
+
+        with self.assertRaises(DownloadQueueFull) as raised:
+            supervisor.start_download("https://open.spotify.com/track/shed", self._request())
+        self.assertEqual(raised.exception.code, "download_queue_full")
+        self.assertEqual(raised.exception.retry_after, 30)
+        shed = "https://open.spotify.com/track/shed"
+        self.assertIsNone(supervisor.job_store.snapshot(shed))
+        gate.set()
+
+    def test_status_reports_queue_position_and_eta(self) -> None:
+        gate = threading.Event()
+        supervisor = DownloadSupervisor(
+            _DurationMetadataStub({"https://open.spotify.com/track/eta-long": 600}),
+            concurrency_limit=1,
+            monitor_factory=lambda spec: _BlockingMonitor(spec, gate),
+        )
+        # Completed jobs run 10s of fixed work plus 0.1s per second of audio.
+        for duration in (100.0, 200.0, 300.0):
+            supervisor.phase_timings.record(
+                "completed",
+                {"queued": 5.0, "resolving": 10.0, "downloading": duration * 0.1, "total": 15.0 + duration * 0.1},
+                duration,
+            )
+        links = [
+            "https://open.spotify.com/track/eta-running",
+            "https://open.spotify.com/track/eta-long",
+            "https://open.spotify.com/track/eta-unknown",
+        ]
+        for link in links:
+            supervisor.start_download(link, self._request())
+
+        before = time.time()
+        statuses = supervisor.get_status(links)
+        running, long_mix, unknown = (statuses[link] for link in links)
+        self.assertIsNone(running["queue_position"])
+        self.assertAlmostEqual(running["estimated_completion_at"] - before, 30.0, delta=1.0)
+        self.assertEqual((long_mix["queue_position"], unknown["queue_position"]), (1, 2))
+        self.assertAlmostEqual(long_mix["estimated_start_at"], running["estimated_completion_at"], delta=0.5)
+        self.assertAlmostEqual(long_mix["estimated_completion_at"] - long_mix["estimated_start_at"], 70.0, delta=0.5)
+        self.assertAlmostEqual(unknown["estimated_start_at"], long_mix["estimated_completion_at"], delta=0.5)
+        self.assertAlmostEqual(unknown["estimated_completion_at"] - unknown["estimated_start_at"], 30.0, delta=0.5)
+
+        gate.set()
+        _wait_for(lambda: supervisor.get_status(links[:1])[links[0]]["status"] == "done")
+        self.assertIsNone(supervisor.get_status(links[:1])[links[0]]["estimated_completion_at"])
+
+    def test_jobs_waiting_to_retry_get_a_position_and_eta(self) -> None:
+        gate = threading.Event()
+        attempts: list = []
+        flaky = "https://open.spotify.com/track/eta-retry"
+
+        def factory(spec):
+            if spec.link == flaky:
+                return _FlakyMonitor(spec, attempts, failures=5)
+            return _BlockingMonitor(spec, gate)
+
+        supervisor = DownloadSupervisor(
+            _MetadataStub(),
+            concurrency_limit=1,
+            monitor_factory=factory,
+            retry_policy=RetryPolicy(max_attempts=3, base_delay=30.0, rng=lambda: 0.0),
+        )
+        supervisor.start_download(flaky, self._request())
+        _wait_for(lambda: supervisor.get_status([flaky])[flaky]["phase"] == "retrying")
+        running, behind = "https://open.spotify.com/track/eta-busy", "https://open.spotify.com/track/eta-behind"
+        supervisor.start_download(running, self._request())
+        supervisor.start_download(behind, self._request())
+
+        before = time.time()
+        statuses = supervisor.get_status([flaky, running, behind])
+        # The retry is due in 15s, before the running job frees its slot after 30s.
+        self.assertEqual(statuses[flaky]["queue_position"], 1)
+        self.assertAlmostEqual(statuses[flaky]["estimated_start_at"] - before, DEFAULT_JOB_SECONDS, delta=1.0)
+        self.assertEqual(statuses[behind]["queue_position"], 2)
+        self.assertAlmostEqual(
+            statuses[behind]["estimated_start_at"], statuses[flaky]["estimated_completion_at"], delta=0.5
+        )
+        self.assertTrue(supervisor.cancel_download(flaky))
+        gate.set()
+
+    def test_heaviest_jobs_include_retried_attempts(self) -> None:
+        attempts: list = []
+        supervisor = DownloadSupervisor(
+            _MetadataStub(),
+            monitor_factory=lambda spec: _FlakyMonitor(spec, attempts, failures=1),
+            retry_policy=RetryPolicy(max_attempts=3, base_delay=0.05, max_delay=0.05, rng=lambda: 0.0),
+        )
+        link = "https://open.spotify.com/track/heavy"
+        supervisor.start_download(link, self._request())
+        _wait_for(lambda: supervisor.get_status([link])[link]["status"] == "done")
+
+        heaviest = supervisor.heaviest_jobs()
+        self.assertEqual(
+            [(run["outcome"], run["cpu_seconds"]) for run in heaviest["cpu"]], [("retried", 2.0), ("completed", 1.0)]
+        )
+        self.assertEqual(heaviest["peak_rss"][0]["peak_rss_bytes"], 8192)
+        self.assertEqual(heaviest["cpu"][0]["link"], link)
+
+    def test_transient_failure_is_retried_with_the_next_provider(self) -> None:
+        attempts: list = []
+        supervisor = DownloadSupervisor(
+            _MetadataStub(),
+            concurrency_limit=1,
+            monitor_factory=lambda spec: _FlakyMonitor(spec, attempts, failures=1),
+            retry_policy=RetryPolicy(max_attempts=3, base_delay=0.05, max_delay=0.05, rng=lambda: 0.0),
+        )
+        link = "https://open.spotify.com/track/flaky"
+        retries_before = JOB_RETRIES.value(reason="network")
+        supervisor.start_download(link, self._request())
+        _wait_for(lambda: supervisor.get_status([link])[link]["status"] == "done")
+
+        status = supervisor.get_status([link])[link]
+        self.assertEqual(status["status"], "done")
+        self.assertEqual(status["attempt"], 2)
+        self.assertEqual([retry["reason"] for retry in status["retries"]], ["network"])
+        self.assertEqual(status["retries"][0]["attempt"], 1)
+        self.assertEqual(status["job_id"], attempts[1].job_id)
+        self.assertNotEqual(attempts[0].job_id, attempts[1].job_id)
+        self.assertEqual(attempts[0].audio_providers[0], "youtube")
+        self.assertEqual(attempts[1].audio_providers, ("youtube-music", "piped", "youtube"))
+        self.assertEqual(JOB_RETRIES.value(reason="network") - retries_before, 1)
+
+    def test_retries_stop_after_the_last_attempt(self) -> None:
+        attempts: list = []
+        supervisor = DownloadSupervisor(
+            _MetadataStub(),
+            concurrency_limit=1,
+            monitor_factory=lambda spec: _FlakyMonitor(spec, attempts, failures=5),
+            retry_policy=RetryPolicy(max_attempts=2, base_delay=0.01, max_delay=0.01),
+        )
+        link = "https://open.spotify.com/track/broken"
+        supervisor.start_download(link, self._request())
+        _wait_for(lambda: supervisor.get_status([link])[link]["status"] == "error")
+
+        status = supervisor.get_status([link])[link]
+        self.assertEqual(status["status"], "error")
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(len(status["retries"]), 1)
+
+    def test_cancel_while_waiting_to_retry(self) -> None:
+        attempts: list = []
+        supervisor = DownloadSupervisor(
+            _MetadataStub(),
+            concurrency_limit=1,
+            monitor_factory=lambda spec: _FlakyMonitor(spec, attempts, failures=5),
+            retry_policy=RetryPolicy(max_attempts=3, base_delay=30.0),
+        )
+        link = "https://open.spotify.com/track/waiting"
+        supervisor.start_download(link, self._request())
+        _wait_for(lambda: supervisor.get_status([link])[link]["phase"] == "retrying")
+        self.assertEqual(supervisor.get_status([link])[link]["status"], "queued")
+        self.assertEqual(supervisor.load_snapshot()["retrying"], 1)
+
+        self.assertTrue(supervisor.cancel_download(link))
+        self.assertEqual(supervisor.get_status([link])[link]["detail"], "Cancelled")
+        self.assertEqual(supervisor.load_snapshot()["retrying"], 0)
+        self.assertEqual(len(attempts), 1)
+
+
+class _PagedExpander:
+    """Yield a header and `pages` of track links, waiting on `release` before each later page."""
+
+    def __init__(self, pages: list[list[str]], release: threading.Event) -> None:
+        self._pages = pages
+        self._release = release
+        self.cancelled = False
+
+    def events(self):
+        yield {"type": "collection", "title": "Mix", "cover": "", "total": sum(map(len, self._pages))}
+        for index, page in enumerate(self._pages):
+            if index:
+                self._release.wait(timeout=2.0)
+            if self.cancelled:
+                return
+            yield {"type": "tracks", "tracks": [{"link": link, "song_payload": {"duration": 200}} for link in page]}
+
+    def cancel(self) -> None:
+        self.cancelled = True
+        self._release.set()
+
+
+class CollectionDownloadTests(unittest.TestCase):
+    PLAYLIST = "https://open.spotify.com/playlist/mix"
+
+    def _supervisor(self, pages: list[list[str]], release: threading.Event, gate: threading.Event, **kwargs):
+        started: list[str] = []
+        expanders: list[_PagedExpander] = []
+
+        def monitor_factory(spec):
+            started.append(spec.link)
+            return _BlockingMonitor(spec, gate)
+
+        def expander_factory(_link, _job_id):
+            expanders.append(_PagedExpander(pages, release))
+            return expanders[-1]
+
+        supervisor = DownloadSupervisor(
+            _MetadataStub(),
+            monitor_factory=monitor_factory,
+            expander_factory=expander_factory,
+            **kwargs,
+        )
+        return supervisor, started, expanders
+
+    def test_first_tracks_start_while_later_pages_are_listed(self) -> None:
+        release, gate = threading.Event(), threading.Event()
+        pages = [
+            ["https://open.spotify.com/track/a", "https://open.spotify.com/track/b"],
+            ["https://open.spotify.com/track/c", "https://open.spotify.com/track/d"],
+        ]
+        supervisor, started, _expanders = self._supervisor(pages, release, gate, concurrency_limit=1)
+        supervisor.start_download(self.PLAYLIST, _download_request())
+        _wait_for(lambda: started)
+
+        status = supervisor.get_status([self.PLAYLIST])[self.PLAYLIST]
+        self.assertEqual(started, ["https://open.spotify.com/track/a"])
+        self.assertEqual(status["phase"], "listing")
+        self.assertEqual(status["collection"]["name"], "Mix")
+        self.assertEqual(status["collection"]["enqueued"], 2)
+        self.assertTrue(status["collection"]["listing"])
+
+        release.set()
+        gate.set()
+        _wait_for(lambda: supervisor.get_status([self.PLAYLIST])[self.PLAYLIST]["status"] == "done")
+        status = supervisor.get_status([self.PLAYLIST])[self.PLAYLIST]
+        self.assertEqual(status["collection"]["completed"], 4)
+        self.assertEqual(status["progress"], 100.0)
+        # Finished tracks are counted into the collection and dropped from the job store.
+        self.assertEqual(supervisor.get_status(pages[1]), {})
+        self.assertEqual(supervisor.container_sizes()["jobs"], 0)
+
+    def test_window_pauses_listing_and_cancel_stops_every_track(self) -> None:
+        release, gate = threading.Event(), threading.Event()
+        links = [f"https://open.spotify.com/track/t{index}" for index in range(5)]
+        supervisor, started, expanders = self._supervisor(
+            [links], release, gate, concurrency_limit=1, collection_window=2
+        )
+        supervisor.start_download(links[0], _download_request())
+        supervisor.start_download(self.PLAYLIST, _download_request())
+        _wait_for(lambda: supervisor.load_snapshot()["queued"] == 2)
+        time.sleep(0.1)
+
+        status = supervisor.get_status([self.PLAYLIST])[self.PLAYLIST]
+        # t0 was already queued on its own; t1 and t2 fill the window and listing waits.
+        self.assertEqual(status["collection"]["skipped"], 1)
+        self.assertEqual(status["collection"]["enqueued"], 2)
+        self.assertEqual(supervisor.load_snapshot()["queued"], 2)
+
+        self.assertTrue(supervisor.cancel_download(self.PLAYLIST))
+        _wait_for(lambda: supervisor.get_status([self.PLAYLIST])[self.PLAYLIST]["status"] == "idle")
+        status = supervisor.get_status([self.PLAYLIST])[self.PLAYLIST]
+        self.assertEqual(status["collection"]["cancelled"], 2)
+        self.assertEqual(status["detail"], "Cancelled")
+        self.assertEqual(supervisor.get_status([links[1]]), {})
+        self.assertEqual(supervisor.load_snapshot()["queued"], 0)
+        self.assertTrue(expanders[0].cancelled)
+
+        gate.set()
+        _wait_for(lambda: supervisor.get_status([links[0]])[links[0]]["status"] == "done")
+        self.assertEqual(started, [links[0]])
+
+    def test_listing_resumes_when_a_full_queue_of_single_tracks_drains(self) -> None:
+        release, gate = threading.Event(), threading.Event()
+        release.set()
+        singles = ["https://open.spotify.com/track/s1", "https://open.spotify.com/track/s2"]
+        supervisor, started, _expanders = self._supervisor(
+            [["https://open.spotify.com/track/p1"]], release, gate, concurrency_limit=1, max_queued=1
+        )
+        for link in singles:
+            supervisor.start_download(link, _download_request())
+        supervisor.start_download(self.PLAYLIST, _download_request())
+        time.sleep(0.1)
+        self.assertEqual(supervisor.get_status([self.PLAYLIST])[self.PLAYLIST]["collection"]["enqueued"], 0)
+
+        gate.set()
+        _wait_for(lambda: supervisor.get_status([self.PLAYLIST])[self.PLAYLIST]["status"] == "done")
+        self.assertEqual(supervisor.get_status([self.PLAYLIST])[self.PLAYLIST]["collection"]["completed"], 1)
+        self.assertEqual(started, [*singles, "https://open.spotify.com/track/p1"])
+
+    def test_playlist_leaves_a_downloaded_single_track_row_alone(self) -> None:
+        release, gate = threading.Event(), threading.Event()
+        release.set()
+        gate.set()
+        single = "https://open.spotify.com/track/a"
+        supervisor, started, _expanders = self._supervisor(
+            [[single, "https://open.spotify.com/track/b"]], release, gate, concurrency_limit=1
+        )
+        supervisor.start_download(single, _download_request())
+        _wait_for(lambda: supervisor.get_status([single])[single]["status"] == "done")
+        row = supervisor.get_status([single])[single]
+
+        supervisor.start_download(self.PLAYLIST, _download_request())
+        _wait_for(lambda: supervisor.get_status([self.PLAYLIST])[self.PLAYLIST]["status"] == "done")
+
+        self.assertEqual(supervisor.get_status([self.PLAYLIST])[self.PLAYLIST]["collection"]["skipped"], 1)
+        self.assertEqual(started, [single, "https://open.spotify.com/track/b"])
+        status = supervisor.get_status([single])[single]
+        self.assertEqual(status["job_id"], row["job_id"])
+        self.assertEqual(status["file_path"], row["file_path"])
+
+    def test_only_the_most_recently_finished_collections_are_kept(self) -> None:
+        release, gate = threading.Event(), threading.Event()
+        release.set()
+        gate.set()
+        supervisor, _started, _expanders = self._supervisor(
+            [["https://open.spotify.com/track/a"]], release, gate, finished_collections=1
+        )
+        playlists = [self.PLAYLIST, "https://open.spotify.com/playlist/other"]
+        for playlist in playlists:
+            supervisor.start_download(playlist, _download_request())
+            _wait_for(lambda: supervisor.get_status([playlist]).get(playlist, {}).get("status") == "done")
+
+        self.assertEqual(supervisor.container_sizes()["collections"], 1)
+        self.assertEqual(supervisor.get_status(playlists[:1]), {})
+        self.assertEqual(supervisor.get_status(playlists[1:])[playlists[1]]["status"], "done")
+
+
+def _download_request() -> DownloadRequest:
+    return DownloadRequest(download_directory=Path("/tmp/music"), quality="best", format="mp3", bitrate="auto")
+
+
+class SchedulingPolicyTests(unittest.TestCase):
+    def _run_in_start_order(
+        self,
+        links: list[str],
+        scheduler,
+        *,
+        metadata=None,
+        concurrency_limit: int = 1,
+        priorities: Optional[dict[str, int]] = None,
+    ) -> list[str]:
+        """Queue `links` behind a blocked first job, release it and return the order jobs started."""
+        gate = threading.Event()
+        started: list[str] = []
+
+        def factory(spec):
+            started.append(spec.link)
+            return _BlockingMonitor(spec, gate)
+
+        supervisor = DownloadSupervisor(
+            metadata or _MetadataStub(),
+            concurrency_limit=concurrency_limit,
+            monitor_factory=factory,
+            scheduler=scheduler,
+        )
+        for link in links:
+            request = _download_request()
+            if priorities and link in priorities:
+                request = replace(request, priority=priorities[link])
+            supervisor.start_download(link, request)
+        gate.set()
+        _wait_for(lambda: len(started) == len(links))
+        return started
+
+    def test_fifo_starts_jobs_in_arrival_order(self) -> None:
+        links = [f"https://open.spotify.com/track/fifo{index}" for index in range(4)]
+        self.assertEqual(self._run_in_start_order(links, create_scheduling_policy("fifo")), links)
+
+    def test_priority_starts_urgent_jobs_first(self) -> None:
+        links = [f"https://open.spotify.com/track/prio{index}" for index in range(4)]
+        order = self._run_in_start_order(
+            links,
+            create_scheduling_policy("priority"),
+            priorities={links[2]: 5, links[3]: -1},
+        )
+        self.assertEqual(order, [links[0], links[2], links[1], links[3]])
+
+    def test_shortest_job_first_uses_cached_durations(self) -> None:
+        mix, single, unknown, short = (f"https://open.spotify.com/track/sjf{index}" for index in range(4))
+        metadata = _DurationMetadataStub({mix: 3600, single: 200, short: 90})
+        order = self._run_in_start_order(
+            ["https://open.spotify.com/track/sjf-first", mix, single, unknown, short],
+            create_scheduling_policy("sjf"),
+            metadata=metadata,
+        )
+        self.assertEqual(order[1:], [short, single, unknown, mix])
+
+    def test_shortest_job_first_orders_spotify_singles_from_fast_lookups(self) -> None:
+        lengths = {f"https://open.spotify.com/track/fast{seconds}": seconds for seconds in (420, 95, 240)}
+        service = MetadataService(metadata_mode="fast")
+
+        def fast_worker(request, _cancel_event):
+            link = json.loads(request)["link"]
+            reply = {"ok": True, "metadata": {"title": link}, "song_payload": None, "duration": lengths[link]}
+            return json.dumps(reply), ""
+
+        service._run_worker = fast_worker  # noqa: SLF001
+        for link in lengths:
+            service.get_metadata(link)
+
+        order = self._run_in_start_order(
+            ["https://open.spotify.com/track/fast-first", *lengths],
+            create_scheduling_policy("sjf"),
+            metadata=service,
+        )
+        self.assertEqual(
+            order[1:],
+            [
+                "https://open.spotify.com/track/fast95",
+                "https://open.spotify.com/track/fast240",
+                "https://open.spotify.com/track/fast420",
+            ],
+        )
+
+    def test_fair_share_alternates_between_sources(self) -> None:
+        spotify = [f"https://open.spotify.com/track/fair{index}" for index in range(3)]
+        vimeo = [f"https://vimeo.com/{index}" for index in range(2)]
+        order = self._run_in_start_order(
+            [*spotify, *vimeo],
+            create_scheduling_policy("fair"),
+        )
+        self.assertEqual(order, [spotify[0], vimeo[0], spotify[1], vimeo[1], spotify[2]])
+
+    def test_per_source_cap_leaves_slots_for_other_hosts(self) -> None:
+        gate = threading.Event()
+        started: list[str] = []
+
+        def factory(spec):
+            started.append(spec.link)
+            return _BlockingMonitor(spec, gate)
+
+        supervisor = DownloadSupervisor(
+            _MetadataStub(),
+            concurrency_limit=3,
+            monitor_factory=factory,
+            scheduler=create_scheduling_policy("fifo", max_active_per_source=1),
+        )
+        request = _download_request()
+        supervisor.start_download("https://open.spotify.com/track/capped0", request)
+        supervisor.start_download("https://open.spotify.com/track/capped1", request)
+        supervisor.start_download("https://vimeo.com/76979871", request)
+
+        self.assertEqual(started, ["https://open.spotify.com/track/capped0", "https://vimeo.com/76979871"])
+        self.assertEqual(supervisor.load_snapshot()["queued"], 1)
+        gate.set()
+        _wait_for(lambda: len(started) == 3)
+        self.assertEqual(started[2], "https://open.spotify.com/track/capped1")
+
+    def test_unknown_policy_falls_back_to_fifo(self) -> None:
+        with self.assertLogs("app.backend.jobs", level="WARNING"):
+            self.assertEqual(create_scheduling_policy("lottery").name, "fifo")
+
+
+class JobStoreTests(unittest.TestCase):
+    def test_batched_events_apply_in_order_with_one_history_entry_per_detail(self) -> None:
+        link = "https://open.spotify.com/track/batch"
+        store = JobStore()
+        store.queue_job(link, "job-1")
+        store.apply_worker_events(
+            link,
+            "job-1",
+            [
+                {"type": "phase", "phase": "resolving", "detail": "Searching YouTube"},
+                {"type": "progress", "detail": "Downloading", "progress": 10.0, "progress_known": True},
+                {"type": "progress", "detail": "Downloading", "progress": 55.0, "progress_known": True},
+            ],
+        )
+
+        snapshot = store.snapshot(link)
+        self.assertEqual(snapshot.status, "downloading")
+        self.assertEqual(snapshot.progress, 55.0)
+        self.assertEqual(
+            list(store._jobs[link].events),  # noqa: SLF001
+            ["Queued", "Searching YouTube", "Downloading"],
+        )
+
+    def test_batched_events_for_a_replaced_job_are_ignored(self) -> None:
+        link = "https://open.spotify.com/track/stale"
+        store = JobStore()
+        store.queue_job(link, "job-2")
+        store.apply_worker_events(link, "job-1", [{"type": "progress", "progress": 90.0}])
+        self.assertEqual(store.snapshot(link).status, "queued")
+
+    def test_failed_job_reports_its_error_class(self) -> None:
+        store = JobStore()
+        link = "https://open.spotify.com/track/failed"
+        store.queue_job(link, "job-1")
+        store.mark_failed(link, "job-1", "spotDL produced no output for 60 seconds.", error_class="idle_timeout")
+
+        payload = store.status_payloads([link])[link]
+        self.assertEqual(payload["status"], "error")
+        self.assertEqual(payload["error_class"], "idle_timeout")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import threading
+import time
+import unittest
+
+from app.backend.lookups import LookupQueueFull, MetadataLookups
+from app.backend.metadata import MetadataError
+
+
+class _SlowMetadataService:
+    metadata_concurrency = 1
+
+    def __init__(self) -> None:
+        self.gate = threading.Event()
+        self.calls: list[str] = []
+        self.cancelled: list[str] = []
+        self.cached: dict[str, dict[str, str]] = {}
+
+    def peek_metadata(self, link: str):
+        return self.cached.get(link)
+
+    def get_metadata(self, link: str, *, cancel_event=None):
+        self.calls.append(link)
+        while not self.gate.wait(0.01):
+            if cancel_event is not None and cancel_event.is_set():
+                self.cancelled.append(link)
+                raise MetadataError("Metadata lookup cancelled.", code="metadata_cancelled", status_code=409)
+        if link.endswith("bad"):
+            raise MetadataError("no such track", code="metadata_error", status_code=502)
+        return {"title": link.rsplit("/", 1)[-1], "artist": "", "album": "", "cover": ""}
+
+
+def _wait_for(predicate, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.01)
+
+
+class MetadataLookupTests(unittest.TestCase):
+    def test_lookup_completes_in_the_background(self) -> None:
+        service = _SlowMetadataService()
+        lookups = MetadataLookups(service)
+
+        lookup = lookups.submit("https://open.spotify.com/track/one")
+        self.assertEqual(lookup.status, "pending")
+        self.assertIs(lookups.submit("https://open.spotify.com/track/one"), lookup)
+
+        service.gate.set()
+        _wait_for(lambda: lookups.get(lookup.lookup_id).status == "done")
+        self.assertEqual(lookup.metadata["title"], "one")
+        self.assertEqual(service.calls, ["https://open.spotify.com/track/one"])
+
+    def test_cached_metadata_is_returned_without_a_worker(self) -> None:
+        service = _SlowMetadataService()
+        service.cached["https://open.spotify.com/track/hot"] = {"title": "Hot", "artist": "", "album": "", "cover": ""}
+
+        lookup = MetadataLookups(service).submit("https://open.spotify.com/track/hot")
+
+        self.assertEqual(lookup.status, "done")
+        self.assertEqual(service.calls, [])
+
+    def test_errors_are_kept_on_the_lookup(self) -> None:
+        service = _SlowMetadataService()
+        service.gate.set()
+        lookups = MetadataLookups(service)
+
+        lookup = lookups.submit("https://open.spotify.com/track/bad")
+        _wait_for(lambda: lookup.status != "pending")
+
+        self.assertEqual(lookup.status, "error")
+        self.assertEqual(lookup.error.status_code, 502)
+
+    def test_pending_lookups_are_bounded(self) -> None:
+        lookups = MetadataLookups(_SlowMetadataService(), max_pending=2)
+        lookups.submit("https://open.spotify.com/track/a")
+        lookups.submit("https://open.spotify.com/track/b")
+
+        with self.assertRaises(LookupQueueFull) as raised:
+            lookups.submit("https://open.spotify.com/track/c")
+        self.assertGreaterEqual(raised.exception.retry_after, 1)
+
+    def test_cancel_stops_running_and_queued_lookups(self) -> None:
+        service = _SlowMetadataService()
+        lookups = MetadataLookups(service)
+        running = lookups.submit("https://open.spotify.com/track/running")
+        queued = lookups.submit("https://open.spotify.com/track/queued")
+        _wait_for(lambda: service.calls)
+
+        self.assertTrue(lookups.cancel(queued.lookup_id))
+        self.assertTrue(lookups.cancel(running.lookup_id))
+        self.assertFalse(lookups.cancel("missing"))
+
+        _wait_for(lambda: lookups.pending_count() == 0)
+        self.assertEqual(running.status, "cancelled")
+        self.assertEqual(queued.status, "cancelled")
+        self.assertEqual(service.calls, ["https://open.spotify.com/track/running"])
+        self.assertEqual(service.cancelled, ["https://open.spotify.com/track/running"])
+
+    def test_lookups_nobody_polls_are_cancelled(self) -> None:
+        service = _SlowMetadataService()
+        lookups = MetadataLookups(service, abandon_after=0.05)
+        lookup = lookups.submit("https://open.spotify.com/track/abandoned")
+
+        time.sleep(0.1)
+        lookups.submit("https://open.spotify.com/track/other")
+
+        self.assertEqual(lookup.status, "cancelled")
+        _wait_for(lambda: service.cancelled == ["https://open.spotify.com/track/abandoned"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import time
+import unittest
+
+from app.backend.media import (
+    compact_extraction,
+    metadata_from_spotify_track,
+    song_payload_from_spotify_track,
+    usable_extraction,
+)
+from app.backend.metadata import MetadataService
+
+LINK = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+def _external_info(expire: int) -> dict[str, object]:
+    return {
+        "id": "dQw4w9WgXcQ",
+        "title": "Never Gonna Give You Up",
+        "uploader": "Rick Astley",
+        "duration": 213,
+        "formats": [
+            {
+                "format_id": "251",
+                "url": f"https://rr1.googlevideo.com/videoplayback?expire={expire}&itag=251",
+                "ext": "webm",
+            }
+        ],
+        "automatic_captions": {"en": [{"url": "https://example.invalid/captions"}]},
+    }
+
+
+class ExtractionCacheTests(unittest.TestCase):
+    def test_compact_extraction_trims_heavy_keys_and_reads_url_expiry(self) -> None:
+        expire = int(time.time()) + 600
+        extraction = compact_extraction(_external_info(expire))
+
+        self.assertNotIn("automatic_captions", extraction["info"])
+        self.assertEqual(extraction["expires_at"], float(expire))
+        self.assertEqual(usable_extraction(extraction)["id"], "dQw4w9WgXcQ")
+
+    def test_usable_extraction_rejects_nearly_expired_formats(self) -> None:
+        extraction = compact_extraction(_external_info(int(time.time()) + 10))
+        self.assertIsNone(usable_extraction(extraction))
+        self.assertIsNone(usable_extraction({"info": {"id": "x"}, "expires_at": time.time() + 600}))
+
+    def test_expired_payload_is_rebuilt_from_cached_extraction(self) -> None:
+        service = MetadataService()
+        service._store_extraction(LINK, compact_extraction(_external_info(int(time.time()) + 600)))  # noqa: SLF001
+
+        payload = service.get_cached_song_payload(LINK)
+        self.assertIsNotNone(payload)
+        self.assertEqual(payload["name"], "Never Gonna Give You Up")
+        self.assertEqual(payload["download_url"], LINK)
+        self.assertIsNotNone(service.get_cached_extraction(LINK))
+
+
+class SpotifyTrackMetadataTests(unittest.TestCase):
+    def test_single_track_object_maps_to_row_metadata(self) -> None:
+        metadata = metadata_from_spotify_track(
+            {
+                "id": "4PTG3Z6ehGkBFwjybzWkR8",
+                "name": "Never Gonna Give You Up",
+                "duration_ms": 213573,
+                "artists": [{"name": "Rick Astley"}, {"name": "Guest"}],
+                "album": {
+                    "name": "Whenever You Need Somebody",
+                    "images": [
+                        {"url": "https://i.scdn.co/image/small", "width": 64, "height": 64},
+                        {"url": "https://i.scdn.co/image/large", "width": 640, "height": 640},
+                    ],
+                },
+            }
+        )
+
+        self.assertEqual(
+            metadata,
+            {
+                "title": "Never Gonna Give You Up",
+                "artist": "Rick Astley, Guest",
+                "album": "Whenever You Need Somebody",
+                "cover": "https://i.scdn.co/image/large",
+            },
+        )
+
+    def test_removed_track_is_rejected(self) -> None:
+        with self.assertRaises(RuntimeError):
+            metadata_from_spotify_track({"id": "gone", "name": "", "duration_ms": 0})
+
+    def test_album_track_payload_takes_album_fields_from_the_shared_album(self) -> None:
+        album = {
+            "id": "album1",
+            "name": "Whenever You Need Somebody",
+            "artists": [{"name": "Rick Astley"}],
+            "release_date": "1987-11-12",
+            "total_tracks": 10,
+            "label": "RCA",
+            "images": [{"url": "https://i.scdn.co/image/large", "width": 640, "height": 640}],
+        }
+        payload = song_payload_from_spotify_track(
+            {
+                "id": "4PTG3Z6ehGkBFwjybzWkR8",
+                "name": "Never Gonna Give You Up",
+                "duration_ms": 213573,
+                "track_number": 1,
+                "artists": [{"name": "Rick Astley", "id": "artist1"}],
+            },
+            album,
+            list_name="Whenever You Need Somebody",
+            list_url="https://open.spotify.com/album/album1",
+            list_position=1,
+            list_length=10,
+        )
+
+        self.assertEqual(payload["url"], "https://open.spotify.com/track/4PTG3Z6ehGkBFwjybzWkR8")
+        self.assertEqual(payload["duration"], 214)
+        self.assertEqual(payload["year"], 1987)
+        self.assertEqual(payload["cover_url"], "https://i.scdn.co/image/large")
+        self.assertEqual(payload["album_artist"], "Rick Astley")
+        self.assertEqual(payload["list_position"], 1)
+        self.assertIsNone(song_payload_from_spotify_track({"id": "local", "is_local": True, "duration_ms": 1000}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import unittest
+
+from app.backend.metrics import MetricsRegistry
+
+
+class MetricsRegistryTests(unittest.TestCase):
+    def test_counters_render_per_label_set(self) -> None:
+        registry = MetricsRegistry()
+        outcomes = registry.counter("jobs_total", "Jobs.", ("outcome",))
+        outcomes.inc(outcome="completed")
+        outcomes.inc(2, outcome="failed")
+
+        body = registry.render()
+
+        self.assertIn("# TYPE jobs_total counter", body)
+        self.assertIn('jobs_total{outcome="completed"} 1', body)
+        self.assertIn('jobs_total{outcome="failed"} 2', body)
+        self.assertEqual(outcomes.value(outcome="failed"), 2)
+
+    def test_unlabelled_counter_renders_zero_before_first_increment(self) -> None:
+        registry = MetricsRegistry()
+        registry.counter("spawned_total", "Spawns.")
+
+        self.assertIn("spawned_total 0", registry.render())
+
+    def test_histogram_buckets_are_cumulative(self) -> None:
+        registry = MetricsRegistry()
+        histogram = registry.histogram("phase_seconds", "Phases.", ("phase",), buckets=(1.0, 5.0))
+        for value in (0.5, 1.0, 3.0, 9.0):
+            histogram.observe(value, phase="downloading")
+
+        body = registry.render()
+
+        self.assertIn('phase_seconds_bucket{phase="downloading",le="1"} 2', body)
+        self.assertIn('phase_seconds_bucket{phase="downloading",le="5"} 3', body)
+        self.assertIn('phase_seconds_bucket{phase="downloading",le="+Inf"} 4', body)
+        self.assertIn('phase_seconds_sum{phase="downloading"} 13.5', body)
+        self.assertIn('phase_seconds_count{phase="downloading"} 4', body)
+
+    def test_gauges_and_label_mismatches(self) -> None:
+        registry = MetricsRegistry()
+        counter = registry.counter("kills_total", "Kills.", ("kind",))
+
+        self.assertIn("queue_depth 3", registry.render({"queue_depth": ("Queue.", 3)}))
+        with self.assertRaises(ValueError):
+            counter.inc(reason="idle")
+
+    def test_registering_twice_returns_the_same_metric(self) -> None:
+        registry = MetricsRegistry()
+
+        self.assertIs(registry.counter("a_total", "A."), registry.counter("a_total", "A."))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import sys
+import tempfile
+import textwrap
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from app.backend.playlists import CollectionError, CollectionExpander, CollectionJob
+
+# Stands in for `app.backend.playlist_worker`: a header, pages of tracks, then `done`.
+STREAMING_WORKER = textwrap.dedent(
+    """
+    import json, sys
+    request = json.load(sys.stdin)
+    print(json.dumps({"type": "collection", "title": request["link"], "total": 4}), flush=True)
+    for page in (["a", "b"], ["c", "d"]):
+        tracks = [{"link": "https://open.spotify.com/track/" + name, "song_payload": None} for name in page]
+        print(json.dumps({"type": "tracks", "tracks": tracks}), flush=True)
+    print(json.dumps({"type": "done", "count": 4}), flush=True)
+    """
+)
+FAILING_WORKER = textwrap.dedent(
+    """
+    import json, sys
+    sys.stdin.read()
+    print(json.dumps({"type": "failed", "error": "Playlist is private.", "code": "collection_error"}), flush=True)
+    """
+)
+CRASHING_WORKER = "import sys; sys.stdin.read(); print('spotify said no', file=sys.stderr); sys.exit(1)"
+
+
+class CollectionExpanderTests(unittest.TestCase):
+    def _events(self, script: str) -> list[dict]:
+        with tempfile.TemporaryDirectory() as log_dir:
+            with patch("app.backend.workers.JOB_LOG_DIR", Path(log_dir)):
+                expander = CollectionExpander(
+                    "https://open.spotify.com/playlist/mix",
+                    "expand-test",
+                    command=lambda: [sys.executable, "-c", script],
+                )
+                return list(expander.events())
+
+    def test_pages_are_yielded_in_order(self) -> None:
+        events = self._events(STREAMING_WORKER)
+
+        self.assertEqual([event["type"] for event in events], ["collection", "tracks", "tracks"])
+        self.assertEqual(events[0]["title"], "https://open.spotify.com/playlist/mix")
+        self.assertEqual(events[2]["tracks"][1]["link"], "https://open.spotify.com/track/d")
+
+    def test_failed_listing_raises_with_its_code(self) -> None:
+        with self.assertRaises(CollectionError) as raised:
+            self._events(FAILING_WORKER)
+        self.assertEqual(str(raised.exception), "Playlist is private.")
+        self.assertEqual(raised.exception.code, "collection_error")
+
+    def test_worker_exit_without_done_reports_the_last_log_line(self) -> None:
+        with self.assertRaises(CollectionError) as raised:
+            self._events(CRASHING_WORKER)
+        self.assertEqual(str(raised.exception), "spotify said no")
+
+
+class CollectionJobTests(unittest.TestCase):
+    def test_progress_counts_finished_and_running_tracks(self) -> None:
+        collection = CollectionJob(job_id="c1", link="https://open.spotify.com/album/a", status="downloading")
+        collection.total = 4
+        collection.enqueued = 3
+        collection.completed = 1
+        collection.failed = 1
+
+        payload = collection.to_payload(active_progress=50.0)
+
+        self.assertEqual(payload["progress"], 62.5)
+        self.assertEqual(payload["detail"], "1 of 4 tracks downloaded, 1 failed, listed 3")
+        self.assertEqual(payload["collection"]["enqueued"], 3)
+
+    def test_skipped_tracks_are_left_out_of_progress(self) -> None:
+        collection = CollectionJob(job_id="c2", link="https://open.spotify.com/album/b", status="downloading")
+        collection.total = 4
+        collection.enqueued = 1
+        collection.skipped = 1
+        collection.completed = 1
+
+        payload = collection.to_payload()
+
+        # The skipped track is still downloading on its own row, so it does not count as done here.
+        self.assertEqual(payload["progress"], 33.3)
+        self.assertEqual(payload["detail"], "1 of 3 tracks downloaded, listed 2")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import pstats
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from app.backend.profiling import (
+    StackSampler,
+    normalize_profile_mode,
+    profile_path,
+    run_profiled,
+)
+
+
+def _spin(seconds: float) -> None:
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        pass
+
+
+class ProfileModeTests(unittest.TestCase):
+    def test_request_values_map_to_known_modes(self) -> None:
+        self.assertEqual(normalize_profile_mode("sample"), "sample")
+        self.assertEqual(normalize_profile_mode(" CProfile "), "cprofile")
+        self.assertIn(normalize_profile_mode(True), {"cprofile", "sample"})
+        self.assertIsNone(normalize_profile_mode("py-spy"))
+        self.assertIsNone(normalize_profile_mode(None))
+
+    def test_profile_sits_next_to_the_job_log(self) -> None:
+        log_path = Path("/tmp/logs/abc.log")
+
+        self.assertEqual(profile_path(log_path, "cprofile"), Path("/tmp/logs/abc.prof"))
+        self.assertEqual(profile_path(log_path, "sample"), Path("/tmp/logs/abc.folded"))
+
+
+class ProfilerTests(unittest.TestCase):
+    def test_sampler_attributes_time_to_the_busy_thread(self) -> None:
+        worker = threading.Thread(target=_spin, args=(0.2,), name="download-busy")
+        sampler = StackSampler(0.002).start()
+        worker.start()
+        worker.join()
+        sampler.stop()
+
+        folded = sampler.folded()
+        self.assertGreater(sampler.samples, 0)
+        busy = [line for line in folded.splitlines() if line.startswith("download-busy;")]
+        self.assertTrue(busy)
+        self.assertTrue(any("_spin (test_backend_profiling:" in line for line in busy))
+
+    def test_run_profiled_writes_profiles_even_when_the_job_fails(self) -> None:
+        def failing_job() -> None:
+            _spin(0.05)
+            raise RuntimeError("boom")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            deterministic = Path(tmp) / "job.prof"
+            with self.assertRaises(RuntimeError):
+                run_profiled(failing_job, mode="cprofile", path=deterministic)
+            stats = pstats.Stats(str(deterministic))
+            self.assertTrue(any(name == "_spin" for _file, _line, name in stats.stats))
+
+            sampled = Path(tmp) / "job.folded"
+            run_profiled(lambda: _spin(0.1), mode="sample", path=sampled)
+            self.assertIn("_spin", sampled.read_text(encoding="utf-8"))
+
+    def test_default_job_profile_covers_work_done_in_executor_threads(self) -> None:
+        def threaded_job() -> None:
+            with ThreadPoolExecutor(max_workers=2, thread_name_prefix="spotdl-executor") as executor:
+                list(executor.map(_spin, (0.1, 0.1)))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "job.folded"
+            run_profiled(threaded_job, mode=normalize_profile_mode(True), path=path)
+            folded = path.read_text(encoding="utf-8")
+
+        executor_stacks = [line for line in folded.splitlines() if line.startswith("spotdl-executor")]
+        self.assertTrue(any("_spin (test_backend_profiling:" in line for line in executor_stacks))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from app.backend.jobs import DownloadSupervisor
+from app.backend.progress_table import ProgressTable
+from app.backend.settings import DownloadRequest
+from app.backend.workers import WorkerOutcome
+
+
+class _MetadataStub:
+    def get_cached_song_payload(self, _link: str):
+        return None
+
+    def get_cached_duration(self, _link: str):
+        return None
+
+
+class _SlotWritingMonitor:
+    def __init__(self, spec, gate: threading.Event) -> None:
+        self.spec = spec
+        self._gate = gate
+
+    def run(self, on_event, on_events=None):
+        on_event({"type": "phase", "phase": "resolving", "detail": "Matched YouTube"})
+        table = ProgressTable.attach(self.spec.progress_table)
+        table.write(
+            self.spec.progress_slot,
+            phase="downloading",
+            detail="Downloading",
+            progress=55.0,
+            progress_known=True,
+            bytes_downloaded=2048,
+            bytes_total=4096,
+        )
+        table.close()
+        self._gate.wait(timeout=2.0)
+        return WorkerOutcome(success=True, file_path=f"/tmp/{self.spec.job_id}.mp3")
+
+    def terminate(self, _reason=None) -> None:
+        self._gate.set()
+
+
+class ProgressTableTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.table = ProgressTable.create(2)
+        self.addCleanup(self.table.close)
+
+    def test_worker_writes_are_visible_to_the_owner(self) -> None:
+        slot = self.table.acquire()
+        self.assertIsNone(self.table.read(slot))
+
+        worker_view = ProgressTable.attach(self.table.path)
+        worker_view.write(
+            slot,
+            phase="postprocessing",
+            detail="Converting",
+            progress=80.0,
+            progress_known=True,
+            bytes_downloaded=10,
+            bytes_total=20,
+        )
+        worker_view.close()
+
+        sample = self.table.read(slot)
+        self.assertEqual((sample.phase, sample.detail, sample.progress), ("postprocessing", "Converting", 80.0))
+        self.assertEqual((sample.bytes_downloaded, sample.bytes_total), (10, 20))
+        self.assertEqual(self.table.sequence(slot), 2)
+
+    def test_slots_are_cleared_when_reused(self) -> None:
+        first = self.table.acquire()
+        second = self.table.acquire()
+        self.assertIsNone(self.table.acquire())
+
+        self.table.write(first, phase="downloading", detail="Downloading", progress=10.0, progress_known=True)
+        self.table.release(first)
+        self.assertEqual(self.table.acquire(), first)
+        self.assertIsNone(self.table.read(first))
+        self.assertNotEqual(first, second)
+
+    def test_close_removes_the_owner_file(self) -> None:
+        table = ProgressTable.create(1)
+        path = Path(table.path)
+        table.close()
+        self.assertFalse(path.exists())
+
+    def test_supervisor_status_reads_live_progress_from_the_table(self) -> None:
+        gate = threading.Event()
+        supervisor = DownloadSupervisor(
+            _MetadataStub(),
+            concurrency_limit=1,
+            monitor_factory=lambda spec: _SlotWritingMonitor(spec, gate),
+            progress_table=self.table,
+        )
+        link = "https://open.spotify.com/track/table"
+        supervisor.start_download(
+            link,
+            DownloadRequest(download_directory=Path("/tmp/music"), quality="best", format="mp3", bitrate="auto"),
+        )
+        time.sleep(0.1)
+
+        status = supervisor.get_status([link])[link]
+        self.assertEqual(status["progress"], 55.0)
+        self.assertEqual(status["bytes_downloaded"], 2048)
+        self.assertEqual(status["detail"], "Downloading")
+
+        gate.set()
+        time.sleep(0.1)
+        self.assertEqual(supervisor.get_status([link])[link]["status"], "done")
+        self.assertIsNotNone(self.table.acquire())
+
+
+if __name__ == "__main__":
+    unittest.main()
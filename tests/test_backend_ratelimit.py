@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from spotipy.exceptions import SpotifyException
+
+from app.backend.ratelimit import RateLimitTimeout, SharedTokenBucket, retry_after_seconds
+from app.backend.spotify import install_rate_limiter
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class _ThrottledClient:
+    def __init__(self, failures: int) -> None:
+        self.failures = failures
+        self.calls = 0
+
+    def _internal_call(self, method, url, payload, params):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise SpotifyException(429, -1, "Too Many Requests", headers={"Retry-After": "3"})
+        return {"id": url}
+
+
+class SharedTokenBucketTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._temp_dir.cleanup)
+        self.clock = _FakeClock()
+        self.state_file = Path(self._temp_dir.name) / "rate.json"
+
+    def _bucket(self, **kwargs) -> SharedTokenBucket:
+        return SharedTokenBucket(
+            self.state_file,
+            clock=self.clock,
+            sleep=self.clock.sleep,
+            **{"rate": 2.0, "burst": 2, **kwargs},
+        )
+
+    def test_burst_is_shared_between_bucket_instances(self) -> None:
+        first = self._bucket()
+        second = self._bucket()
+
+        self.assertEqual(first.try_acquire(), 0.0)
+        self.assertEqual(second.try_acquire(), 0.0)
+        self.assertAlmostEqual(first.try_acquire(), 0.5)
+
+        self.clock.now += 0.5
+        self.assertEqual(second.try_acquire(), 0.0)
+
+    def test_defer_blocks_every_participant_until_retry_after(self) -> None:
+        bucket = self._bucket()
+        bucket.defer(5)
+
+        self.assertAlmostEqual(self._bucket().try_acquire(), 5.0)
+        bucket.acquire()
+        self.assertGreaterEqual(self.clock.now, 1_005.0)
+
+    def test_acquire_times_out_while_deferred(self) -> None:
+        bucket = self._bucket()
+        bucket.defer(30)
+        with self.assertRaises(RateLimitTimeout):
+            bucket.acquire(timeout=1.0)
+
+    def test_retry_after_parses_seconds_and_falls_back(self) -> None:
+        self.assertEqual(retry_after_seconds({"retry-after": "7"}, default=1.0), 7.0)
+        self.assertEqual(retry_after_seconds({}, default=1.5), 1.5)
+        self.assertEqual(retry_after_seconds({"Retry-After": "soon"}, default=2.0), 2.0)
+
+    def test_installed_limiter_retries_throttled_calls(self) -> None:
+        client = _ThrottledClient(failures=2)
+        bucket = self._bucket()
+        install_rate_limiter(client, bucket, max_retries=3)
+
+        self.assertEqual(client._internal_call("GET", "tracks/1", None, {}), {"id": "tracks/1"})
+        self.assertEqual(client.calls, 3)
+        self.assertGreaterEqual(self.clock.now, 1_006.0)
+
+    def test_installed_limiter_gives_up_after_retry_budget(self) -> None:
+        client = _ThrottledClient(failures=5)
+        install_rate_limiter(client, self._bucket(), max_retries=1)
+
+        with self.assertRaises(SpotifyException):
+            client._internal_call("GET", "tracks/1", None, {})
+        self.assertEqual(client.calls, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import unittest
+
+from app.backend.retries import RetryPolicy, backoff_delay, classify_failure, rotate_providers
+from app.backend.workers import WorkerOutcome
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _failure(message: str = "Download failed.", error_class: str = "download_error", stderr=()) -> WorkerOutcome:
+    return WorkerOutcome(success=False, error_message=message, error_class=error_class, stderr_tail=tuple(stderr))
+
+
+class ClassifyFailureTests(unittest.TestCase):
+    def test_transient_failures_are_classified_from_message_and_stderr(self) -> None:
+        self.assertEqual(classify_failure(_failure("HTTP Error 429: Too Many Requests")), "throttled")
+        self.assertEqual(
+            classify_failure(_failure(stderr=["ERROR: Sign in to confirm you're not a bot"])),
+            "throttled",
+        )
+        self.assertEqual(classify_failure(_failure("<urlopen error [Errno -3] Temporary failure in name resolution>")), "network")
+        self.assertEqual(classify_failure(_failure("No results found for song: Artist - Title")), "no_match")
+        self.assertEqual(classify_failure(_failure("", error_class="idle_timeout")), "stalled")
+        self.assertEqual(classify_failure(_failure("", error_class="worker_exit")), "crashed")
+
+    def test_permanent_failures_are_not_retried(self) -> None:
+        self.assertIsNone(classify_failure(_failure("Unsupported link", error_class="unsupported_input")))
+        self.assertIsNone(classify_failure(_failure("timed out", error_class="hard_timeout")))
+        self.assertIsNone(classify_failure(_failure("ffmpeg exited with code 1")))
+
+
+class RetryPolicyTests(unittest.TestCase):
+    def test_backoff_doubles_with_equal_jitter_up_to_the_cap(self) -> None:
+        self.assertEqual(backoff_delay(2, base=4.0, cap=100.0, rng=lambda: 0.0), 2.0)
+        self.assertEqual(backoff_delay(3, base=4.0, cap=100.0, rng=lambda: 1.0), 8.0)
+        self.assertEqual(backoff_delay(10, base=4.0, cap=10.0, rng=lambda: 1.0), 10.0)
+
+    def test_throttled_failures_back_off_longer(self) -> None:
+        policy = RetryPolicy(base_delay=2.0, max_delay=100.0, rng=lambda: 1.0)
+        self.assertEqual(policy.decide(_failure("connection reset by peer"), 1).delay, 2.0)
+        decision = policy.decide(_failure("HTTP Error 429"), 1)
+        self.assertEqual((decision.attempt, decision.reason, decision.delay), (2, "throttled", 8.0))
+
+    def test_attempts_and_the_global_budget_are_bounded(self) -> None:
+        clock = _Clock()
+        policy = RetryPolicy(max_attempts=3, budget_per_minute=2, clock=clock)
+        failure = _failure("Read timed out")
+        self.assertIsNone(policy.decide(failure, 3))
+        self.assertIsNotNone(policy.decide(failure, 1))
+        self.assertIsNotNone(policy.decide(failure, 1))
+        self.assertIsNone(policy.decide(failure, 1))
+        clock.now += 30.0
+        self.assertIsNotNone(policy.decide(failure, 1))
+
+    def test_failed_provider_moves_to_the_back(self) -> None:
+        self.assertEqual(rotate_providers(("youtube", "youtube-music", "piped")), ("youtube-music", "piped", "youtube"))
+        self.assertEqual(rotate_providers(()), ())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,12 +4,13 @@ import tempfile
 import unittest
 from pathlib import Path
 
-from app.backend.inputs import UnsupportedInputError, ensure_supported_single_track
+from app.backend.inputs import UnsupportedInputError, ensure_supported_link, ensure_supported_single_track
 from app.backend.settings import (
     DownloadRequest,
     SettingsStore,
     build_download_request,
     normalize_format,
+    normalize_priority,
     normalize_quality,
 )
 
@@ -19,6 +20,12 @@ class BackendSettingsTests(unittest.TestCase):
         self.assertEqual(normalize_quality("weird"), "best")
         self.assertEqual(normalize_format("aac"), "mp3")
 
+    def test_priority_is_clamped_and_defaults_to_zero(self) -> None:
+        self.assertEqual(normalize_priority("3"), 3)
+        self.assertEqual(normalize_priority(99), 10)
+        self.assertEqual(normalize_priority("urgent"), 0)
+        self.assertEqual(normalize_priority(None), 0)
+
     def test_build_download_request_ignores_unknown_fields(self) -> None:
         request = build_download_request(
             {
@@ -35,6 +42,7 @@ class BackendSettingsTests(unittest.TestCase):
         self.assertEqual(request.format, "flac")
         self.assertEqual(request.bitrate, "128k")
         self.assertIsNone(request.source_url)
+        self.assertIsNone(request.profile)
 
     def test_build_download_request_keeps_manual_source_url(self) -> None:
         request = build_download_request(
@@ -49,10 +57,27 @@ class BackendSettingsTests(unittest.TestCase):
             "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
         )
 
+    def test_build_download_request_accepts_a_profile_mode(self) -> None:
+        request = build_download_request({"profile": "sample"}, download_dir=Path("/tmp/music"))
+
+        self.assertEqual(request.profile, "sample")
+
     def test_spotify_playlist_is_rejected(self) -> None:
         with self.assertRaises(UnsupportedInputError):
             ensure_supported_single_track("https://open.spotify.com/playlist/abc123")
 
+    def test_playlist_and_album_links_are_accepted_for_expansion(self) -> None:
+        playlist = ensure_supported_link("https://open.spotify.com/intl-de/playlist/abc123/?si=xyz")
+        self.assertEqual(playlist.kind, "spotify_collection")
+        self.assertEqual(playlist.normalized, "https://open.spotify.com/playlist/abc123")
+        self.assertEqual(
+            ensure_supported_link("https://www.youtube.com/playlist?list=PL123").kind,
+            "external_collection",
+        )
+        self.assertEqual(ensure_supported_link("https://open.spotify.com/track/abc").kind, "spotify_track")
+        with self.assertRaises(UnsupportedInputError):
+            ensure_supported_link("https://open.spotify.com/artist/abc123")
+
     def test_settings_store_round_trip(self) -> None:
         with tempfile.TemporaryDirectory() as temp_dir:
             temp_path = Path(temp_dir)
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import unittest
+
+from app.backend.timings import PhaseTimings, ResourceLog, phase_breakdown
+
+
+class PhaseBreakdownTests(unittest.TestCase):
+    def test_marks_become_seconds_per_phase_with_a_total(self) -> None:
+        timeline = [
+            ("queued", 100.0),
+            ("launching", 102.0),
+            ("starting", 102.1),
+            ("resolving", 102.5),
+            ("downloading", 105.0),
+            ("completed", 110.0),
+        ]
+
+        self.assertEqual(
+            phase_breakdown(timeline),
+            {
+                "queued": 2.0,
+                "launching": 0.1,
+                "starting": 0.4,
+                "resolving": 2.5,
+                "downloading": 5.0,
+                "total": 10.0,
+            },
+        )
+
+    def test_worker_reported_phases_replace_parent_side_guesses(self) -> None:
+        timeline = [("queued", 0.0), ("launching", 1.0), ("resolving", 1.5), ("completed", 9.0)]
+        worker_seconds = {"resolving": 2.0, "downloading": 4.0, "postprocessing": 1.5}
+
+        breakdown = phase_breakdown(timeline, worker_seconds)
+        self.assertEqual(breakdown["queued"], 1.0)
+        self.assertEqual(breakdown["resolving"], 2.0)
+        self.assertEqual(breakdown["postprocessing"], 1.5)
+        self.assertEqual(breakdown["total"], 9.0)
+
+
+class PhaseTimingsTests(unittest.TestCase):
+    def test_percentiles_use_nearest_rank_over_the_window(self) -> None:
+        timings = PhaseTimings(window=100)
+        for value in range(1, 101):
+            timings.record("completed", {"resolving": float(value)})
+        timings.record("failed", {"resolving": 500.0})
+
+        summary = timings.percentiles(outcome="completed")["resolving"]
+        self.assertEqual(summary, {"count": 99, "p50": 51.0, "p90": 91.0, "p99": 100.0})
+        self.assertEqual(timings.percentiles()["resolving"]["count"], 100)
+
+    def test_run_estimate_scales_with_track_length(self) -> None:
+        timings = PhaseTimings()
+        self.assertIsNone(timings.run_estimate())
+
+        timings.record("completed", {"queued": 50.0, "resolving": 4.0, "downloading": 20.0, "total": 74.0}, 200.0)
+        timings.record("completed", {"queued": 1.0, "resolving": 6.0, "postprocessing": 40.0, "total": 47.0}, 400.0)
+        timings.record("failed", {"resolving": 300.0, "total": 300.0})
+
+        estimate = timings.run_estimate()
+        self.assertEqual(estimate.typical_seconds, 24.0)
+        self.assertEqual(estimate.seconds(1000.0), 4.0 + 0.1 * 1000.0)
+        self.assertEqual(estimate.seconds(None), 24.0)
+
+
+
+class ResourceLogTests(unittest.TestCase):
+    def test_heaviest_runs_are_ranked_by_cpu_and_by_rss_over_the_window(self) -> None:
+        log = ResourceLog(window=3)
+        log.record("a", "j0", "completed", {"wall_seconds": 1.0, "cpu_user_seconds": 99.0, "peak_rss_bytes": 9})
+        log.record("b", "j1", "completed", {"wall_seconds": 5.0, "cpu_user_seconds": 3.0, "cpu_system_seconds": 1.5})
+        log.record("c", "j2", "retried", {"wall_seconds": 9.0, "cpu_user_seconds": 8.0, "peak_rss_bytes": 700})
+        log.record("d", "j3", "failed", {"wall_seconds": 2.0, "peak_rss_bytes": 300})
+
+        heaviest = log.heaviest(limit=2)
+
+        # `a` fell out of the window.
+        self.assertEqual(heaviest["runs"], 3)
+        self.assertEqual([(run["link"], run["cpu_seconds"]) for run in heaviest["cpu"]], [("c", 8.0), ("b", 4.5)])
+        self.assertEqual([run["link"] for run in heaviest["peak_rss"]], ["c", "d"])
+        self.assertEqual(heaviest["cpu"][0]["outcome"], "retried")
+
+if __name__ == "__main__":
+    unittest.main()
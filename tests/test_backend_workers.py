@@ -1,8 +1,18 @@
 from __future__ import annotations
 
+import json
+import os
+import tempfile
+import threading
+import time
 import unittest
+from pathlib import Path
+from unittest.mock import patch
 
-from app.backend.workers import WorkerProtocolError, parse_worker_event
+from app.backend.metrics import WORKER_TIMEOUTS
+from app.backend.profiling import is_importtime_line, summarize_import_times
+from app.backend.protocol import DownloadJobSpec
+from app.backend.workers import WorkerMonitor, WorkerProtocolError, parse_worker_event
 
 
 class WorkerProtocolTests(unittest.TestCase):
@@ -20,6 +30,178 @@ class WorkerProtocolTests(unittest.TestCase):
             parse_worker_event('{"detail":"missing type"}')
 
 
+class WorkerResourceTests(unittest.TestCase):
+    def test_exec_worker_reports_rusage_and_phase_times(self) -> None:
+        spec = DownloadJobSpec(
+            job_id="resources-test",
+            link="ftp://example.invalid/song",
+            download_directory="/tmp/music",
+            format="mp3",
+            bitrate="auto",
+            song_payload=None,
+        )
+        with tempfile.TemporaryDirectory() as log_dir:
+            with (
+                patch("app.backend.workers.JOB_LOG_DIR", Path(log_dir)),
+                patch("app.backend.workers.shared_zygote", return_value=None),
+                patch("app.backend.workers.WORKER_CPU_LIMIT", 60),
+            ):
+                outcome = WorkerMonitor(spec).run(lambda _event: None)
+            log_text = (Path(log_dir) / "resources-test.log").read_text(encoding="utf-8")
+
+        resources = outcome.resources
+        self.assertIsNotNone(resources.cpu_user_seconds)
+        self.assertGreater(resources.peak_rss_bytes, 0)
+        self.assertIsNone(resources.bytes_written)
+        self.assertIn("starting", resources.phase_seconds)
+        self.assertIn(" RESOURCES ", log_text)
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        status = Path(f"/proc/{pid}/status").read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return False
+    except OSError:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        return True
+    # An orphan killed after the worker exited may linger as a zombie until init reaps it.
+    return "\nState:\tZ" not in status
+
+
+class StandInWorkerTests(unittest.TestCase):
+    def _run(self, config: dict[str, object], monitor_hook=None, **monitor_options) -> object:
+        spec = DownloadJobSpec(
+            job_id="standin-test",
+            link="https://open.spotify.com/track/standin",
+            download_directory="/tmp/music",
+            format="mp3",
+            bitrate="auto",
+            song_payload=None,
+        )
+        with tempfile.TemporaryDirectory() as log_dir:
+            with (
+                patch("app.backend.workers.JOB_LOG_DIR", Path(log_dir)),
+                patch.dict(os.environ, {"SPOTDL_STANDIN_CONFIG": json.dumps(config)}),
+            ):
+                monitor = WorkerMonitor(spec, worker_module="benchmarks.standin_worker", **monitor_options)
+                if monitor_hook is not None:
+                    monitor_hook(monitor)
+                return monitor.run(lambda event: self.events.append(event))
+
+    def setUp(self) -> None:
+        self.events: list[dict[str, object]] = []
+
+    def test_silent_worker_is_classified_as_idle_timeout(self) -> None:
+        before = WORKER_TIMEOUTS.value(kind="idle")
+
+        outcome = self._run({"hang": 1.0}, idle_timeout=1)
+
+        self.assertFalse(outcome.success)
+        self.assertEqual(outcome.error_class, "idle_timeout")
+        self.assertEqual(WORKER_TIMEOUTS.value(kind="idle"), before + 1)
+
+    def test_worker_without_a_final_event_is_classified_as_no_result(self) -> None:
+        outcome = self._run({"malformed": 1.0, "resolve_seconds": [0, 0], "search_seconds": [0, 0]})
+
+        self.assertEqual(outcome.error_class, "no_result")
+        self.assertIn("invalid JSON: '{not json'", outcome.stderr_tail)
+
+    def test_heartbeats_do_not_hide_a_stalled_phase(self) -> None:
+        outcome = self._run({"hang": 1.0}, idle_timeout=1, heartbeat_interval=0.2)
+
+        self.assertEqual(outcome.error_class, "idle_timeout")
+        self.assertIn("while starting", outcome.error_message)
+
+    @unittest.skipUnless(hasattr(os, "killpg"), "SIGSTOP and process groups are POSIX-only")
+    def test_frozen_worker_is_caught_by_missed_heartbeats(self) -> None:
+        before = WORKER_TIMEOUTS.value(kind="heartbeat")
+        started = time.monotonic()
+
+        with patch("app.backend.workers.WORKER_TERMINATE_GRACE", 0.3):
+            outcome = self._run({"hang": 1.0, "freeze_after": 0.3}, idle_timeout=30, heartbeat_interval=0.2)
+
+        self.assertEqual(outcome.error_class, "heartbeat_timeout")
+        self.assertLess(time.monotonic() - started, 5.0)
+        self.assertEqual(WORKER_TIMEOUTS.value(kind="heartbeat"), before + 1)
+
+    @unittest.skipUnless(os.name == "posix", "process groups are POSIX-only")
+    def test_terminate_returns_at_once_and_kills_the_whole_group(self) -> None:
+        timings: dict[str, float] = {}
+
+        def cancel_when_started(monitor: WorkerMonitor) -> None:
+            def cancel() -> None:
+                while not self.events:
+                    time.sleep(0.01)
+                started = time.monotonic()
+                monitor.terminate("Cancelled by user.")
+                timings["terminate"] = time.monotonic() - started
+                timings["cancelled_at"] = time.monotonic()
+
+            threading.Thread(target=cancel, daemon=True).start()
+
+        with patch("app.backend.workers.WORKER_TERMINATE_GRACE", 0.5):
+            outcome = self._run(
+                {"hang": 1.0, "child_process": True, "ignore_sigterm": True},
+                monitor_hook=cancel_when_started,
+            )
+        finished_at = time.monotonic()
+
+        self.assertLess(timings["terminate"], 0.1)
+        # Both the worker and its child ignore SIGTERM, so only the escalated SIGKILL ends them.
+        self.assertGreaterEqual(finished_at - timings["cancelled_at"], 0.5)
+        self.assertEqual(outcome.error_class, "terminated")
+        self.assertTrue(outcome.error_message.startswith("Cancelled by user."))
+        child_pid = int(self.events[0]["child_pid"])
+        deadline = time.monotonic() + 2.0
+        while _process_alive(child_pid) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertFalse(_process_alive(child_pid))
+
+    def test_cancelled_worker_keeps_its_rusage(self) -> None:
+        finished = threading.Event()
+
+        def keep_cancelling(monitor: WorkerMonitor) -> None:
+            def cancel() -> None:
+                while not self.events:
+                    time.sleep(0.01)
+                # Repeated cancels race the monitor for the exited worker; only the monitor may reap it.
+                while not finished.is_set():
+                    monitor.terminate("Cancelled by user.")
+                    time.sleep(0.001)
+
+            threading.Thread(target=cancel, daemon=True).start()
+
+        try:
+            outcome = self._run({"hang": 1.0}, monitor_hook=keep_cancelling)
+        finally:
+            finished.set()
+
+        self.assertEqual(outcome.error_class, "terminated")
+        self.assertIsNotNone(outcome.resources.cpu_user_seconds)
+        self.assertGreater(outcome.resources.peak_rss_bytes, 0)
+
+
+class ImportTimeSummaryTests(unittest.TestCase):
+    def test_summary_orders_imports_by_cumulative_time(self) -> None:
+        lines = [
+            "import time: self [us] | cumulative | imported package",
+            "import time:       120 |        120 | json",
+            "import time:      2000 |     350000 | spotdl",
+            "Traceback (most recent call last):",
+            "import time:       900 |      45000 |   yt_dlp",
+        ]
+
+        self.assertFalse(is_importtime_line(lines[3]))
+        self.assertEqual(
+            summarize_import_times(lines, limit=2),
+            ["350.0 ms spotdl", "45.0 ms yt_dlp"],
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
 
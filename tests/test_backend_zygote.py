@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import os
+import signal
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from app.backend.protocol import DownloadJobSpec
+from app.backend.workers import WorkerMonitor
+from app.backend.zygote import WorkerZygote, zygote_supported
+
+
+@unittest.skipUnless(zygote_supported(), "fork server needs fork() and SCM_RIGHTS")
+class WorkerZygoteTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.zygote = WorkerZygote()
+        cls.zygote.start()
+        if not cls.zygote.wait_ready(timeout=60):
+            cls.zygote.stop()
+            raise unittest.SkipTest("worker zygote did not become ready")
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.zygote.stop()
+
+    def _spawn(self, module: str):
+        process = self.zygote.spawn(module)
+        self.assertIsNotNone(process)
+        for stream in (process.stdin, process.stdout, process.stderr):
+            self.addCleanup(stream.close)
+        return process
+
+    def test_forked_worker_speaks_over_passed_pipes(self) -> None:
+        process = self._spawn("app.backend.metadata_worker")
+        process.stdin.write('{"link": "ftp://example.invalid/song"}')
+        process.stdin.close()
+
+        self.assertIn('"code": "unsupported_input"', process.stdout.read())
+        self.assertEqual(process.wait(timeout=5), 0)
+
+    def test_forked_worker_leads_its_own_process_group(self) -> None:
+        process = self._spawn("app.backend.metadata_worker")
+        deadline = time.monotonic() + 5.0
+        while os.getpgid(process.pid) != process.pid and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(os.getpgid(process.pid), process.pid)
+        os.killpg(process.pid, signal.SIGKILL)
+        self.assertEqual(process.wait(timeout=5), -signal.SIGKILL)
+
+    def test_unknown_worker_module_is_refused(self) -> None:
+        self.assertIsNone(self.zygote.spawn("os"))
+
+    def test_worker_monitor_runs_forked_download_worker(self) -> None:
+        spec = DownloadJobSpec(
+            job_id="zygote-test",
+            link="ftp://example.invalid/song",
+            download_directory="/tmp/music",
+            format="mp3",
+            bitrate="auto",
+            song_payload=None,
+        )
+        events = []
+        with tempfile.TemporaryDirectory() as log_dir:
+            with patch("app.backend.workers.JOB_LOG_DIR", Path(log_dir)):
+                outcome = WorkerMonitor(spec, zygote=self.zygote).run(events.append)
+
+        self.assertFalse(outcome.success)
+        self.assertIn("supported", outcome.error_message)
+        self.assertEqual(events[-1]["type"], "failed")
+        self.assertIsNotNone(outcome.resources.cpu_user_seconds)
+        self.assertGreater(outcome.resources.peak_rss_bytes, 0)
+        self.assertIn("starting", outcome.resources.phase_seconds)
+
+
+if __name__ == "__main__":
+    unittest.main()